@@ -3,14 +3,35 @@ import os
 import subprocess
 import json
 import re
-from typing import List, Dict
+from typing import List, Dict, Optional
 
+from CodeReview.batching import chunked
+from CodeReview.process import run_command
+from CodeReview.source_unit import SourceUnit
 
-def run_radon_cc(file_path: str) -> List[Dict]:
+
+def run_radon_cc(file_path: str, source: Optional[SourceUnit] = None) -> List[Dict]:
     """
     Run Radon Cyclomatic Complexity (CC) analysis on a Python file and parse output.
+
+    When the shared, already parsed `source` is given, Radon's Python API
+    visits its AST in-process instead of re-reading and re-parsing the file
+    in a `radon` subprocess.
     """
-    result = subprocess.run(['radon', 'cc', '-s', '-j', file_path], capture_output=True, text=True)
+    if source is not None:
+        try:
+            from radon.cli.tools import cc_to_dict
+            from radon.complexity import cc_visit_ast, sorted_results
+        except ImportError:
+            pass
+        else:
+            try:
+                blocks = sorted_results(cc_visit_ast(source.tree))
+            except SyntaxError as e:
+                return [{"file": file_path, "error": f"Could not parse file: {e}"}]
+            return parse_radon_cc_data({file_path: [cc_to_dict(block) for block in blocks]})
+
+    result = run_command(['radon', 'cc', '-s', '-j', file_path], capture_output=True, text=True)
     return parse_radon_cc_output(result.stdout)
 
 def parse_radon_cc_output(output: str) -> List[Dict]:
@@ -22,6 +43,12 @@ def parse_radon_cc_output(output: str) -> List[Dict]:
     except json.JSONDecodeError:
         return [{"error": "Invalid Radon CC JSON output"}]
 
+    return parse_radon_cc_data(data)
+
+def parse_radon_cc_data(data: Dict) -> List[Dict]:
+    """
+    Flattens Radon's CC results ({file: [block, ...]}) into a list of blocks.
+    """
     results = []
     for file_path, blocks in data.items():
         for block in blocks:
@@ -42,9 +69,50 @@ def run_radon_mi(file_path: str) -> Dict:
     Run Radon Maintainability Index (MI) on a Python file.
     """
     project_root = find_project_root(file_path)
-    result = subprocess.run(['radon', 'mi', '-s', '-j', project_root], capture_output=True, text=True)
+    result = run_command(['radon', 'mi', '-s', '-j', project_root], capture_output=True, text=True)
     return parse_radon_mi_output(result.stdout, file_path, project_root)
 
+def run_radon_mi_project(path: str, files: Optional[List[str]] = None) -> List[Dict]:
+    """
+    Run Radon Maintainability Index (MI) once over a whole project directory.
+
+    Args:
+        path (str): Root folder of the project.
+        files (List[str], optional): Only rate these files, e.g. the ones
+            file discovery kept, in chunks of DEFAULT_CHUNK_SIZE. Radon
+            walks the whole directory by default.
+    """
+    if files is None:
+        result = run_command(['radon', 'mi', '-s', '-j', path], capture_output=True, text=True)
+        return parse_radon_mi_project_output(result.stdout)
+    results = []
+    for chunk in chunked(list(files)):
+        result = run_command(['radon', 'mi', '-s', '-j', *chunk], capture_output=True, text=True)
+        results.extend(parse_radon_mi_project_output(result.stdout))
+    return results
+
+def parse_radon_mi_project_output(output: str) -> List[Dict]:
+    """
+    Parses Radon's MI JSON output for a directory into one entry per file.
+    """
+    try:
+        data = json.loads(output)
+    except json.JSONDecodeError:
+        return [{"error": "Invalid Radon MI JSON output"}]
+
+    results = []
+    for file_path, values in data.items():
+        if isinstance(values, dict) and "mi" in values:
+            results.append({
+                "file": file_path,
+                "maintainability_index": float(values.get("mi", 0)),
+                "rank": values.get("rank", "N/A")
+            })
+        else:
+            results.append({"file": file_path, "error": values.get("error") if isinstance(values, dict) else str(values)})
+
+    return results
+
 def parse_radon_mi_output(output: str, file_path: str, project_root: str) -> Dict:
     try:
         data = json.loads(output)
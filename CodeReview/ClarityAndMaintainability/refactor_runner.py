@@ -1,14 +1,15 @@
-import subprocess
 import json
 import re
 from typing import List, Dict
 
+from CodeReview.process import run_command
+
 
 def run_refactor(file_path: str) -> List[Dict]:
     """
     Runs the refactor CLI tool on a Python file and parses its output.
     """
-    result = subprocess.run(
+    result = run_command(
         ['refactor', '--diff', file_path],
         capture_output=True,
         text=True
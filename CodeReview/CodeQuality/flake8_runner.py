@@ -1,33 +1,84 @@
 #CodeReview\flake8_runner.py
-import subprocess
-import re
-from typing import List, Dict
+from typing import Dict, Iterable, List
 
-def run_flake8(file_path):
-    """Run flake8 on a Python file and parse the output."""
-    result = subprocess.run(['flake8', file_path], capture_output=True, text=True)
-    return parse_flake8_output(result.stdout)
+from CodeReview.batching import DEFAULT_CHUNK_SIZE, chunked, shard_by_file
+from CodeReview.issue import LintIssue
+from CodeReview.process import run_command
 
-def parse_flake8_output(output: str) -> List[Dict]:
+# Output format requested from flake8: one tab-separated issue per line,
+# which splits unambiguously where the default "path:row:col: CODE text"
+# needs a regex (and breaks on paths containing colons).
+FLAKE8_FORMAT = '%(path)s\t%(row)d\t%(col)d\t%(code)s\t%(text)s'
+
+def run_flake8(file_path, engine: str = "subprocess"):
     """
-    Parses the flake8 output into a structured list of dictionaries.
-    
-    Example flake8 output line:
-    path/to/file.py:3:1: E302 expected 2 blank lines, found 1
+    Run flake8 on a Python file and parse the output.
+
+    Args:
+        file_path (str): Path to the Python file.
+        engine (str): "subprocess" runs the flake8 CLI and parses its text
+            output; "inprocess" uses flake8's Python API in this process.
     """
-    pattern = re.compile(r'^(.*?):(\d+):(\d+):\s([A-Z]\d{3})\s(.*)$')
-    issues = []
+    return _run_flake8_engine([file_path], engine)
+
+def run_flake8_batch(file_paths: List[str], chunk_size: int = DEFAULT_CHUNK_SIZE,
+                     engine: str = "subprocess") -> Dict[str, List[Dict]]:
+    """Run flake8 once per chunk of files and shard the issues back per file."""
+    results = {}
+    for chunk in chunked(file_paths, chunk_size):
+        results.update(shard_by_file(_run_flake8_engine(chunk, engine), chunk))
+    return results
+
+def _run_flake8_engine(file_paths: List[str], engine: str) -> List[Dict]:
+    """Check `file_paths` with the selected engine and return the parsed issues."""
+    if engine == "subprocess":
+        result = run_command(['flake8', f'--format={FLAKE8_FORMAT}', *file_paths], capture_output=True, text=True,
+                             parse_stdout=parse_flake8_lines)
+        return result.stdout
+    if engine == "inprocess":
+        return _run_flake8_inprocess(file_paths)
+    raise ValueError(f"Unknown flake8 engine: {engine}")
+
+def _run_flake8_inprocess(file_paths: List[str]) -> List[Dict]:
+    """
+    Run flake8 through its legacy Python API and collect the violations directly.
+
+    The project's flake8 configuration (select/ignore, plugins) is applied
+    exactly as on the command line.
+    """
+    from flake8.api import legacy
+    from flake8.formatting.base import BaseFormatter
 
-    for line in output.strip().splitlines():
-        match = pattern.match(line)
-        if match:
-            file_path, line_num, column_num, code, message = match.groups()
-            issues.append({
-                "file": file_path.strip(),
-                "line": int(line_num),
-                "column": int(column_num),
-                "code": code,
-                "message": message.strip()
-            })
+    class CollectingFormatter(BaseFormatter):
+        """flake8 formatter that keeps violations instead of printing them."""
 
+        def after_init(self):
+            self.violations = []
+
+        def handle(self, error):
+            self.violations.append(error)
+
+        def format(self, error):
+            return None
+
+    style_guide = legacy.get_style_guide()
+    style_guide.init_report(CollectingFormatter)
+    style_guide.check_files(list(file_paths))
+
+    return [
+        LintIssue(violation.filename, violation.line_number, violation.column_number, violation.code, violation.text)
+        for violation in style_guide._application.formatter.violations
+    ]
+
+def parse_flake8_lines(lines: Iterable[str]) -> List[LintIssue]:
+    """
+    Parses flake8 output in FLAKE8_FORMAT, line by line as it is read, into
+    a list of LintIssue records.
+    """
+    issues = []
+    for line in lines:
+        fields = line.rstrip('\n').split('\t', 4)
+        if len(fields) == 5 and fields[1].isdigit() and fields[2].isdigit():
+            file_path, line_num, column_num, code, message = fields
+            issues.append(LintIssue(file_path, int(line_num), int(column_num), code, message.strip()))
     return issues
@@ -1,40 +1,101 @@
 #CodeReview\pylint_runner.py
-import subprocess
-import re
-from typing import Dict, List
+import json
+from typing import IO, Dict, List
+
+from CodeReview.batching import DEFAULT_CHUNK_SIZE, chunked, shard_by_file
+from CodeReview.issue import PylintIssue
+from CodeReview.process import run_command
    
-def run_pylint(file_path):
-    """Run Pylint analysis on a Python file and parse the output."""
-    result = subprocess.run(['pylint', file_path], capture_output=True, text=True)
-    return parse_pylint_output(result.stdout)
-
-def parse_pylint_output(output: str) -> List[Dict]:
-    """Parses Pylint output and returns a list of issue dictionaries."""
-    pattern = re.compile(
-        r'^(.*?):(\d+):(\d+):\s([A-Z]\d{4}):\s(.*)\s\((.*?)\)$',
-        re.MULTILINE
-    )
-
-    issues = []
-
-    for match in pattern.finditer(output):
-        file_path, line, column, msg_id, message, symbolic_name = match.groups()
+def run_pylint(file_path, engine: str = "subprocess"):
+    """
+    Run Pylint analysis on a Python file and parse the output.
+
+    Args:
+        file_path (str): Path to the Python file.
+        engine (str): "subprocess" runs the pylint CLI and parses its JSON
+            output; "inprocess" uses pylint's Python API in this process.
+    """
+    return _run_pylint_engine([file_path], engine)
+
+def run_pylint_batch(file_paths: List[str], chunk_size: int = DEFAULT_CHUNK_SIZE,
+                     engine: str = "subprocess") -> Dict[str, List[Dict]]:
+    """
+    Run Pylint once per chunk of files and shard the issues back per file.
+
+    Pylint only reports a single rating for the whole invocation, so the
+    per-file "summary" entry is not available in batched mode.
+    """
+    results = {}
+    for chunk in chunked(file_paths, chunk_size):
+        results.update(shard_by_file(_run_pylint_engine(chunk, engine), chunk))
+    return results
+
+def _run_pylint_engine(file_paths: List[str], engine: str) -> List[Dict]:
+    """Check `file_paths` with the selected engine and return the parsed issues."""
+    if engine == "subprocess":
+        result = run_command(['pylint', '--output-format=json2', *file_paths], capture_output=True, text=True,
+                             parse_stdout=parse_pylint_json)
+        return result.stdout
+    if engine == "inprocess":
+        return _run_pylint_inprocess(file_paths)
+    raise ValueError(f"Unknown pylint engine: {engine}")
+
+def _run_pylint_inprocess(file_paths: List[str]) -> List[Dict]:
+    """
+    Run Pylint through its Python API and collect the messages directly.
+
+    astroid caches every module it parses for the life of the process, so
+    the cache is cleared after each run; otherwise a long-lived process
+    would keep reporting on the first version of an edited file.
+    """
+    from pylint.lint import Run
+    from pylint.reporters import CollectingReporter
+
+    reporter = CollectingReporter()
+    run = Run(['--clear-cache-post-run=y', *file_paths], reporter=reporter, exit=False)
+
+    issues = [
+        PylintIssue(message.path, message.line, message.column, message.msg_id, message.symbol, message.msg)
+        for message in reporter.messages
+    ]
+
+    rating = getattr(run.linter.stats, "global_note", None)
+    if rating is not None:
         issues.append({
-            "file": file_path.strip(),
-            "line": int(line),
-            "column": int(column),
-            "message_id": msg_id,
-            "symbol": symbolic_name,
-            "message": message.strip()
+            "summary": {
+                "rating": round(float(rating), 2)
+            }
         })
 
-    # Optionally extract final rating
-    rating_match = re.search(r"Your code has been rated at ([\d\.]+)/10", output)
-    if rating_match:
+    return issues
+
+def parse_pylint_json(stream: IO[str]) -> List:
+    """
+    Parses the output of `pylint --output-format=json2` into a list of
+    PylintIssue records, followed by a {"summary": {"rating": ...}} dict if
+    pylint rated the code.
+
+    Pylint writes the JSON document only once it has checked every file,
+    so it is read as a whole from the stream.
+    """
+    try:
+        document = json.load(stream)
+    except ValueError:
+        # No report, e.g. pylint failed on its command line
+        return []
+
+    issues = [
+        PylintIssue(message['path'], message['line'], message['column'], message['messageId'],
+                    message['symbol'], message['message'])
+        for message in document.get('messages', [])
+    ]
+
+    rating = document.get('statistics', {}).get('score')
+    if rating is not None:
         issues.append({
             "summary": {
-                "rating": float(rating_match.group(1))
+                "rating": round(float(rating), 2)
             }
         })
 
-    return issues
\ No newline at end of file
+    return issues
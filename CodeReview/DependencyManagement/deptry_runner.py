@@ -1,11 +1,12 @@
 # CodeReview\DependencyManagement\deptry_runner.py
 
-import subprocess
 import json
 import tempfile
 import os
 from typing import List, Dict, Union
 
+from CodeReview.process import run_command
+
 
 def run_deptry(path: str) -> Union[List[Dict], Dict]:
     """
@@ -25,7 +26,7 @@ def run_deptry(path: str) -> Union[List[Dict], Dict]:
             tmp_path = tmp_file.name
 
         # Run deptry and output JSON to the temp file
-        result = subprocess.run(
+        result = run_command(
             ['deptry', path, '--json-output', tmp_path],
             capture_output=True,
             text=True
@@ -2,6 +2,8 @@ import subprocess
 import json
 from typing import List, Dict, Union
 
+from CodeReview.process import run_command
+
 def run_pip_audit(_: str = "") -> Union[List[Dict], Dict]:
     """
     Run pip-audit to check installed packages for vulnerabilities.
@@ -13,7 +15,7 @@ def run_pip_audit(_: str = "") -> Union[List[Dict], Dict]:
         list or dict: List of vulnerability dicts if found, or dict with error info.
     """
     try:
-        result = subprocess.run(
+        result = run_command(
             ['pip-audit', '--format', 'json'],
             capture_output=True,
             text=True,
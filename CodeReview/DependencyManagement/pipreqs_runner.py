@@ -1,6 +1,7 @@
-import subprocess
 from typing import Dict
 
+from CodeReview.process import run_command
+
 def run_pipreqs(path: str, savepath: str = None) -> Dict:
     """
     Run pipreqs on a directory to generate requirements.txt.
@@ -17,7 +18,7 @@ def run_pipreqs(path: str, savepath: str = None) -> Dict:
     if savepath:
         cmd += ['--savepath', savepath]
 
-    result = subprocess.run(cmd, capture_output=True, text=True)
+    result = run_command(cmd, capture_output=True, text=True)
 
     if result.returncode == 0:
         return {
@@ -1,7 +1,12 @@
 # CodeReview/Documentation/darglint_runner.py
 
-import subprocess
-from typing import Dict
+from typing import Dict, Iterable, List
+
+from CodeReview.issue import DocstringIssue
+from CodeReview.process import run_command
+
+# Message template requested from darglint: one tab-separated issue per line.
+DARGLINT_TEMPLATE = '{path}\t{line}\t{msg_id}\t{obj}\t{msg}'
 
 def run_darglint(file_path: str) -> Dict:
     """
@@ -11,16 +16,29 @@ def run_darglint(file_path: str) -> Dict:
         file_path (str): Path to the Python file.
 
     Returns:
-        dict: Contains return code, stdout, stderr, and success flag.
+        dict: Contains return code, the parsed issues, stderr, and success flag.
     """
-    cmd = ["darglint", file_path]
+    cmd = ["darglint", "--message-template", DARGLINT_TEMPLATE, file_path]
 
-    result = subprocess.run(cmd, capture_output=True, text=True)
+    result = run_command(cmd, capture_output=True, text=True, parse_stdout=parse_darglint_lines)
 
     return {
         "file": file_path,
         "returncode": result.returncode,
-        "stdout": result.stdout.strip(),
+        "issues": result.stdout,
         "stderr": result.stderr.strip(),
         "success": result.returncode == 0
     }
+
+def parse_darglint_lines(lines: Iterable[str]) -> List[DocstringIssue]:
+    """
+    Parses darglint output in DARGLINT_TEMPLATE, line by line as it is
+    read, into a list of DocstringIssue records.
+    """
+    issues = []
+    for line in lines:
+        fields = line.rstrip('\n').split('\t', 4)
+        if len(fields) == 5 and fields[1].isdigit():
+            file_path, line_num, code, function, message = fields
+            issues.append(DocstringIssue(file_path, int(line_num), code, function, message.strip()))
+    return issues
@@ -1,8 +1,9 @@
 # CodeReview/Documentation/docformatter_runner.py
 
-import subprocess
 from typing import Dict
 
+from CodeReview.process import run_command
+
 def run_docformatter(file_path: str, check_only: bool = False) -> Dict:
     """
     Run docformatter on a Python file.
@@ -22,7 +23,7 @@ def run_docformatter(file_path: str, check_only: bool = False) -> Dict:
 
     cmd.append(file_path)
 
-    result = subprocess.run(cmd, capture_output=True, text=True)
+    result = run_command(cmd, capture_output=True, text=True)
 
     return {
         "file": file_path,
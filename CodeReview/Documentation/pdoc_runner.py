@@ -1,26 +1,27 @@
 # CodeReview/Documentation/pdoc_runner.py
 
-import subprocess
+import tempfile
 from typing import Dict, Optional
 
+from CodeReview.process import run_command
+
 def run_pdoc(module_or_package: str, output_dir: Optional[str] = None) -> Dict:
     """
     Generate documentation for a Python module or package using pdoc.
 
     Args:
         module_or_package (str): The name or path of the module/package to document.
-        output_dir (Optional[str]): Directory to save HTML docs. If None, generates in current dir.
+        output_dir (Optional[str]): Directory to save HTML docs. If None, the docs are
+            generated in a temporary directory and discarded (without an output
+            directory pdoc would start its web server and never exit).
 
     Returns:
         dict: Contains status, output, and any errors.
     """
-    cmd = ['pdoc', module_or_package]
-
-    if output_dir:
-        cmd.extend(['--output-dir', output_dir])
-        cmd.append('--force')  # overwrite existing docs
-
-    result = subprocess.run(cmd, capture_output=True, text=True)
+    with tempfile.TemporaryDirectory() as temp_dir:
+        # -o is the output directory option of both pdoc and pdoc3
+        cmd = ['pdoc', module_or_package, '-o', output_dir or temp_dir]
+        result = run_command(cmd, capture_output=True, text=True)
 
     return {
         "module": module_or_package,
@@ -1,18 +1,37 @@
-import subprocess
-from typing import Dict
+import os
+from typing import Dict, Optional
 
-def run_sphinx(source_dir: str, build_dir: str = "docs/build", builder: str = "html") -> Dict:
+from CodeReview.process import run_command
+
+# Directories searched for the Sphinx conf.py, relative to the project root.
+SOURCE_DIRS = ('', 'docs', os.path.join('docs', 'source'), 'doc', os.path.join('doc', 'source'))
+
+def find_source_dir(path: str) -> Optional[str]:
+    """Return the first of SOURCE_DIRS under `path` holding a conf.py, or None."""
+    for name in SOURCE_DIRS:
+        source_dir = os.path.join(path, name) if name else path
+        if os.path.isfile(os.path.join(source_dir, 'conf.py')):
+            return source_dir
+    return None
+
+def run_sphinx(path: str, build_dir: str = "docs/build", builder: str = "html") -> Dict:
     """
     Run Sphinx to build documentation.
 
     Args:
-        source_dir (str): Path to Sphinx source directory (where conf.py is).
-        build_dir (str): Path to output directory for built docs.
+        path (str): Root folder of the project, or the Sphinx source
+            directory itself. conf.py is looked for in SOURCE_DIRS; without
+            one sphinx-build runs on `path` and reports the error.
+        build_dir (str): Path to output directory for built docs, relative
+            to `path` unless absolute.
         builder (str): The type of builder to use (default: 'html').
 
     Returns:
         dict: Contains success flag, return code, stdout, stderr.
     """
+    source_dir = find_source_dir(path) or path
+    if not os.path.isabs(build_dir):
+        build_dir = os.path.join(path, build_dir)
     cmd = [
         "sphinx-build",
         "-b", builder,
@@ -20,7 +39,7 @@ def run_sphinx(source_dir: str, build_dir: str = "docs/build", builder: str = "h
         build_dir
     ]
 
-    result = subprocess.run(cmd, capture_output=True, text=True)
+    result = run_command(cmd, capture_output=True, text=True)
 
     return {
         "source_dir": source_dir,
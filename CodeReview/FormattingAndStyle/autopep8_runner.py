@@ -1,8 +1,9 @@
 # CodeReview/CodeQuality/autopep8_runner.py
 
-import subprocess
 from typing import Dict
 
+from CodeReview.process import run_command
+
 def run_autopep8(file_path: str, check: bool = True, diff: bool = False) -> Dict:
     """
     Run autopep8 on a Python file to check/fix PEP8 formatting.
@@ -22,7 +23,7 @@ def run_autopep8(file_path: str, check: bool = True, diff: bool = False) -> Dict
         # If check=True but diff=False, disable diff output, so no output returned
         cmd.append('--exit-code')
     
-    result = subprocess.run(cmd, capture_output=True, text=True)
+    result = run_command(cmd, capture_output=True, text=True)
 
     output = result.stdout.strip()
     error = result.stderr.strip()
@@ -1,7 +1,10 @@
 # CodeReview/CodeQuality/black_runner.py
 
-import subprocess
-from typing import Dict
+import re
+from typing import Dict, List
+
+from CodeReview.batching import DEFAULT_CHUNK_SIZE, chunked, normalize_path
+from CodeReview.process import run_command
 
 def run_black(file_path: str, check: bool = True, diff: bool = False) -> Dict:
     """
@@ -22,7 +25,7 @@ def run_black(file_path: str, check: bool = True, diff: bool = False) -> Dict:
         cmd.append('--diff')
     cmd.append(file_path)
 
-    result = subprocess.run(cmd, capture_output=True, text=True)
+    result = run_command(cmd, capture_output=True, text=True)
 
     output = result.stdout.strip()
     error = result.stderr.strip()
@@ -36,3 +39,47 @@ def run_black(file_path: str, check: bool = True, diff: bool = False) -> Dict:
         "stderr": error,
         "returncode": result.returncode,
     }
+
+
+def run_black_batch(file_paths: List[str], chunk_size: int = DEFAULT_CHUNK_SIZE) -> Dict[str, Dict]:
+    """
+    Run Black in check mode once per chunk of files and shard the result per file.
+
+    Args:
+        file_paths (List[str]): Paths to the Python files.
+        chunk_size (int): Maximum number of files per Black invocation.
+
+    Returns:
+        dict: Maps each file path to the same result shape as `run_black`.
+    """
+    pattern = re.compile(r'^(would reformat|error: cannot format) (.+?)(?:: .*)?$')
+    results = {}
+
+    for chunk in chunked(file_paths, chunk_size):
+        result = run_command(['black', '--check', *chunk], capture_output=True, text=True)
+        lookup = {normalize_path(file_path): file_path for file_path in chunk}
+        lines = {file_path: [] for file_path in chunk}
+        codes = {file_path: 0 for file_path in chunk}
+
+        # Black reports one line per affected file on stderr
+        for line in result.stderr.splitlines():
+            match = pattern.match(line.strip())
+            if not match:
+                continue
+            file_path = lookup.get(normalize_path(match.group(2)))
+            if file_path is None:
+                continue
+            lines[file_path].append(line.strip())
+            codes[file_path] = 1 if match.group(1) == 'would reformat' else 123
+
+        for file_path in chunk:
+            results[file_path] = {
+                "file": file_path,
+                "reformat_needed": codes[file_path] == 1,
+                "stdout": "",
+                "stderr": "\n".join(lines[file_path]),
+                "returncode": codes[file_path],
+            }
+
+    return results
+
@@ -1,7 +1,10 @@
 # CodeReview/CodeQuality/isort_runner.py
 
-import subprocess
-from typing import Dict
+import re
+from typing import Dict, List
+
+from CodeReview.batching import DEFAULT_CHUNK_SIZE, chunked, normalize_path
+from CodeReview.process import run_command
 
 def run_isort(file_path: str, check: bool = True, diff: bool = False) -> Dict:
     """
@@ -22,7 +25,7 @@ def run_isort(file_path: str, check: bool = True, diff: bool = False) -> Dict:
         cmd.append('--diff')
     cmd.append(file_path)
 
-    result = subprocess.run(cmd, capture_output=True, text=True)
+    result = run_command(cmd, capture_output=True, text=True)
 
     output = result.stdout.strip()
     error = result.stderr.strip()
@@ -37,3 +40,44 @@ def run_isort(file_path: str, check: bool = True, diff: bool = False) -> Dict:
         "stderr": error,
         "returncode": result.returncode,
     }
+
+
+def run_isort_batch(file_paths: List[str], chunk_size: int = DEFAULT_CHUNK_SIZE) -> Dict[str, Dict]:
+    """
+    Run isort in check mode once per chunk of files and shard the result per file.
+
+    Args:
+        file_paths (List[str]): Paths to the Python files.
+        chunk_size (int): Maximum number of files per isort invocation.
+
+    Returns:
+        dict: Maps each file path to the same result shape as `run_isort`.
+    """
+    pattern = re.compile(r'^ERROR: (.+?) Imports are incorrectly sorted')
+    results = {}
+
+    for chunk in chunked(file_paths, chunk_size):
+        result = run_command(['isort', '--check-only', *chunk], capture_output=True, text=True)
+        lookup = {normalize_path(file_path): file_path for file_path in chunk}
+        lines = {file_path: [] for file_path in chunk}
+
+        # isort reports one "ERROR: <path> ..." line per unsorted file on stderr
+        for line in result.stderr.splitlines():
+            match = pattern.match(line.strip())
+            if match:
+                file_path = lookup.get(normalize_path(match.group(1)))
+                if file_path is not None:
+                    lines[file_path].append(line.strip())
+
+        for file_path in chunk:
+            reformat_needed = bool(lines[file_path])
+            results[file_path] = {
+                "file": file_path,
+                "reformat_needed": reformat_needed,
+                "stdout": "",
+                "stderr": "\n".join(lines[file_path]),
+                "returncode": 1 if reformat_needed else 0,
+            }
+
+    return results
+
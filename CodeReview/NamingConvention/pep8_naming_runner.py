@@ -1,15 +1,26 @@
-import subprocess
 import re
-from typing import Dict, List
+from typing import Dict, Iterable, List
+
+from CodeReview.CodeQuality.flake8_runner import FLAKE8_FORMAT, parse_flake8_lines
+from CodeReview.issue import LintIssue
+from CodeReview.process import run_command
 
 def run_pep8_naming(file_path: str) -> List[Dict]:
     """Run flake8 with pep8-naming plugin and parse the output."""
-    result = subprocess.run(['flake8', file_path], capture_output=True, text=True)
-    return parse_pep8_naming_output(result.stdout)
+    result = run_command(['flake8', f'--format={FLAKE8_FORMAT}', file_path], capture_output=True, text=True,
+                         parse_stdout=parse_pep8_naming_lines)
+    return result.stdout
+
+def parse_pep8_naming_lines(lines: Iterable[str]) -> List[LintIssue]:
+    """
+    Parses flake8 output in FLAKE8_FORMAT as it is read, keeping only the
+    issues of pep8-naming (codes starting with N).
+    """
+    return [issue for issue in parse_flake8_lines(lines) if issue.code.startswith('N')]
 
-def parse_pep8_naming_output(output: str) -> List[Dict]:
+def parse_pep8_naming_output(output: str) -> List[LintIssue]:
     """
-    Parses flake8/pep8-naming output and returns a list of issue dictionaries.
+    Parses flake8/pep8-naming output and returns a list of LintIssue records.
     Expected format: filename:line:col: CODE message
     Only includes issues starting with N (pep8-naming)
     """
@@ -20,12 +31,6 @@ def parse_pep8_naming_output(output: str) -> List[Dict]:
         match = pattern.match(line)
         if match:
             file_path, line_num, col_num, code, message = match.groups()
-            issues.append({
-                "file": file_path.strip(),
-                "line": int(line_num),
-                "column": int(col_num),
-                "code": code.strip(),
-                "message": message.strip()
-            })
+            issues.append(LintIssue(file_path.strip(), int(line_num), int(col_num), code.strip(), message.strip()))
 
     return issues
@@ -2,17 +2,43 @@
 import cProfile
 import pstats
 import io
-from typing import List, Dict
+from typing import List, Dict, Optional
 
+from CodeReview.sandbox import SandboxError, run_in_sandbox
+from CodeReview.source_unit import SourceUnit, load_source
 
-def run_cprofile(file_path: str) -> List[Dict]:
+
+def run_cprofile(file_path: str, source: Optional[SourceUnit] = None, engine: str = "sandbox") -> List[Dict]:
     """
     Profiles the execution of a Python file using cProfile and returns sorted results.
+
+    Args:
+        file_path (str): Path to the Python file.
+        source (SourceUnit, optional): Already parsed source of the file,
+            used by the in-process engine.
+        engine (str): "sandbox" profiles in an isolated worker process (see
+            CodeReview.sandbox); "inprocess" executes the file in this process.
+    """
+    if engine == "sandbox":
+        try:
+            return run_in_sandbox(_run_cprofile_inprocess, file_path)
+        except SandboxError as e:
+            return [{"error": f"Sandbox failed: {e}"}]
+    if engine == "inprocess":
+        return _run_cprofile_inprocess(file_path, source)
+    raise ValueError(f"Unknown cprofile engine: {engine}")
+
+
+def _run_cprofile_inprocess(file_path: str, source: Optional[SourceUnit] = None) -> List[Dict]:
+    """
+    Profile the file in this process. The module is compiled from the shared,
+    already parsed `source` when given.
     """
     profiler = cProfile.Profile()
 
     try:
-        profiler.run(f'exec(open({repr(file_path)}).read(), {{}})')
+        code = compile((source or load_source(file_path)).tree, file_path, 'exec')
+        profiler.runctx('exec(code, {})', {'code': code}, {})
     except Exception as e:
         return [{"error": f"Execution failed: {e}"}]
 
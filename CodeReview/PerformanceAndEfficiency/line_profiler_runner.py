@@ -4,20 +4,14 @@ from line_profiler import LineProfiler
 import importlib.util
 import os
 import sys
-import ast
-from typing import List, Dict, Tuple
+from typing import List, Dict, Optional, Tuple
 
-
-def extract_function_names(file_path: str) -> List[str]:
-    """
-    Extracts top-level function names from a Python file using AST.
-    """
-    with open(file_path, "r", encoding="utf-8") as f:
-        tree = ast.parse(f.read(), filename=file_path)
-    return [node.name for node in tree.body if isinstance(node, ast.FunctionDef)]
+from CodeReview.sandbox import SandboxError, run_in_sandbox
+from CodeReview.source_unit import SourceUnit, extract_function_names
 
 
-def run_line_profiler(file_path: str, function_names: List[str] = None, test_args: Dict[str, Tuple] = None) -> List[Dict]:
+def run_line_profiler(file_path: str, function_names: List[str] = None, test_args: Dict[str, Tuple] = None,
+                      source: Optional[SourceUnit] = None, engine: str = "sandbox") -> List[Dict]:
     """
     Profiles specific functions in a Python file using line_profiler.
 
@@ -25,10 +19,29 @@ def run_line_profiler(file_path: str, function_names: List[str] = None, test_arg
         file_path (str): Path to the Python file.
         function_names (List[str], optional): Function names to profile.
         test_args (Dict[str, Tuple], optional): Arguments to pass per function.
+        source (SourceUnit, optional): Already parsed source of the file,
+            used by the in-process engine.
+        engine (str): "sandbox" imports and profiles the module in an
+            isolated worker process (see CodeReview.sandbox); "inprocess"
+            imports it into this process.
 
     Returns:
         List[Dict]: Profiling data or error message.
     """
+    if engine == "sandbox":
+        try:
+            return run_in_sandbox(_run_line_profiler_inprocess, file_path, function_names, test_args)
+        except SandboxError as e:
+            return [{"error": f"Sandbox failed: {e}"}]
+    if engine == "inprocess":
+        return _run_line_profiler_inprocess(file_path, function_names, test_args, source)
+    raise ValueError(f"Unknown line_profiler engine: {engine}")
+
+
+def _run_line_profiler_inprocess(file_path: str, function_names: List[str] = None,
+                                 test_args: Dict[str, Tuple] = None,
+                                 source: Optional[SourceUnit] = None) -> List[Dict]:
+    """Import the module into this process and profile its functions."""
     module_name = os.path.splitext(os.path.basename(file_path))[0]
     module_dir = os.path.dirname(os.path.abspath(file_path))
 
@@ -49,7 +62,7 @@ def run_line_profiler(file_path: str, function_names: List[str] = None, test_arg
         return [{"error": f"Execution failed: {e}"}]
 
     if function_names is None:
-        function_names = extract_function_names(file_path)
+        function_names = extract_function_names(file_path, source)
         if not function_names:
             return [{"error": f"No functions found in {file_path} to profile."}]
 
@@ -4,20 +4,14 @@ from memory_profiler import memory_usage
 import importlib.util
 import os
 import sys
-import ast
 from typing import Dict, List, Any, Optional
 
-
-def extract_function_names(file_path: str) -> List[str]:
-    """
-    Extracts top-level function names using AST.
-    """
-    with open(file_path, "r", encoding="utf-8") as f:
-        tree = ast.parse(f.read(), filename=file_path)
-    return [node.name for node in tree.body if isinstance(node, ast.FunctionDef)]
+from CodeReview.sandbox import SandboxError, run_in_sandbox
+from CodeReview.source_unit import SourceUnit, extract_function_names
 
 
-def run_memory_profiler(file_path: str, function_name: Optional[str] = None, test_args: Optional[tuple] = ()) -> List[Dict[str, Any]]:
+def run_memory_profiler(file_path: str, function_name: Optional[str] = None, test_args: Optional[tuple] = (),
+                        source: Optional[SourceUnit] = None, engine: str = "sandbox") -> List[Dict[str, Any]]:
     """
     Profiles memory usage of a specific function using memory_profiler.
 
@@ -25,10 +19,29 @@ def run_memory_profiler(file_path: str, function_name: Optional[str] = None, tes
         file_path (str): Path to the Python file.
         function_name (str, optional): Function to profile. If not provided, auto-detects.
         test_args (tuple, optional): Arguments to pass into the function.
+        source (SourceUnit, optional): Already parsed source of the file,
+            used by the in-process engine.
+        engine (str): "sandbox" imports and profiles the module in an
+            isolated worker process (see CodeReview.sandbox); "inprocess"
+            imports it into this process.
 
     Returns:
         List[Dict]: Memory usage information or error.
     """
+    if engine == "sandbox":
+        try:
+            return run_in_sandbox(_run_memory_profiler_inprocess, file_path, function_name, test_args)
+        except SandboxError as e:
+            return [{"error": f"Sandbox failed: {e}"}]
+    if engine == "inprocess":
+        return _run_memory_profiler_inprocess(file_path, function_name, test_args, source)
+    raise ValueError(f"Unknown memory_profiler engine: {engine}")
+
+
+def _run_memory_profiler_inprocess(file_path: str, function_name: Optional[str] = None,
+                                   test_args: Optional[tuple] = (),
+                                   source: Optional[SourceUnit] = None) -> List[Dict[str, Any]]:
+    """Import the module into this process and profile one of its functions."""
     module_name = os.path.splitext(os.path.basename(file_path))[0]
     module_dir = os.path.dirname(os.path.abspath(file_path))
 
@@ -48,7 +61,7 @@ def run_memory_profiler(file_path: str, function_name: Optional[str] = None, tes
         return [{"error": f"Failed to execute module: {e}"}]
 
     if function_name is None:
-        functions = extract_function_names(file_path)
+        functions = extract_function_names(file_path, source)
         if not functions:
             return [{"error": f"No functions found in {file_path}"}]
         function_name = functions[0]  # Pick the first one
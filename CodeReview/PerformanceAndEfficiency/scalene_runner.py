@@ -6,6 +6,8 @@ import os
 import json
 from typing import Dict, Any
 
+from CodeReview.process import run_command
+
 
 def run_scalene(file_path: str) -> Dict[str, Any]:
     """
@@ -21,7 +23,7 @@ def run_scalene(file_path: str) -> Dict[str, Any]:
         output_file = os.path.join(temp_dir, "scalene_output.json")
 
         try:
-            subprocess.run(
+            run_command(
                 [
                     "scalene",
                     "--json",
@@ -1,37 +1,67 @@
-import subprocess
 import json
 from typing import Dict, List
 
+from CodeReview.batching import DEFAULT_CHUNK_SIZE, chunked, shard_by_file
+from CodeReview.issue import BanditIssue
+from CodeReview.process import run_command
+
 def run_bandit(target_path: str) -> List[Dict]:
     """
     Run Bandit security analysis on the target_path (file or directory).
     Returns a list of issue dictionaries parsed from Bandit's JSON output.
     """
     # Run bandit with JSON output format
-    result = subprocess.run(
+    result = run_command(
         ['bandit', '-r', target_path, '-f', 'json'],
         capture_output=True,
         text=True
     )
+    return parse_bandit_output(result.stdout)
+
+
+def run_bandit_batch(file_paths: List[str], chunk_size: int = DEFAULT_CHUNK_SIZE) -> Dict[str, List[Dict]]:
+    """
+    Run Bandit once per chunk of files and shard the issues back per file.
+    """
+    results = {}
+    for chunk in chunked(file_paths, chunk_size):
+        result = run_command(
+            ['bandit', '-f', 'json', *chunk],
+            capture_output=True,
+            text=True
+        )
+        issues = parse_bandit_output(result.stdout)
+        if issues and "error" in issues[0]:
+            # The whole invocation failed, so every file gets the error
+            results.update({file_path: issues for file_path in chunk})
+        else:
+            results.update(shard_by_file(issues, chunk))
+    return results
+
 
+def parse_bandit_output(output: str) -> List:
+    """
+    Parses Bandit's JSON output into a list of BanditIssue records, or a
+    single {"error": ...} dict if the output is not JSON.
+    """
     try:
-        bandit_json = json.loads(result.stdout)
+        bandit_json = json.loads(output)
     except json.JSONDecodeError:
         # If output is not JSON, return raw output as error info
-        return [{"error": "Failed to parse Bandit JSON output", "output": result.stdout}]
+        return [{"error": "Failed to parse Bandit JSON output", "output": output}]
 
     issues = []
 
     # Bandit JSON output has 'results' key with list of issues
     for issue in bandit_json.get('results', []):
-        issues.append({
-            "file": issue.get('filename'),
-            "line": issue.get('line_number'),
-            "issue_severity": issue.get('issue_severity'),
-            "issue_confidence": issue.get('issue_confidence'),
-            "issue_text": issue.get('issue_text'),
-            "test_name": issue.get('test_name'),
-            "test_id": issue.get('test_id')
-        })
+        issues.append(BanditIssue(
+            issue.get('filename'),
+            issue.get('line_number'),
+            issue.get('issue_severity'),
+            issue.get('issue_confidence'),
+            issue.get('issue_text'),
+            issue.get('test_name'),
+            issue.get('test_id'),
+        ))
 
     return issues
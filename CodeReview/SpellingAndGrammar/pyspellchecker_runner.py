@@ -1,56 +1,130 @@
 # CodeReview/SpellingAndGrammar/pyspellchecker_runner.py
 from spellchecker import SpellChecker
 import re
-from typing import List, Dict
+import tokenize
+from functools import lru_cache
+from typing import Iterator, List, Dict, Optional, Tuple
 
-def run_pyspellchecker(file_path: str) -> List[Dict]:
+from CodeReview.issue import SpellingIssue
+from CodeReview.source_unit import SourceUnit, load_source
+
+# Number of distinct words whose spelling verdict and correction are
+# memoized for the rest of the run.
+CORRECTION_CACHE_SIZE = 65536
+
+# Longest word for which corrections two edits away are searched.
+MAX_DISTANCE_2_LENGTH = 5
+
+# Words in prose and identifiers; underscores and digits separate words, so
+# "recieve_data" yields recieve and data.
+WORD_PATTERN = re.compile(r'[A-Za-z]+')
+
+# Parts of a camelCase or CapWords word: "parseHTTPResponse" -> parse, HTTP, Response.
+CAMEL_CASE_PATTERN = re.compile(r'[A-Z]+(?=[A-Z][a-z])|[A-Z]?[a-z]+|[A-Z]+')
+
+# String literal prefixes (r, b, f, u, ...) followed by the opening quote.
+STRING_PREFIX_PATTERN = re.compile(r'^[A-Za-z]*("""|\'\'\'|"|\')')
+
+# Tokens holding string contents. Python 3.12+ splits f-strings into
+# FSTRING_START/FSTRING_MIDDLE/FSTRING_END tokens.
+STRING_TOKENS = {tokenize.STRING} | {
+    getattr(tokenize, name) for name in ('FSTRING_MIDDLE', 'TSTRING_MIDDLE') if hasattr(tokenize, name)
+}
+
+
+@lru_cache(maxsize=None)
+def get_spellchecker() -> SpellChecker:
+    """
+    Return the process-wide SpellChecker, loading its word-frequency
+    dictionary only once.
+    """
+    return SpellChecker()
+
+
+@lru_cache(maxsize=CORRECTION_CACHE_SIZE)
+def is_misspelled(word: str) -> bool:
+    """Check a (lower-case) word against the shared dictionary."""
+    return bool(get_spellchecker().unknown([word]))
+
+
+@lru_cache(maxsize=CORRECTION_CACHE_SIZE)
+def correction(word: str) -> Optional[str]:
+    """
+    Most likely correction of a misspelled word (an edit-distance search, so memoized).
+
+    Words longer than MAX_DISTANCE_2_LENGTH are only matched against words one
+    edit away, since the distance-2 candidate set grows quadratically with the
+    word length.
+    """
+    spell = get_spellchecker()
+    if len(word) <= MAX_DISTANCE_2_LENGTH:
+        return spell.correction(word)
+    candidates = spell.known(spell.edit_distance_1(word))
+    return max(candidates, key=spell.word_usage_frequency) if candidates else None
+
+
+def misspelled_words(text: str) -> Iterator[str]:
+    """
+    Yield the misspelled words of `text` in lower case, in order of appearance.
+
+    snake_case identifiers are checked word by word. A camelCase or CapWords
+    word that is unknown as a whole is accepted when each of its parts is a
+    known word.
+    """
+    for word in WORD_PATTERN.findall(text):
+        lowered = word.lower()
+        if not is_misspelled(lowered):
+            continue
+        parts = CAMEL_CASE_PATTERN.findall(word)
+        if len(parts) > 1 and not any(is_misspelled(part.lower()) for part in parts):
+            continue
+        yield lowered
+
+
+def iter_text_segments(source: SourceUnit) -> Iterator[Tuple[int, str, str]]:
+    """
+    Yield (line, text, source kind) for each line of every comment and string literal.
+
+    Multi-line strings are split so every word is reported on the line it
+    actually appears on. The kind is "comment" or "code", as before.
+    """
+    for token in source.tokens:
+        if token.type == tokenize.COMMENT:
+            yield token.start[0], token.string[1:], "comment"
+        elif token.type in STRING_TOKENS:
+            text = token.string
+            if token.type == tokenize.STRING:
+                match = STRING_PREFIX_PATTERN.match(text)
+                if match:
+                    quote = match.group(1)
+                    text = text[match.end():len(text) - len(quote)]
+            for offset, line in enumerate(text.split('\n')):
+                yield token.start[0] + offset, line, "code"
+
+
+def run_pyspellchecker(file_path: str, source: Optional[SourceUnit] = None) -> List[Dict]:
     """
     Spellcheck the content of a Python file using pyspellchecker.
     Distinguishes between code strings and comments.
-    """
-    spell = SpellChecker()
-    issues = []
 
+    Comments and string literals are found with the tokenizer of the shared
+    SourceUnit, identifiers inside them are split into words, and spelling
+    verdicts and corrections are memoized across files.
+    """
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            lines = f.readlines()
-    except Exception as e:
+        segments = list(iter_text_segments(source or load_source(file_path)))
+    except (OSError, UnicodeDecodeError) as e:
         return [{"error": f"Could not read file: {e}"}]
+    except (tokenize.TokenError, SyntaxError) as e:
+        return [{"error": f"Could not tokenize file: {e}"}]
 
-    for line_num, line in enumerate(lines, 1):
-        # --- Check comments ---
-        comment_match = re.search(r'#(.*)', line)
-        if comment_match:
-            comment_text = comment_match.group(1)
-            words = re.findall(r'\b[a-zA-Z]+\b', comment_text)
-            misspelled = spell.unknown(words)
-            for word in misspelled:
-                issues.append({
-                    "file": file_path,
-                    "line": line_num,
-                    "word": word,
-                    "suggestion": spell.correction(word),
-                    "source": "comment"
-                })
-
-        # --- Check string literals ---
-        # Capture single, double, triple-quoted strings (non-docstring context)
-        string_matches = re.findall(
-            r'(?:\"\"\"(.*?)\"\"\"|\'\'\'(.*?)\'\'\'|\"(.*?)\"|\'(.*?)\')',
-            line,
-            re.DOTALL
-        )
-        for match_group in string_matches:
-            string_text = " ".join(filter(None, match_group))
-            words = re.findall(r'\b[a-zA-Z]+\b', string_text)
-            misspelled = spell.unknown(words)
-            for word in misspelled:
-                issues.append({
-                    "file": file_path,
-                    "line": line_num,
-                    "word": word,
-                    "suggestion": spell.correction(word),
-                    "source": "code"
-                })
+    issues = []
+    for line_num, text, kind in segments:
+        seen = set()
+        for word in misspelled_words(text):
+            if word in seen:
+                continue
+            seen.add(word)
+            issues.append(SpellingIssue(file_path, line_num, word, correction(word), kind))
 
     return issues
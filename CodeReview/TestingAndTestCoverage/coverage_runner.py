@@ -1,68 +1,253 @@
-import subprocess
-import json
-import re
-from typing import Dict, List
+import configparser
+import glob
+import os
+import tempfile
+import tomllib
+from typing import Dict, List, Optional
 
-def run_coverage(source_path: str) -> Dict:
+from coverage import Coverage, CoverageData
+from coverage.exceptions import CoverageException
+
+from CodeReview.process import run_command
+from CodeReview.source_unit import module_names
+
+# [run] settings of the coverage run. Every line is recorded with the test
+# function that ran it (its dynamic context), which gives the test -> line
+# mapping used to select the tests affected by a change. coverage only
+# accepts dynamic contexts and the parallel settings from a configuration
+# file, so one is generated for the run from the project's own coverage
+# configuration with these settings on top; reading the results uses the
+# same file, so the project's exclusions apply.
+RUN_CONFIG = {
+    'dynamic_context': 'test_function',
+}
+
+# Added to RUN_CONFIG in parallel mode. Every measured process writes a data
+# file of its own, combined after the run: threads, processes started with
+# multiprocessing and, with coverage 7.10 or later, any Python subprocess
+# (e.g. pytest-xdist workers).
+PARALLEL_CONFIG = {
+    'parallel': 'True',
+    'concurrency': 'thread,multiprocessing',
+    'patch': 'subprocess',
+}
+
+# INI files coverage reads its configuration from, in its order of
+# precedence, with the prefix of their coverage sections; pyproject.toml's
+# [tool.coverage] tables come last.
+CONFIG_FILES = (('.coveragerc', ''), ('setup.cfg', 'coverage:'), ('tox.ini', 'coverage:'))
+
+# Key in the test map of lines that ran outside any test: imports during
+# collection, fixtures, conftest.py.
+NO_TEST = ''
+
+def run_coverage(source_path: str, parallel: bool = False, tests: Optional[List[str]] = None,
+                 test_map: Optional[Dict] = None) -> Dict:
     """
-    Run coverage.py to measure code coverage on the given source_path.
-    Returns a parsed summary report as a dictionary.
+    Run the project's test suite once under coverage.py and return the line
+    coverage of every Python file in source_path.
+
+    Args:
+        source_path (str): Root folder of the project; only its files are measured.
+        parallel (bool): Use coverage's parallel mode, which also measures
+            the processes the tests start, and combine their data afterwards.
+        tests (List[str], optional): Only run these tests: pytest node ids
+            relative to source_path, or test files.
+        test_map (dict, optional): The test map of a previous run. With
+            `tests`, the lines of the tests that did not run are taken from it.
+
+    Returns:
+        dict: {"run_output", "run_error", "exit_code", "files", "totals",
+              "test_map"} where "files" maps each file's path relative to
+              source_path to {"statements", "missed", "coverage",
+              "executed_lines", "missing_lines"}, "totals" sums them up and
+              "test_map" maps each test's node id (NO_TEST for lines run
+              outside tests) to {path: lines it ran}. Coverage is a
+              percentage.
     """
-    # Run coverage: erase old data, run tests, then report in terminal
-    subprocess.run(['coverage', 'erase'], capture_output=True, text=True)
-    run_result = subprocess.run(['coverage', 'run', '-m', 'pytest', source_path], capture_output=True, text=True)
-    
-    report_result = subprocess.run(['coverage', 'report', '-m'], capture_output=True, text=True)
+    with tempfile.TemporaryDirectory(prefix='code-analyzer-coverage-') as data_dir:
+        # A private data file, so the project's own .coverage is left alone
+        data_file = os.path.join(data_dir, '.coverage')
+        rcfile = os.path.join(data_dir, 'coveragerc')
+        config = project_config(source_path)
+        if not config.has_section('run'):
+            config.add_section('run')
+        config['run'].update(RUN_CONFIG, data_file=data_file, source=os.path.abspath(source_path))
+        if parallel:
+            config['run'].update(PARALLEL_CONFIG)
+        with open(rcfile, 'w', encoding='utf-8') as f:
+            config.write(f)
+        targets = [os.path.join(source_path, test) for test in tests] if tests else [source_path]
+        run_result = run_command(['coverage', 'run', f'--rcfile={rcfile}', '-m', 'pytest', *targets],
+                                 capture_output=True, text=True)
+        # Parallel mode leaves one data file per process
+        if glob.glob(glob.escape(data_file) + '.*'):
+            run_command(['coverage', 'combine', f'--rcfile={rcfile}'], capture_output=True, text=True)
 
-    parsed_report = parse_coverage_report(report_result.stdout)
+        files, current_map = read_coverage(data_file, source_path, rcfile)
+    if tests and test_map:
+        current_map = merge_test_maps(test_map, current_map, tests, files)
+        files, totals = summarize(files, current_map)
+    else:
+        files, totals = summarize(files)
     return {
         "run_output": run_result.stdout,
         "run_error": run_result.stderr,
-        "report": parsed_report
+        "exit_code": run_result.returncode,
+        "files": files,
+        "totals": totals,
+        "test_map": current_map,
+    }
+
+
+def project_config(source_path: str) -> configparser.ConfigParser:
+    """
+    Return the coverage configuration of the project in source_path, from
+    the first of its configuration files that has one, with the sections
+    named as in a .coveragerc ("run", "report", ...).
+    """
+    config = configparser.ConfigParser(interpolation=None)
+    for name, prefix in CONFIG_FILES:
+        parser = configparser.ConfigParser(interpolation=None)
+        try:
+            parser.read(os.path.join(source_path, name), encoding='utf-8')
+        except configparser.Error:
+            continue
+        sections = [section for section in parser.sections() if section.startswith(prefix)]
+        if sections:
+            for section in sections:
+                config[section[len(prefix):]] = dict(parser[section])
+            return config
+
+    try:
+        with open(os.path.join(source_path, 'pyproject.toml'), 'rb') as f:
+            tables = tomllib.load(f).get('tool', {}).get('coverage', {})
+    except (OSError, tomllib.TOMLDecodeError):
+        tables = {}
+    for section, options in tables.items():
+        if isinstance(options, dict):
+            config[section] = {
+                key: '\n'.join(map(str, value)) if isinstance(value, list) else str(value)
+                for key, value in options.items()
+            }
+    return config
+
+
+def read_coverage(data_file: str, source_path: str, config_file: Optional[str] = None) -> tuple:
+    """
+    Read a coverage data file through the coverage API.
+
+    Statements are found with the coverage configuration of the run,
+    `config_file`, so exclusions such as "pragma: no cover" and those of
+    the project apply.
+
+    Returns:
+        tuple: (files, test_map) where files maps each measured file's path
+               relative to source_path to {"statements", "executed"} line
+               lists, or {"error"} if it could not be analyzed, and test_map
+               is as described in run_coverage.
+    """
+    data = CoverageData(basename=data_file)
+    data.read()
+    cov = Coverage(data_file=data_file, config_file=config_file or True)
+    cov.load()
+
+    rel_paths = {
+        measured_file: os.path.relpath(measured_file, source_path).replace(os.sep, '/')
+        for measured_file in data.measured_files()
+    }
+    modules = {}
+    for rel_path in rel_paths.values():
+        modules.update((name, rel_path) for name in module_names(rel_path))
+
+    files = {}
+    test_map = {}
+    for measured_file, rel_path in sorted(rel_paths.items(), key=lambda item: item[1]):
+        try:
+            _, statements, _, missing, _ = cov.analysis2(measured_file)
+        except CoverageException as e:
+            files[rel_path] = {"error": str(e)}
+            continue
+        missing = set(missing)
+        files[rel_path] = {"statements": statements, "executed": [line for line in statements if line not in missing]}
+        for line, contexts in data.contexts_by_lineno(measured_file).items():
+            for context in contexts:
+                test_map.setdefault(_test_id(context, modules), {}).setdefault(rel_path, []).append(line)
+    for lines_by_file in test_map.values():
+        for lines in lines_by_file.values():
+            lines.sort()
+    return files, test_map
+
+
+def merge_test_maps(previous: Dict, current: Dict, tests: List[str], files: Dict) -> Dict:
+    """
+    Update the test map of a previous run with a run of only `tests`.
+
+    Entries of the tests that ran are replaced and those of tests whose
+    file no longer exists are dropped; lines run outside tests are merged
+    per file.
+    """
+    def ran(test_id):
+        return any(test_id == test or test_id.startswith(test + '::') for test in tests)
+
+    merged = {
+        test_id: lines_by_file for test_id, lines_by_file in previous.items()
+        if test_id != NO_TEST and not ran(test_id) and test_id.split('::', 1)[0] in files
+    }
+    merged.update((test_id, lines_by_file) for test_id, lines_by_file in current.items() if test_id != NO_TEST)
+    merged[NO_TEST] = {**previous.get(NO_TEST, {}), **current.get(NO_TEST, {})}
+    return merged
+
+
+def summarize(files: Dict, test_map: Optional[Dict] = None) -> tuple:
+    """
+    Build the per-file coverage entries and totals of run_coverage.
+
+    Args:
+        files (dict): The files returned by read_coverage.
+        test_map (dict, optional): Lines recorded here count as executed
+            as well, e.g. those of tests a partial run took from a previous run.
+    """
+    recorded = {}
+    for lines_by_file in (test_map or {}).values():
+        for rel_path, lines in lines_by_file.items():
+            recorded.setdefault(rel_path, set()).update(lines)
+
+    entries = {}
+    statements_total = missed_total = 0
+    for rel_path, measured in files.items():
+        if "error" in measured:
+            entries[rel_path] = measured
+            continue
+        executed = set(measured["executed"]) | recorded.get(rel_path, set())
+        statements = measured["statements"]
+        missing = [line for line in statements if line not in executed]
+        entries[rel_path] = _summary(len(statements), len(missing))
+        entries[rel_path].update(
+            executed_lines=[line for line in statements if line in executed],
+            missing_lines=missing,
+        )
+        statements_total += len(statements)
+        missed_total += len(missing)
+    return entries, _summary(statements_total, missed_total)
+
+
+def _summary(statements: int, missed: int) -> Dict:
+    return {
+        "statements": statements,
+        "missed": missed,
+        "coverage": round(100.0 * (statements - missed) / statements, 2) if statements else 100.0,
     }
 
 
-def parse_coverage_report(report_output: str) -> List[Dict]:
+def _test_id(context: str, modules: Dict[str, str]) -> str:
     """
-    Parses the text output of 'coverage report -m' into structured JSON.
+    Turn a test_function dynamic context such as "tests.test_x.TestY.test_z"
+    into the pytest node id "tests/test_x.py::TestY::test_z".
     """
-    lines = report_output.strip().splitlines()
-    results = []
-
-    # Expect lines like:
-    # Name                             Stmts   Miss  Cover   Missing
-    # ----------------------------------------------------------------
-    # code_analyzer/analyzer.py          100     10    90%   45-50, 78
-
-    # Find the header line index (Name ... Missing)
-    header_idx = 0
-    for i, line in enumerate(lines):
-        if line.startswith("Name") and "Missing" in line:
-            header_idx = i
-            break
-
-    # Parse subsequent lines until empty or summary
-    for line in lines[header_idx+2:]:
-        if not line.strip() or line.startswith("TOTAL"):
-            # Optionally, parse TOTAL line as summary
-            if line.startswith("TOTAL"):
-                parts = re.split(r"\s+", line)
-                if len(parts) >= 5:
-                    results.append({
-                        "file": "TOTAL",
-                        "statements": int(parts[1]),
-                        "missed": int(parts[2]),
-                        "coverage": parts[3]
-                    })
-            break
-        parts = re.split(r"\s+", line)
-        if len(parts) >= 5:
-            results.append({
-                "file": parts[0],
-                "statements": int(parts[1]),
-                "missed": int(parts[2]),
-                "coverage": parts[3],
-                "missing_lines": parts[4] if len(parts) > 4 else ""
-            })
-
-    return results
+    parts = context.split('.')
+    for end in range(len(parts) - 1, 0, -1):
+        rel_path = modules.get('.'.join(parts[:end]))
+        if rel_path is not None:
+            return '::'.join([rel_path, *parts[end:]])
+    return context
@@ -1,14 +1,15 @@
-import subprocess
 import re
 from typing import Dict, List
 
+from CodeReview.process import run_command
+
 def run_hypothesis(test_path: str) -> Dict:
     """
     Run pytest on test_path (with Hypothesis tests inside) and parse the output.
     Returns test summary info and any hypothesis failure details.
     """
     # Run pytest with verbose output and capture
-    result = subprocess.run(
+    result = run_command(
         ['pytest', '-v', test_path],
         capture_output=True,
         text=True
@@ -1,53 +1,159 @@
-import subprocess
-import json
-import re
-from typing import List, Dict
+import os
+import tempfile
+from collections import deque
+from typing import IO, List, Dict, Optional
+from xml.etree import ElementTree
 
+from CodeReview.process import run_command
 
-def run_pytest(path: str) -> List[Dict]:
+# Lines of pytest's console output kept to explain a run that wrote no report.
+OUTPUT_TAIL = 20
+
+# Outcome of a JUnit <testcase> by its child element; no child means it passed.
+_OUTCOMES = {'failure': 'FAILED', 'error': 'ERROR', 'skipped': 'SKIPPED'}
+
+# Summary count of each status.
+_COUNTS = {'PASSED': 'passed', 'FAILED': 'failed', 'SKIPPED': 'skipped', 'ERROR': 'errors'}
+
+
+def run_pytest(path: str, tests: Optional[List[str]] = None) -> List[Dict]:
     """
     Run pytest on the specified path and return structured results.
+
+    The results are read from the JUnit XML report pytest writes, not from
+    its console output, which is only kept (its last lines) to explain a
+    run that wrote no report.
+
+    Args:
+        path (str): Root folder of the project.
+        tests (List[str], optional): Only run these tests: pytest node ids
+            relative to path, or test files.
+
+    Returns:
+        list: One {"status", "test", "time"} dict per test, with its node
+              id relative to path, plus "reason" for tests that did not
+              pass, followed by a {"summary": {...}} dict with the counts of
+              each outcome, the total time and pytest's exit code; or a
+              single {"error": ...} dict if pytest wrote no report.
     """
-    result = subprocess.run(
-        ['pytest', '--tb=short', '--maxfail=5', path],
-        capture_output=True,
-        text=True
-    )
-    return parse_pytest_output(result.stdout + result.stderr)
+    # pytest runs in the project, so the paths it is given must not be relative to here
+    path = os.path.abspath(path)
+    targets = [os.path.join(path, test) for test in tests] if tests else [path]
+    with tempfile.TemporaryDirectory(prefix='code-analyzer-pytest-') as tmp_dir:
+        report_path = os.path.join(tmp_dir, 'junit.xml')
+        result = run_command(
+            # xunit1 records the file of every test, from which node ids are
+            # rebuilt; with the project as rootdir they are relative to it,
+            # like the ids of the coverage test map and of `tests`
+            ['pytest', '--tb=short', '--maxfail=5', f'--junitxml={report_path}', '-o', 'junit_family=xunit1',
+             f'--rootdir={path}', *targets],
+            capture_output=True,
+            text=True,
+            parse_stdout=_output_tail,
+            cwd=path,
+        )
+        if not os.path.exists(report_path) or not os.path.getsize(report_path):
+            return [{"error": f"pytest exited with status {result.returncode} without a report",
+                     "output": "".join(result.stdout) + result.stderr}]
+        with open(report_path, 'rb') as report:
+            results = parse_junit_xml(report)
+    results[-1]["summary"]["exit_code"] = result.returncode
+    return results
+
+
+def _output_tail(stream: IO[str]) -> deque:
+    """Keep the last lines of pytest's console output."""
+    return deque(stream, maxlen=OUTPUT_TAIL)
+
 
+def _node_id(testcase: ElementTree.Element) -> str:
+    """Rebuild the pytest node id of a JUnit <testcase> written with junit_family=xunit1."""
+    file = testcase.get('file')
+    classname = testcase.get('classname', '')
+    name = testcase.get('name', '')
+    if not classname:
+        # A collection error, named after the module
+        return file or name
+    module = os.path.splitext(file)[0].replace('/', '.').replace('\\', '.')
+    classes = classname[len(module) + 1:] if classname.startswith(module + '.') else ''
+    return '::'.join([file, *filter(None, classes.split('.')), name])
 
-def parse_pytest_output(output: str) -> List[Dict]:
+
+def parse_junit_xml(source) -> List[Dict]:
     """
-    Parses pytest output into a list of dictionaries with test results.
+    Parses a JUnit XML report of pytest into a list of test results,
+    streaming over the <testcase> elements so large reports are never held
+    as a whole tree.
+
+    Args:
+        source: Path or binary file object of the report.
     """
     results = []
-    current_test = None
-
-    for line in output.splitlines():
-        if re.match(r"^FAILED .*::.* - .*", line):
-            parts = line.split(" - ")
-            if len(parts) == 2:
-                results.append({
-                    "status": "FAILED",
-                    "test": parts[0].strip(),
-                    "reason": parts[1].strip()
-                })
-        elif re.match(r"^PASSED .*", line):
-            results.append({
-                "status": "PASSED",
-                "test": line.strip()
-            })
-        elif re.match(r"^ERROR .*::.*", line):
-            results.append({
-                "status": "ERROR",
-                "test": line.strip()
-            })
-
-    # Optional summary match
-    summary_match = re.search(r"==+ (.+) ==+", output)
-    if summary_match:
-        results.append({
-            "summary": summary_match.group(1).strip()
-        })
+    summary = {"passed": 0, "failed": 0, "skipped": 0, "errors": 0, "time": 0.0}
+
+    for _, element in ElementTree.iterparse(source):
+        if element.tag == 'testsuite':
+            summary["time"] = round(summary["time"] + float(element.get('time') or 0), 6)
+            continue
+        if element.tag != 'testcase':
+            continue
+        outcome = next((child for child in element if child.tag in _OUTCOMES), None)
+        entry = {
+            "status": _OUTCOMES[outcome.tag] if outcome is not None else "PASSED",
+            "test": _node_id(element),
+            "time": float(element.get('time') or 0),
+        }
+        if outcome is not None:
+            details = (outcome.text or '').strip()
+            entry["reason"] = outcome.get('message') or (details.splitlines()[-1] if details else '')
+        results.append(entry)
+        summary[_COUNTS[entry["status"]]] += 1
+        # Processed testcases are dropped from the tree being built
+        element.clear()
 
+    results.append({"summary": summary})
     return results
+
+
+def merge_results(baseline: List[Dict], fresh: List[Dict], test_files, rerun_files=()) -> List[Dict]:
+    """
+    Merge the results of a run of selected tests into those of a previous run.
+
+    Tests run again replace their previous entry by node id, new tests are
+    appended, and the summary counts are recomputed from the merged list.
+    A previous test is dropped if its file is no longer in `test_files` or
+    was run again as a whole (so tests removed from it go away).
+
+    Args:
+        baseline (list): Results of the previous run, as run_pytest returns them.
+        fresh (list): Results of the run of the selected tests.
+        test_files (set): Current files of the project, relative to its
+            root with '/' separators.
+        rerun_files (Iterable[str]): Test files run as a whole this time.
+
+    Returns:
+        list: The merged results, or `fresh` if either run wrote no report.
+    """
+    if not (baseline and 'summary' in baseline[-1] and fresh and 'summary' in fresh[-1]):
+        return fresh
+    rerun_files = set(rerun_files)
+    entries = {entry["test"]: entry for entry in fresh[:-1]}
+    merged = []
+    for entry in baseline[:-1]:
+        test_file = entry["test"].partition('::')[0]
+        if entry["test"] in entries:
+            merged.append(entries.pop(entry["test"]))
+        elif test_file in test_files and test_file not in rerun_files:
+            merged.append(entry)
+    merged.extend(entries.values())
+
+    summary = {"passed": 0, "failed": 0, "skipped": 0, "errors": 0, "time": 0.0}
+    for entry in merged:
+        summary[_COUNTS[entry["status"]]] += 1
+        summary["time"] += entry["time"]
+    summary["time"] = round(summary["time"], 6)
+    # A failure kept from the previous run still fails the suite
+    exit_code = fresh[-1]["summary"].get("exit_code", 0)
+    summary["exit_code"] = exit_code or int(bool(summary["failed"] or summary["errors"]))
+    merged.append({"summary": summary})
+    return merged
@@ -0,0 +1,47 @@
+# CodeReview/batching.py
+import os
+from typing import Dict, Iterator, List
+
+# Files per tool invocation in batched mode. Keeps command lines well below
+# platform argument limits while still amortising interpreter start-up.
+DEFAULT_CHUNK_SIZE = 100
+
+
+def normalize_path(path: str) -> str:
+    """
+    Normalize a path so tool output can be matched against the requested files.
+    """
+    return os.path.normcase(os.path.abspath(path)).replace("\\", "/").strip()
+
+
+def chunked(items: List[str], size: int = DEFAULT_CHUNK_SIZE) -> Iterator[List[str]]:
+    """
+    Yield consecutive slices of `items` with at most `size` entries each.
+    """
+    size = max(1, size or len(items))
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def shard_by_file(issues: List[Dict], file_paths: List[str], key: str = "file") -> Dict[str, List[Dict]]:
+    """
+    Split a project-wide issue list into per-file lists.
+
+    Args:
+        issues (List[Dict]): Parsed issues; each one names its file under `key`.
+        file_paths (List[str]): The paths the tool was invoked with.
+        key (str): Issue field holding the file path.
+
+    Returns:
+        dict: Maps every entry of `file_paths` to its issues (possibly empty).
+              Issues that do not belong to a requested file are dropped.
+    """
+    lookup = {normalize_path(path): path for path in file_paths}
+    sharded = {path: [] for path in file_paths}
+
+    for issue in issues:
+        target = lookup.get(normalize_path(issue.get(key) or ""))
+        if target is not None:
+            sharded[target].append(issue)
+
+    return sharded
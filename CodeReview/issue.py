@@ -0,0 +1,151 @@
+# CodeReview/issue.py
+import sys
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+# Compact records of the issues the linters report.
+#
+# A report of a large legacy code base holds millions of issues. As plain
+# dicts every issue carries a hash table and its own copy of the file path;
+# these slotted records store only their values, and the strings repeated
+# across issues (file paths, message codes, severities) are interned, so
+# every issue of a file shares one path object. Records are converted to
+# the dicts they replace only when a report is serialized, see to_json().
+
+
+class Issue:
+    """
+    Base of the issue records.
+
+    Records read like the dicts they replace: issue["line"], issue.get(...),
+    "code" in issue and dict(issue) all work, with the keys in the order
+    the dicts had.
+    """
+
+    __slots__ = ()
+    # Fields holding strings repeated across issues, interned on creation
+    _INTERNED: Tuple[str, ...] = ('file',)
+    # Fields left out of the dict form when they are None
+    _OPTIONAL: Tuple[str, ...] = ()
+
+    def __post_init__(self):
+        for name in self._INTERNED:
+            value = getattr(self, name)
+            if type(value) is str:
+                object.__setattr__(self, name, sys.intern(value))
+
+    def __reduce__(self):
+        # Values only, and interned again in the receiving process
+        return type(self), tuple(getattr(self, name) for name in self.__slots__)
+
+    def keys(self) -> Iterator[str]:
+        return (name for name in self.__slots__
+                if name not in self._OPTIONAL or getattr(self, name) is not None)
+
+    def items(self) -> Iterator[Tuple[str, Any]]:
+        return ((name, getattr(self, name)) for name in self.keys())
+
+    def to_dict(self) -> Dict[str, Any]:
+        values = {name: getattr(self, name) for name in self.__slots__}
+        for name in self._OPTIONAL:
+            if values[name] is None:
+                del values[name]
+        return values
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self.__slots__ and (key not in self._OPTIONAL or getattr(self, key) is not None):
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self.__slots__ and (key not in self._OPTIONAL or getattr(self, key) is not None)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self[key] if key in self else default
+
+
+@dataclass(slots=True)
+class LintIssue(Issue):
+    """An issue of flake8 or one of its plugins (e.g. pep8-naming)."""
+    file: str
+    line: int
+    column: int
+    code: str
+    message: str
+
+    _INTERNED = ('file', 'code')
+
+
+@dataclass(slots=True)
+class PylintIssue(Issue):
+    """A message of pylint."""
+    file: str
+    line: int
+    column: int
+    message_id: str
+    symbol: str
+    message: str
+
+    _INTERNED = ('file', 'message_id', 'symbol')
+
+
+@dataclass(slots=True)
+class MypyIssue(Issue):
+    """An error or note of mypy; `code` is only present for errors with an error code."""
+    file: str
+    line: int
+    type: str
+    message: str
+    code: Optional[str] = None
+
+    _INTERNED = ('file', 'type', 'code')
+    _OPTIONAL = ('code',)
+
+
+@dataclass(slots=True)
+class BanditIssue(Issue):
+    """A finding of bandit."""
+    file: str
+    line: int
+    issue_severity: str
+    issue_confidence: str
+    issue_text: str
+    test_name: str
+    test_id: str
+
+    # Every finding of a test has the same text
+    _INTERNED = ('file', 'issue_severity', 'issue_confidence', 'issue_text', 'test_name', 'test_id')
+
+
+@dataclass(slots=True)
+class DocstringIssue(Issue):
+    """A docstring of `function` that does not match its signature (darglint)."""
+    file: str
+    line: int
+    code: str
+    function: str
+    message: str
+
+    _INTERNED = ('file', 'code', 'function')
+
+
+@dataclass(slots=True)
+class SpellingIssue(Issue):
+    """A misspelled word in a comment or string."""
+    file: str
+    line: int
+    word: str
+    suggestion: Optional[str]
+    source: str
+
+    _INTERNED = ('file', 'word', 'suggestion', 'source')
+
+
+def to_json(value: Any) -> Dict[str, Any]:
+    """
+    `default` hook of json.dump()/json.dumps() that writes issue records as
+    the dicts they replace, e.g. json.dump(report, f, default=to_json).
+    """
+    if isinstance(value, Issue):
+        return value.to_dict()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
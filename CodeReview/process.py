@@ -0,0 +1,471 @@
+# CodeReview/process.py
+import locale
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar, copy_context
+from typing import IO, TYPE_CHECKING, Any, Callable, Dict, Iterator, List, Optional
+
+if TYPE_CHECKING:
+    # asyncio is imported on first use; it is slow to import and only the
+    # asyncio engine needs it
+    import asyncio
+
+# Resource usage of the child processes started through `run_command` while
+# a `measure()` block is active in this thread or task.
+_child_usage: ContextVar[Optional[List[Dict]]] = ContextVar('child_usage', default=None)
+
+# Tool-specific counters of the enclosing `measure()` block, see `record_counters`.
+_counters: ContextVar[Optional[Dict]] = ContextVar('counters', default=None)
+
+# Event loop that `run_command` starts subprocesses on instead of blocking,
+# set for the runners the asyncio engine runs in its worker threads.
+_subprocess_loop: ContextVar[Optional['asyncio.AbstractEventLoop']] = ContextVar('subprocess_loop', default=None)
+
+# Resource limits of the enclosing `limit()` block: wall-clock deadline,
+# CPU seconds and address space bytes of each subprocess, and whether the
+# block has run out of time.
+_limits: ContextVar[Optional[Dict]] = ContextVar('limits', default=None)
+
+# Run by `run_command` in front of a command with CPU or memory limits: sets
+# the soft limits (the hard limits stay as they are) and execs the command.
+_RLIMIT_LAUNCHER = '''
+import os, resource, sys
+for kind, value in ((resource.RLIMIT_CPU, sys.argv[1]), (resource.RLIMIT_AS, sys.argv[2])):
+    if int(value):
+        hard = resource.getrlimit(kind)[1]
+        resource.setrlimit(kind, (int(value) if hard == resource.RLIM_INFINITY else min(int(value), hard), hard))
+os.execvp(sys.argv[3], sys.argv[3:])
+'''
+
+# ru_maxrss is reported in kilobytes on Linux and in bytes on macOS.
+_MAXRSS_UNIT = 1 if sys.platform == 'darwin' else 1024
+
+
+class ToolTimeout(subprocess.TimeoutExpired):
+    """
+    Raised when a tool run exceeds the wall-clock timeout of its `limit()`
+    block. `cmd` is the command that was killed, None if the timeout hit
+    code running in-process.
+    """
+
+    def __init__(self, cmd=None, timeout=None, output=None, stderr=None):
+        # Defaults, so the class can also be raised asynchronously in a thread
+        super().__init__(cmd, timeout, output, stderr)
+
+
+def _drain(stream: IO) -> None:
+    """Read `stream` to the end without keeping what was read."""
+    while stream.read(1 << 16):
+        pass
+
+
+def _read_pipes(proc: subprocess.Popen, input=None, parse_stdout: Optional[Callable[[IO], Any]] = None) -> tuple:
+    """
+    Read stdout and stderr of `proc` to the end without reaping it.
+
+    Both pipes are drained on their own thread so neither can fill up and
+    block the child, the same way Popen.communicate() does. With
+    `parse_stdout`, stdout is handed to it as a stream while the child
+    writes, and what it returns is taken as the output. The parser runs in
+    the caller's context, so it can record counters for its measure() block.
+
+    Raises:
+        Exception: What `parse_stdout` raised, once both pipes are drained.
+    """
+    output = {}
+    errors = []
+    context = copy_context()
+
+    def read(name, stream):
+        try:
+            if name == 'stdout' and parse_stdout is not None:
+                output[name] = context.run(parse_stdout, stream)
+                # Whatever the parser left, so the child is not blocked
+                _drain(stream)
+            else:
+                output[name] = stream.read()
+        except BaseException as e:
+            errors.append(e)
+            _drain(stream)
+        finally:
+            stream.close()
+
+    threads = [
+        threading.Thread(target=read, args=(name, stream), daemon=True)
+        for name, stream in (('stdout', proc.stdout), ('stderr', proc.stderr)) if stream is not None
+    ]
+    for thread in threads:
+        thread.start()
+    if proc.stdin is not None:
+        try:
+            if input is not None:
+                proc.stdin.write(input)
+            proc.stdin.close()
+        except BrokenPipeError:
+            pass
+    for thread in threads:
+        thread.join()
+    if errors:
+        raise errors[0]
+    return output.get('stdout'), output.get('stderr')
+
+
+def record_usage(exit_code: Optional[int], cpu: Optional[float], max_rss: Optional[int]) -> None:
+    """
+    Record the exit code, CPU seconds and peak RSS in bytes of a child
+    process (or of work done in one) for the enclosing `measure()` block.
+    """
+    children = _child_usage.get()
+    if children is not None:
+        children.append({'exit_code': exit_code, 'cpu': cpu, 'max_rss': max_rss})
+
+
+def record_counters(name: str, counts: Dict[str, int]) -> None:
+    """
+    Add tool-specific counters (e.g. incremental cache hits) to the enclosing
+    `measure()` block, which reports them as metrics[name]. Counters
+    recorded under the same name are summed.
+    """
+    counters = _counters.get()
+    if counters is not None:
+        totals = counters.setdefault(name, {})
+        for key, count in counts.items():
+            totals[key] = totals.get(key, 0) + count
+
+
+def current_limits() -> Optional[Dict]:
+    """
+    Return the limits of the enclosing `limit()` block as keyword arguments
+    of `limit()`, with the time that is left as the timeout, or None outside
+    of one. Used to carry the limits over into another process.
+    """
+    budget = _limits.get()
+    if budget is None:
+        return None
+    timeout = None
+    if budget['deadline'] is not None:
+        timeout = max(budget['deadline'] - time.monotonic(), 0.001)
+    return {'timeout': timeout, 'cpu': budget['cpu'], 'memory': budget['memory']}
+
+
+def mark_timed_out() -> None:
+    """Record that the enclosing `limit()` block ran out of time."""
+    budget = _limits.get()
+    if budget is not None:
+        budget['timed_out'] = True
+
+
+def set_subprocess_loop(loop: Optional['asyncio.AbstractEventLoop']) -> None:
+    """
+    Make `run_command` calls in the current context start their subprocesses
+    with asyncio.create_subprocess_exec() on `loop`, which must be running
+    in another thread. None restores blocking subprocesses.
+    """
+    _subprocess_loop.set(loop)
+
+
+def _parse_buffered(parse_stdout: Optional[Callable[[IO], Any]], stdout):
+    """Hand output that was read whole to `parse_stdout` as a stream, where streaming is not available."""
+    if parse_stdout is None or stdout is None:
+        return stdout
+    import io
+
+    return parse_stdout(io.StringIO(stdout) if isinstance(stdout, str) else io.BytesIO(stdout))
+
+
+def _decode(data: Optional[bytes]) -> Optional[str]:
+    """Decode subprocess output the way text-mode Popen does, with universal newlines."""
+    if data is None:
+        return None
+    return data.decode(locale.getpreferredencoding(False)).replace('\r\n', '\n').replace('\r', '\n')
+
+
+def _kill(proc) -> None:
+    """Kill `proc` and, if it leads its own session, every process it started."""
+    try:
+        if hasattr(os, 'killpg') and proc.pid == os.getpgid(proc.pid):
+            os.killpg(proc.pid, signal.SIGKILL)
+        else:
+            proc.kill()
+    except (ProcessLookupError, PermissionError):
+        # Already gone
+        pass
+
+
+def _interrupt_thread(thread_id: int, timeout: float, budget: Dict, stop: threading.Event) -> None:
+    """
+    Raise ToolTimeout once in the thread `thread_id` after `timeout`
+    seconds, unless `stop` is set first.
+
+    The exception is delivered between two bytecodes (CPython only), so a
+    thread blocked in a C call is only interrupted once the call returns.
+    """
+    import ctypes
+
+    if not stop.wait(timeout):
+        budget['timed_out'] = True
+        ctypes.pythonapi.PyThreadState_SetAsyncExc(ctypes.c_ulong(thread_id), ctypes.py_object(ToolTimeout))
+
+
+def _with_limits(args, kwargs, timeout):
+    """
+    Apply the limits of the enclosing `limit()` block to a command.
+
+    Returns:
+        tuple: (args, kwargs, timeout) to start the command with. The
+        timeout is the earlier of `timeout` and the block's deadline. A
+        command with a timeout starts its own session so that it can be
+        killed together with its children, and a command with CPU or memory
+        limits runs behind _RLIMIT_LAUNCHER (POSIX only).
+    """
+    budget = _limits.get()
+    if budget is None:
+        return args, kwargs, timeout
+    if budget['deadline'] is not None:
+        remaining = max(budget['deadline'] - time.monotonic(), 0.0)
+        timeout = remaining if timeout is None else min(timeout, remaining)
+    if (budget['cpu'] or budget['memory']) and os.name == 'posix':
+        args = [sys.executable, '-S', '-c', _RLIMIT_LAUNCHER,
+                str(int(budget['cpu'] or 0)), str(int(budget['memory'] or 0)), *args]
+    if timeout is not None and os.name == 'posix':
+        kwargs = dict(kwargs, start_new_session=True)
+    return args, kwargs, timeout
+
+
+async def run_command_async(args, capture_output: bool = False, text: bool = False, input=None,
+                            timeout: Optional[float] = None, parse_stdout: Optional[Callable[[IO], Any]] = None,
+                            **kwargs) -> subprocess.CompletedProcess:
+    """
+    Run a command with asyncio.create_subprocess_exec(); the awaitable
+    counterpart of `run_command`, without the `check` argument. The output
+    is read whole before `parse_stdout` sees it.
+
+    Raises:
+        ToolTimeout: If the command is still running after `timeout` seconds.
+    """
+    import asyncio
+
+    if capture_output:
+        kwargs['stdout'] = kwargs['stderr'] = subprocess.PIPE
+    if input is not None:
+        kwargs['stdin'] = subprocess.PIPE
+        if text:
+            input = input.encode(locale.getpreferredencoding(False))
+    proc = await asyncio.create_subprocess_exec(*args, **kwargs)
+    try:
+        stdout, stderr = await asyncio.wait_for(proc.communicate(input), timeout)
+    except asyncio.TimeoutError:
+        _kill(proc)
+        await proc.wait()
+        raise ToolTimeout(args, timeout) from None
+    if text:
+        stdout, stderr = _decode(stdout), _decode(stderr)
+    return subprocess.CompletedProcess(args, proc.returncode, _parse_buffered(parse_stdout, stdout), stderr)
+
+
+def run_command(args, capture_output: bool = False, text: bool = False, check: bool = False,
+                input=None, timeout: Optional[float] = None, parse_stdout: Optional[Callable[[IO], Any]] = None,
+                **kwargs) -> subprocess.CompletedProcess:
+    """
+    Drop-in replacement for subprocess.run() used by every runner.
+
+    Besides running the command it records the child's exit code, CPU time
+    and peak RSS for the enclosing `measure()` block, if any. CPU time and
+    peak RSS come from wait4() and are only available on POSIX systems.
+    Within a `limit()` block the command is killed, with every process it
+    started, once the block's deadline passes, and runs with the block's
+    CPU and memory limits.
+
+    With `parse_stdout` (and capture_output), the child's stdout is passed
+    to it as a stream (lines of text with text=True) that it reads while
+    the child runs, and the returned value is the result's stdout. Large
+    outputs are then parsed as they arrive instead of being buffered whole.
+
+    Under the asyncio engine (see `set_subprocess_loop`) the command runs
+    on the engine's event loop instead, and only its exit code is recorded.
+
+    Raises:
+        subprocess.CalledProcessError: If `check` is set and the command fails.
+        ToolTimeout: If the command runs out of time.
+    """
+    args, kwargs, timeout = _with_limits(args, kwargs, timeout)
+    timed_out = False
+    loop = _subprocess_loop.get()
+    if loop is not None:
+        import asyncio
+
+        future = asyncio.run_coroutine_threadsafe(
+            run_command_async(args, capture_output=capture_output, text=text, input=input,
+                              timeout=timeout, parse_stdout=parse_stdout, **kwargs), loop
+        )
+        try:
+            completed = future.result()
+            returncode, stdout, stderr = completed.returncode, completed.stdout, completed.stderr
+        except ToolTimeout:
+            timed_out = True
+            returncode = stdout = stderr = None
+        cpu = max_rss = None
+    else:
+        if capture_output:
+            kwargs['stdout'] = kwargs['stderr'] = subprocess.PIPE
+        if input is not None:
+            kwargs['stdin'] = subprocess.PIPE
+
+        if hasattr(os, 'wait4'):
+            with subprocess.Popen(args, text=text, **kwargs) as proc:
+                expired = threading.Event()
+                timer = None
+                if timeout is not None:
+                    timer = threading.Timer(timeout, lambda: (expired.set(), _kill(proc)))
+                    timer.daemon = True
+                    timer.start()
+                try:
+                    stdout, stderr = _read_pipes(proc, input, parse_stdout if capture_output else None)
+                    _, status, usage = os.wait4(proc.pid, 0)
+                except BaseException:
+                    # Interrupted, e.g. by the in-process timeout of `limit()`:
+                    # the child is killed but still accounted for
+                    _kill(proc)
+                    _, status, usage = os.wait4(proc.pid, 0)
+                    proc.returncode = os.waitstatus_to_exitcode(status)
+                    record_usage(proc.returncode, usage.ru_utime + usage.ru_stime, usage.ru_maxrss * _MAXRSS_UNIT)
+                    raise
+                finally:
+                    if timer is not None:
+                        timer.cancel()
+                # Setting the return code keeps Popen from waiting for the reaped child
+                proc.returncode = os.waitstatus_to_exitcode(status)
+            timed_out = expired.is_set()
+            cpu = usage.ru_utime + usage.ru_stime
+            max_rss = usage.ru_maxrss * _MAXRSS_UNIT
+        else:
+            with subprocess.Popen(args, text=text, **kwargs) as proc:
+                try:
+                    stdout, stderr = proc.communicate(input, timeout)
+                except subprocess.TimeoutExpired:
+                    _kill(proc)
+                    stdout, stderr = proc.communicate()
+                    timed_out = True
+            stdout = _parse_buffered(parse_stdout if capture_output else None, stdout)
+            cpu = max_rss = None
+        returncode = proc.returncode
+
+    record_usage(returncode, cpu, max_rss)
+
+    if timed_out:
+        # Recorded even if the runner swallows the exception
+        mark_timed_out()
+        raise ToolTimeout(args, timeout, stdout, stderr)
+    if check and returncode:
+        raise subprocess.CalledProcessError(returncode, args, stdout, stderr)
+    return subprocess.CompletedProcess(args, returncode, stdout, stderr)
+
+
+@contextmanager
+def limit(timeout: Optional[float] = None, cpu: Optional[float] = None,
+          memory: Optional[int] = None) -> Iterator[Dict]:
+    """
+    Bound the resources of the work done inside the with-block.
+
+    Every `run_command` call in the block is killed once `timeout` seconds
+    have passed since the block was entered, and each subprocess is limited
+    to `cpu` CPU seconds (RLIMIT_CPU) and `memory` bytes of address space
+    (RLIMIT_AS). Code running in-process is interrupted by a ToolTimeout,
+    raised from SIGALRM in the main thread of a POSIX process (the serial
+    analysis and the worker processes) and asynchronously in other threads
+    on CPython (the asyncio engine); elsewhere only subprocesses are bounded.
+
+    Yields a dict whose 'timed_out' entry is set once the block has run out
+    of time, even if a runner caught the ToolTimeout.
+    """
+    budget = {
+        'deadline': time.monotonic() + timeout if timeout else None,
+        'cpu': cpu,
+        'memory': memory,
+        'timed_out': False,
+    }
+    token = _limits.set(budget)
+    alarm = (bool(timeout) and hasattr(signal, 'setitimer')
+             and threading.current_thread() is threading.main_thread())
+    watcher = None
+    if alarm:
+        def expire(signum, frame):
+            # Delivered once: a second timeout could land in the runner's
+            # cleanup, e.g. while a killed child is being reaped
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            budget['timed_out'] = True
+            raise ToolTimeout(None, timeout)
+
+        previous = signal.signal(signal.SIGALRM, expire)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    elif timeout and sys.implementation.name == 'cpython':
+        thread_id = threading.get_ident()
+        stop = threading.Event()
+        watcher = threading.Thread(target=_interrupt_thread, args=(thread_id, timeout, budget, stop),
+                                   name='code-analyzer-timeout', daemon=True)
+        watcher.start()
+    try:
+        yield budget
+    finally:
+        if alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, previous)
+        if watcher is not None:
+            stop.set()
+            watcher.join()
+            if budget['timed_out']:
+                import ctypes
+
+                # Drop a timeout that was raised but not yet delivered
+                ctypes.pythonapi.PyThreadState_SetAsyncExc(ctypes.c_ulong(thread_id), None)
+        _limits.reset(token)
+
+
+@contextmanager
+def measure() -> Iterator[Dict]:
+    """
+    Measure the work done inside the with-block, including its subprocesses.
+
+    Yields a dict that is filled in when the block exits:
+        wall (float): Elapsed seconds.
+        cpu (float): CPU seconds of this thread plus its subprocesses.
+        max_rss (int | None): Peak RSS in bytes of the largest subprocess,
+            None if no subprocess ran (or the platform cannot tell).
+        exit_code (int | None): The first non-zero subprocess exit code, 0
+            if all succeeded, None if no subprocess ran.
+        subprocesses (int): Number of subprocesses started.
+        worker (str): "pid:thread" the block ran in, which identifies the
+            pool worker.
+    plus the counters recorded with `record_counters`, if any.
+    """
+    metrics = {}
+    children = []
+    counters = {}
+    token = _child_usage.set(children)
+    counters_token = _counters.set(counters)
+    wall_start = time.perf_counter()
+    # Thread CPU time, so runs in concurrent threads are told apart
+    cpu_start = time.thread_time()
+    try:
+        yield metrics
+    finally:
+        wall = time.perf_counter() - wall_start
+        cpu = time.thread_time() - cpu_start
+        _child_usage.reset(token)
+        _counters.reset(counters_token)
+        rss = [child['max_rss'] for child in children if child['max_rss'] is not None]
+        exit_codes = [child['exit_code'] for child in children]
+        metrics.update(
+            wall=round(wall, 6),
+            cpu=round(cpu + sum(child['cpu'] or 0.0 for child in children), 6),
+            max_rss=max(rss) if rss else None,
+            exit_code=next((code for code in exit_codes if code), 0) if exit_codes else None,
+            subprocesses=len(children),
+            worker=f"{os.getpid()}:{threading.current_thread().name}",
+        )
+        metrics.update(counters)
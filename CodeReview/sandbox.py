@@ -0,0 +1,267 @@
+# CodeReview/sandbox.py
+import multiprocessing
+import multiprocessing.util
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional
+
+from CodeReview.process import ToolTimeout, current_limits, mark_timed_out, record_usage
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Modules imported once by the fork server, so that every sandbox worker
+# starts with the profilers and their libraries already loaded.
+PRELOAD = [
+    'CodeReview.source_unit',
+    'CodeReview.PerformanceAndEfficiency.cprofile_runner',
+    'CodeReview.PerformanceAndEfficiency.line_profiler_runner',
+    'CodeReview.PerformanceAndEfficiency.memory_profiler_runner',
+]
+
+# Tasks a worker runs before it is replaced by a fresh one. Profiled code
+# leaves modules, sys.path entries and garbage behind; recycling bounds how
+# much of it later measurements see.
+DEFAULT_MAX_TASKS = 20
+
+# ru_maxrss is reported in kilobytes on Linux and in bytes on macOS.
+_MAXRSS_UNIT = 1 if sys.platform == 'darwin' else 1024
+
+
+class SandboxError(RuntimeError):
+    """Raised when a sandboxed call fails or its worker process dies."""
+
+
+def _usage() -> tuple:
+    """CPU seconds used by this process and its children so far, and its peak RSS in bytes."""
+    if resource is None:
+        return time.process_time(), None
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    cpu = own.ru_utime + own.ru_stime + children.ru_utime + children.ru_stime
+    return cpu, own.ru_maxrss * _MAXRSS_UNIT
+
+
+@contextmanager
+def _rlimits(cpu: Optional[float], memory: Optional[int]) -> Iterator[None]:
+    """
+    Lower the soft CPU and address space limits of this worker for one task
+    and restore them afterwards. The CPU limit counts from now on.
+    """
+    changed = []
+    if resource is not None:
+        if cpu:
+            used = resource.getrusage(resource.RUSAGE_SELF)
+            changed.append((resource.RLIMIT_CPU, int(used.ru_utime + used.ru_stime + cpu) + 1))
+        if memory:
+            changed.append((resource.RLIMIT_AS, int(memory)))
+    previous = []
+    for kind, value in changed:
+        soft, hard = resource.getrlimit(kind)
+        previous.append((kind, soft, hard))
+        resource.setrlimit(kind, (value if hard == resource.RLIM_INFINITY else min(value, hard), hard))
+    try:
+        yield
+    finally:
+        for kind, soft, hard in previous:
+            resource.setrlimit(kind, (soft, hard))
+
+
+def _serve(conn, max_tasks: int) -> None:
+    """
+    Main loop of a sandbox worker: run up to `max_tasks` calls sent over
+    `conn` and reply with (status, value, cpu, max_rss) for each.
+    """
+    for _ in range(max_tasks):
+        try:
+            fn, args, kwargs, limits = conn.recv()
+        except EOFError:
+            return
+        cpu_start, _ = _usage()
+        with _rlimits(limits.get('cpu'), limits.get('memory')):
+            try:
+                reply = ('ok', fn(*args, **kwargs))
+            except Exception as e:
+                reply = ('error', f"{type(e).__name__}: {e}")
+        cpu_end, max_rss = _usage()
+        try:
+            conn.send((*reply, cpu_end - cpu_start, max_rss))
+        except Exception as e:
+            conn.send(('error', f"Result could not be returned: {e}", cpu_end - cpu_start, max_rss))
+
+
+class _Worker:
+    """One sandbox worker process and the parent's end of its pipe."""
+
+    def __init__(self, context, max_tasks: int):
+        self.conn, child_conn = context.Pipe()
+        # Not a daemon: memory_profiler starts a process of its own
+        self.process = context.Process(target=_serve, args=(child_conn, max_tasks),
+                                       name='code-analyzer-sandbox')
+        self.process.start()
+        child_conn.close()
+        self.tasks_left = max_tasks
+
+    def close(self, kill: bool = False) -> None:
+        if kill:
+            self.process.kill()
+        self.conn.close()
+        self.process.join()
+
+
+class SandboxPool:
+    """
+    Pool of isolated worker processes that run calls for this process.
+
+    Workers are started on demand, up to `workers` at a time, from a fork
+    server that has already imported the `preload` modules (a fresh
+    interpreter where fork servers are not available), so starting one costs
+    a fork rather than an interpreter start-up and imports. Each worker runs
+    one call at a time and is replaced after `max_tasks` calls, so state
+    left behind by profiled code does not leak into later measurements.
+
+    Calls honour the enclosing CodeReview.process.limit() block: a worker
+    that runs out of time is killed, and the CPU and memory limits apply to
+    the worker for the duration of the call.
+    """
+
+    def __init__(self, workers: Optional[int] = None, max_tasks: int = DEFAULT_MAX_TASKS,
+                 preload: Optional[List[str]] = None):
+        self.workers = workers or os.cpu_count()
+        self.max_tasks = max_tasks
+        if 'forkserver' in multiprocessing.get_all_start_methods():
+            self._context = multiprocessing.get_context('forkserver')
+            self._context.set_forkserver_preload(PRELOAD if preload is None else preload)
+        else:
+            self._context = multiprocessing.get_context('spawn')
+        self.pid = os.getpid()
+        self._idle = []
+        self._size = 0
+        self._available = threading.Condition()
+        self._closed = False
+        # Runs before multiprocessing joins the workers at interpreter exit,
+        # including in pool worker processes, where atexit handlers do not run.
+        multiprocessing.util.Finalize(self, self.shutdown, exitpriority=10)
+
+    def _acquire(self) -> _Worker:
+        with self._available:
+            while not self._closed and not self._idle and self._size >= self.workers:
+                self._available.wait()
+            if self._closed:
+                raise SandboxError("sandbox pool is shut down")
+            if self._idle:
+                return self._idle.pop()
+            self._size += 1
+        try:
+            return _Worker(self._context, self.max_tasks)
+        except BaseException:
+            self._release(None)
+            raise
+
+    def _release(self, worker: Optional[_Worker], kill: bool = False) -> None:
+        """Return a worker to the pool, or retire it if it is used up, broken or killed."""
+        reusable = worker is not None and not kill and worker.tasks_left > 0 and worker.process.is_alive()
+        with self._available:
+            if reusable and not self._closed:
+                self._idle.append(worker)
+            else:
+                self._size -= 1
+            self._available.notify()
+        if worker is not None and not (reusable and not self._closed):
+            worker.close(kill=kill)
+
+    def run(self, fn: Callable, *args, **kwargs):
+        """
+        Call fn(*args, **kwargs) in a worker and return its result. `fn`,
+        its arguments and its result must be picklable.
+
+        The worker's CPU time and peak RSS are recorded for the enclosing
+        CodeReview.process.measure() block.
+
+        Raises:
+            ToolTimeout: If the enclosing limit() block runs out of time.
+            SandboxError: If the call raises or the worker dies, e.g. when
+                it exceeds its CPU limit.
+        """
+        limits = current_limits() or {}
+        worker = self._acquire()
+        kill = True
+        try:
+            try:
+                worker.conn.send((fn, args, kwargs, limits))
+                worker.tasks_left -= 1
+                if not worker.conn.poll(limits.get('timeout')):
+                    raise ToolTimeout(None, limits.get('timeout'))
+                status, value, cpu, max_rss = worker.conn.recv()
+            except ToolTimeout:
+                # Raised here or by the in-process timeout of limit()
+                record_usage(None, None, None)
+                mark_timed_out()
+                raise
+            except (EOFError, OSError):
+                # The worker died, e.g. killed for exceeding its CPU limit
+                worker.process.join()
+                record_usage(worker.process.exitcode, None, None)
+                raise SandboxError(f"sandbox worker exited with code {worker.process.exitcode}") from None
+            kill = False
+        finally:
+            # A worker interrupted mid-call (timeout, KeyboardInterrupt) is killed
+            self._release(worker, kill=kill)
+        record_usage(0 if status == 'ok' else 1, cpu, max_rss)
+        if status != 'ok':
+            raise SandboxError(value)
+        return value
+
+    def shutdown(self) -> None:
+        """Stop the idle workers; busy ones stop once their call returns."""
+        with self._available:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._size -= len(idle)
+            self._available.notify_all()
+        for worker in idle:
+            worker.close()
+
+
+_pool: Optional[SandboxPool] = None
+_pool_lock = threading.Lock()
+_pool_settings = {'workers': None, 'max_tasks': DEFAULT_MAX_TASKS}
+
+
+def configure_sandbox(workers: Optional[int] = None, max_tasks: int = DEFAULT_MAX_TASKS) -> None:
+    """
+    Set the size and recycling interval of this process' shared sandbox
+    pool; a running pool is shut down and replaced on next use.
+    """
+    global _pool
+    with _pool_lock:
+        _pool_settings.update(workers=workers, max_tasks=max_tasks)
+        pool, _pool = _pool, None
+    if pool is not None and pool.pid == os.getpid():
+        pool.shutdown()
+
+
+def sandbox_settings() -> Dict:
+    """Return the {'workers', 'max_tasks'} settings of this process' shared sandbox pool."""
+    with _pool_lock:
+        return dict(_pool_settings)
+
+
+def get_sandbox() -> SandboxPool:
+    """Return this process' shared sandbox pool, starting it on first use."""
+    global _pool
+    with _pool_lock:
+        # A pool inherited through fork() belongs to the parent
+        if _pool is None or _pool.pid != os.getpid():
+            _pool = SandboxPool(**_pool_settings)
+        return _pool
+
+
+def run_in_sandbox(fn: Callable, *args, **kwargs):
+    """Call fn(*args, **kwargs) in the shared sandbox pool, see SandboxPool.run."""
+    return get_sandbox().run(fn, *args, **kwargs)
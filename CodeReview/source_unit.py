@@ -0,0 +1,125 @@
+# CodeReview/source_unit.py
+import ast
+import bisect
+import hashlib
+import io
+import os
+import tokenize
+from functools import cached_property, lru_cache
+from typing import List, Optional, Set
+
+
+class SourceUnit:
+    """
+    A Python source file that is read once and parsed at most once.
+
+    In-process analyzers receive the same SourceUnit instead of opening and
+    parsing the file themselves. The raw bytes are read up front; the decoded
+    text, line offsets, token stream and AST are built on first access and
+    then shared.
+    """
+
+    def __init__(self, path: str, data: Optional[bytes] = None):
+        self.path = path
+        if data is None:
+            with open(path, 'rb') as f:
+                data = f.read()
+        self.data = data
+
+    @cached_property
+    def sha256(self) -> str:
+        """SHA-256 hex digest of the raw bytes."""
+        return hashlib.sha256(self.data).hexdigest()
+
+    @cached_property
+    def encoding(self) -> str:
+        """Source encoding, honouring PEP 263 coding cookies and BOMs."""
+        encoding, _ = tokenize.detect_encoding(io.BytesIO(self.data).readline)
+        return encoding
+
+    @cached_property
+    def text(self) -> str:
+        """Decoded source text."""
+        return self.data.decode(self.encoding)
+
+    @cached_property
+    def lines(self) -> List[str]:
+        """Source lines including their line endings."""
+        return self.text.splitlines(keepends=True)
+
+    @cached_property
+    def line_offsets(self) -> List[int]:
+        """Offset into `text` at which each (1-based) line starts, at index line - 1."""
+        offsets = [0]
+        for line in self.lines:
+            offsets.append(offsets[-1] + len(line))
+        return offsets
+
+    @cached_property
+    def tokens(self) -> List[tokenize.TokenInfo]:
+        """
+        Token stream of the source.
+
+        Raises:
+            tokenize.TokenError, SyntaxError: If the source cannot be tokenized.
+        """
+        return list(tokenize.generate_tokens(io.StringIO(self.text).readline))
+
+    @cached_property
+    def tree(self) -> ast.Module:
+        """
+        Parsed AST of the source.
+
+        Raises:
+            SyntaxError: If the source cannot be parsed.
+        """
+        return ast.parse(self.data, filename=self.path)
+
+    @cached_property
+    def function_names(self) -> List[str]:
+        """Names of the top-level functions, in definition order."""
+        return [node.name for node in self.tree.body if isinstance(node, ast.FunctionDef)]
+
+    def offset(self, line: int, column: int) -> int:
+        """Convert a 1-based line and 0-based column into an offset into `text`."""
+        return self.line_offsets[line - 1] + column
+
+    def position(self, offset: int) -> tuple:
+        """Convert an offset into `text` into a 1-based line and 0-based column."""
+        line = bisect.bisect_right(self.line_offsets, offset)
+        return line, offset - self.line_offsets[line - 1]
+
+
+@lru_cache(maxsize=32)
+def _load_source(path: str, mtime_ns: int, size: int) -> SourceUnit:
+    return SourceUnit(path)
+
+
+def load_source(path: str) -> SourceUnit:
+    """
+    Return the SourceUnit of `path`, reusing the one built earlier in this
+    process as long as the file has not been modified since.
+    """
+    stat = os.stat(path)
+    return _load_source(os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+
+
+def extract_function_names(file_path: str, source: Optional[SourceUnit] = None) -> List[str]:
+    """
+    Extracts top-level function names from a Python file using AST.
+    """
+    return (source or load_source(file_path)).function_names
+
+
+def module_names(rel_path: str) -> Set[str]:
+    """
+    Return the dotted names a file, given relative to the project root, can
+    be imported under.
+
+    Every suffix of the path is included so both `src.pkg.mod` and `pkg.mod`
+    resolve for src-layout projects.
+    """
+    parts = os.path.splitext(rel_path)[0].replace(os.sep, '/').split('/')
+    if parts[-1] == '__init__':
+        parts = parts[:-1]
+    return {'.'.join(parts[i:]) for i in range(len(parts))}
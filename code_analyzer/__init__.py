@@ -1,6 +1,21 @@
-from .analyzer import analyze_file, analyze_project
+# Public functions and the modules that define them. They are imported on
+# first use, so that importing a light module of the package (e.g. the
+# server's thin client) does not load the analyzer.
+_EXPORTS = {
+    "analyze_file": "analyzer",
+    "analyze_file_async": "async_engine",
+    "analyze_incremental": "incremental",
+    "analyze_project": "analyzer",
+    "analyze_project_async": "async_engine",
+    "analyze_project_tools": "analyzer",
+    "iter_analyze_project": "analyzer",
+}
 
-__all__ = [
-    "analyze_file",
-    "analyze_project",
-]
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        from importlib import import_module
+        return getattr(import_module(f".{_EXPORTS[name]}", __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,100 +1,553 @@
 #analyzer.py
+import hashlib
 import os
-from CodeReview.CodeQuality.flake8_runner import run_flake8
-from CodeReview.CodeQuality.mypy_runner import run_mypy
-from CodeReview.CodeQuality.pylint_runner import run_pylint
-from CodeReview.SpellingAndGrammar.pyspellchecker_runner import run_pyspellchecker
-from CodeReview.NamingConvention.pep8_naming_runner import run_pep8_naming
-from CodeReview.ClarityAndMaintainability.radon_runner import run_radon_cc, run_radon_mi
-from CodeReview.ClarityAndMaintainability.refactor_runner import run_refactor
-from CodeReview.TestingAndTestCoverage.pytest_runner import run_pytest
-from CodeReview.TestingAndTestCoverage.coverage_runner import run_coverage
-from CodeReview.TestingAndTestCoverage.hypothesis_runner import run_hypothesis
-from CodeReview.SecurityAndSafety.bandit_runner import run_bandit
-from CodeReview.DependencyManagement.pipreqs_runner import run_pipreqs
-from CodeReview.DependencyManagement.pip_audit_runner import run_pip_audit
-from CodeReview.DependencyManagement.deptry_runner import run_deptry
-from CodeReview.PerformanceAndEfficiency.cprofile_runner import run_cprofile
-from CodeReview.PerformanceAndEfficiency.line_profiler_runner import run_line_profiler
-from CodeReview.PerformanceAndEfficiency.memory_profiler_runner import run_memory_profiler
-from CodeReview.PerformanceAndEfficiency.scalene_runner import run_scalene
-from CodeReview.FormattingAndStyle.black_runner import run_black
-from CodeReview.FormattingAndStyle.isort_runner import run_isort
-from CodeReview.FormattingAndStyle.autopep8_runner import run_autopep8
-from CodeReview.Documentation.pdoc_runner import run_pdoc
-from CodeReview.Documentation.sphinx_runner import run_sphinx
-from CodeReview.Documentation.docformatter_runner import run_docformatter
-from CodeReview.Documentation.darglint_runner import run_darglint
-
-def analyze_file(file_path):
-    """Run all tools on one Python file and return results."""
-    results = {
-        # CodeQuality/Static Analysis
-        'pylint': run_pylint(file_path),
-        'flake8': run_flake8(file_path),
-        'mypy': run_mypy(file_path),
-
-        # SpellingAndGrammar
-        'pyspellchecker': run_pyspellchecker(file_path),
-
-        # NamingConvention
-        'pep8_naming': run_pep8_naming(file_path),
-
-        # ClarityAndMaintainability
-        'radon-cc': run_radon_cc(file_path),
-        'radon-mi': run_radon_mi(file_path),
-        'refactor': run_refactor(file_path),
-
-        # TestingAndTestCoverage
-        'pytest': run_pytest(file_path),
-        'coverage': run_coverage(file_path),
-        'hypothesis': run_hypothesis(file_path),
-
-        # SecurityAndSafety
-        'bandit': run_bandit(file_path),
-
-        # DependencyManagement
-        'pipreqs': run_pipreqs(file_path),
-        'pip-audit': run_pip_audit(file_path),
-        'deptry': run_deptry(file_path),
-
-        # PerformanceAndEfficiency
-        'cprofile': run_cprofile(file_path),
-        'line_profiler': run_line_profiler(file_path),
-        'memory_profiler': run_memory_profiler(file_path),
-        'scalene': run_scalene(file_path),
-
-        # FormattingAndStyle
-        'black': run_black(file_path),
-        'isort': run_isort(file_path),
-        'autopep8': run_autopep8(file_path),
-
-        # Documentation
-        'sphinx': run_sphinx(file_path),
-        'docformatter': run_docformatter(file_path),
-        'darglint': run_darglint(file_path),
-        'pdoc': run_pdoc(file_path),
-    }
+import queue
+import time
+from concurrent.futures import Future
+from CodeReview.batching import DEFAULT_CHUNK_SIZE, chunked
+from CodeReview.process import ToolTimeout, limit, measure
+from CodeReview.source_unit import load_source
+from .cache import file_digest
+from .discovery import discover_files
+from .limits import tool_limits
+from .metrics import rollup, split_metrics
+from .registry import REGISTRY, LazyRunners
+from .scheduler import (
+    SUBMIT_WINDOW, Task, default_schedule, estimate_durations, order_tasks, plan_schedule, summarize_schedule,
+    timings_from_report,
+)
+
+# Runner of every tool, keyed by name in report order. The runner modules
+# (and the tool libraries they pull in) are imported on first use, so only
+# selected tools cost start-up time. See registry.REGISTRY.
+TOOLS = LazyRunners()
+
+# Scope of each tool that does not work on a single file. 'project' tools
+# look at the whole project tree and 'environment' tools at the installed
+# packages; both run once per analysis and are reported under
+# report['_project']. Every other tool is 'file' scoped.
+TOOL_SCOPES = {name: spec.scope for name, spec in REGISTRY.items() if spec.scope != 'file'}
+
+# Report key of the project-level section.
+PROJECT_KEY = '_project'
+
+# File-scoped tools whose results are never cached because they measure run
+# time rather than inspect the source.
+UNCACHEABLE_TOOLS = {'cprofile', 'line_profiler', 'memory_profiler', 'scalene'}
+
+# File-scoped tools whose results also depend on the files a module imports.
+# Their cache keys include a digest of every Python file in the project and
+# the file's path in it, which decides what its relative imports resolve to.
+CROSS_FILE_TOOLS = {'pylint', 'mypy', 'pdoc'}
+
+# In-process analyzers that accept the shared, already parsed SourceUnit of
+# the file via a `source` keyword argument.
+SOURCE_TOOLS = {'pyspellchecker', 'radon-cc', 'cprofile', 'line_profiler', 'memory_profiler'}
+
+# Project tools that accept the discovered files via a `files` keyword
+# argument, so they skip what discovery excludes instead of walking the tree.
+PROJECT_FILE_TOOLS = {'radon-mi'}
+
+# Tools that can run either as a CLI subprocess or in-process through their
+# Python API, selected with options={'<tool>': {'engine': ...}}.
+ENGINE_TOOLS = ('pylint', 'flake8', 'mypy')
+ENGINES = ('subprocess', 'inprocess')
+
+# Profilers that execute the analyzed file. By default they run in
+# pre-warmed, recycled sandbox worker processes (see CodeReview.sandbox), so
+# profiled code cannot leak state into the analyzer or into later files;
+# options={'<tool>': {'engine': 'inprocess'}} runs them in this process.
+SANDBOX_TOOLS = ('cprofile', 'line_profiler', 'memory_profiler')
+SANDBOX_ENGINES = ('sandbox', 'inprocess')
+
+# Engines each tool accepts. mypy can also check through a long-lived dmypy
+# daemon (see CodeReview.CodeQuality.mypy_runner).
+TOOL_ENGINES = {
+    **{tool: ENGINES for tool in ENGINE_TOOLS},
+    'mypy': ENGINES + ('daemon',),
+    **{tool: SANDBOX_ENGINES for tool in SANDBOX_TOOLS},
+}
+
+# Tools that can check many files in one invocation. In batched mode each of
+# them runs once per chunk of files instead of once per file.
+BATCH_TOOLS = LazyRunners(batch=True)
+
+def _file_tools(tools=None):
+    """Return the names of the (selected) file-scoped tools, in report order."""
+    return [name for name in TOOLS
+            if TOOL_SCOPES.get(name, 'file') == 'file' and (tools is None or name in tools)]
+
+def _project_tools(tools=None):
+    """Return the names of the (selected) project- and environment-scoped tools, in report order."""
+    return [name for name in TOOLS
+            if TOOL_SCOPES.get(name, 'file') != 'file' and (tools is None or name in tools)]
+
+def analyze_file(file_path, precomputed=None, cache=None, options=None, tools=None, resource_limits=None):
+    """
+    Run all file-scoped tools on one Python file and return results.
+
+    Args:
+        file_path (str): Path to the Python file.
+        precomputed (dict, optional): Results already produced for this file
+            (e.g. by a batched run), keyed by tool name. Those tools are not
+            run again.
+        cache (ResultCache, optional): Result cache consulted before running
+            each tool. Tools in `CROSS_FILE_TOOLS` are only cached by
+            `analyze_project`, which knows the rest of the project.
+        options (dict, optional): Extra keyword arguments per tool, e.g.
+            {'pylint': {'engine': 'inprocess'}}.
+        tools (Iterable[str], optional): Only run these tools. All tools
+            run by default.
+        resource_limits (dict, optional): Timeouts and subprocess limits
+            per tool, see limits.tool_limits.
+
+    Returns:
+        dict: Results keyed by tool name. The instrumentation of every tool
+              run (see `_cache_status` and CodeReview.process.measure) is
+              recorded under results['_meta'].
+    """
+    precomputed = precomputed or {}
+    options = options or {}
+    # Read and parse the file once for every in-process analyzer
+    source = load_source(file_path)
+    keys = {}
+    if cache is not None:
+        keys = _cache_keys(cache, file_path, source.sha256, os.path.dirname(file_path))
+
+    results = {}
+    meta = {}
+    for name in _file_tools(None if tools is None else set(tools)):
+        if name in precomputed:
+            results[name] = precomputed[name]
+            continue
+        key = keys.get(name)
+        if key is not None:
+            hit, result = cache.get(key, file_path)
+            if hit:
+                results[name] = result
+                meta[name] = {'cache': 'hit'}
+                continue
+        kwargs = dict(options.get(name, {}))
+        if name in SOURCE_TOOLS:
+            kwargs['source'] = source
+        results[name], metrics = _run_limited(TOOLS[name], (file_path,), kwargs,
+                                              tool_limits(name, resource_limits))
+        meta[name] = dict(metrics, cache=_cache_status(cache, key))
+        if key is not None and not _timed_out(metrics):
+            cache.put(key, results[name], file_path)
+    results['_meta'] = meta
     return results
 
-def analyze_project(path):
+def _cache_status(cache, key):
+    """
+    Cache status of a tool run that was not a cache hit: 'miss' if its
+    result was looked up (and is now stored), 'uncacheable' if the tool's
+    results are never cached (here), 'off' without a cache.
+    """
+    if cache is None:
+        return 'off'
+    return 'miss' if key is not None else 'uncacheable'
+
+def _cache_keys(cache, file_path, content_hash, config_root, project_hash=None, tools=None):
+    """Return the cache key of every cacheable file-scoped tool for one file."""
+    keys = {}
+    for name in _file_tools(tools):
+        if name in UNCACHEABLE_TOOLS:
+            continue
+        if name in CROSS_FILE_TOOLS:
+            if project_hash is None:
+                continue
+            rel_path = os.path.relpath(file_path, config_root)
+            keys[name] = cache.key(content_hash + project_hash + rel_path, name, config_root)
+        else:
+            keys[name] = cache.key(content_hash, name, config_root)
+    return keys
+
+def _completed(result):
+    """Wrap an already known result in a finished Future."""
+    future = Future()
+    future.set_result(result)
+    return future
+
+def analyze_project_tools(path):
+    """
+    Run the project- and environment-scoped tools once for the project at `path`.
+
+    Returns:
+        dict: Results keyed by tool name. A failing tool is reported as
+              {'error': ...} without affecting the others. The
+              instrumentation of every tool run is recorded under
+              results['_meta'].
+    """
+    results = {}
+    meta = {}
+    for name in _project_tools():
+        try:
+            results[name], meta[name] = _run_tool(name, path)
+        except Exception as e:
+            results[name] = {'error': str(e)}
+    results['_meta'] = meta
+    return results
+
+def _timeout_result(limits):
+    """Result of a tool run that was killed because it exceeded its timeout."""
+    return {'status': 'timeout', 'timeout': limits['timeout']}
+
+def _timed_out(metrics):
+    """Whether a tool run exceeded its timeout; such results are never cached."""
+    return metrics.get('status') == 'timeout'
+
+def _run_limited(runner, args, kwargs, limits):
+    """
+    Call runner(*args, **kwargs) within `limits` (see CodeReview.process.limit).
+
+    Returns:
+        tuple: (result, metrics). A run that exceeds its timeout yields
+               `_timeout_result` and metrics['status'] == 'timeout'.
+    """
+    with measure() as metrics:
+        with limit(**limits) as budget:
+            try:
+                result = runner(*args, **kwargs)
+            except ToolTimeout:
+                budget['timed_out'] = True
+    if budget['timed_out']:
+        result = _timeout_result(limits)
+        metrics['status'] = 'timeout'
+    return result, metrics
+
+def _run_tool(name, target, options=None, resource_limits=None):
+    """
+    Run a single tool on a file or project path; the unit of work for the worker pool.
+
+    Returns:
+        tuple: (result, metrics) where metrics is the tool's instrumentation.
+    """
+    kwargs = dict(options or {})
+    if name in SOURCE_TOOLS:
+        # Reuses the SourceUnit this worker already built for the file
+        kwargs['source'] = load_source(target)
+    return _run_limited(TOOLS[name], (target,), kwargs, tool_limits(name, resource_limits))
+
+def _run_batch(name, file_paths, options=None, resource_limits=None):
+    """
+    Run a batched tool on a chunk of files.
+
+    Returns:
+        tuple: (results keyed by file path, metrics of the whole batch). A
+               batch that runs out of time reports a timeout for every file.
+    """
+    limits = tool_limits(name, resource_limits, len(file_paths))
+    results, metrics = _run_limited(BATCH_TOOLS[name], (file_paths, len(file_paths)), options or {}, limits)
+    if _timed_out(metrics):
+        results = {file_path: results for file_path in file_paths}
+    return results, metrics
+
+class _SerialExecutor:
+    """Executor stand-in that runs submitted work immediately in this process."""
+
+    def submit(self, fn, *args):
+        future = Future()
+        try:
+            future.set_result(fn(*args))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        pass
+
+def file_fingerprint(file_path, content_hash=None):
+    """Return the modification time, size and content hash recorded for a file."""
+    stat = os.stat(file_path)
+    return {
+        'mtime': stat.st_mtime,
+        'size': stat.st_size,
+        'sha256': content_hash or file_digest(file_path),
+    }
+
+def _find_python_files(path, discovery=None):
+    """Return (full_path, rel_path) pairs for every Python file in `path`, see discovery.discover_files."""
+    return discover_files(path, **(discovery or {}))[0]
+
+def iter_analyze_project(path, jobs=1, batch=False, batch_size=DEFAULT_CHUNK_SIZE, cache=None,
+                         paths=None, tools=None, options=None, schedule=None, history=None, executor=None,
+                         resource_limits=None, discovery=None):
+    """
+    Analyze all Python files in `path`, yielding each file's results as soon
+    as all of its tools have finished.
+
+    Takes the same arguments as `analyze_project`. A file's results are
+    released once yielded, so memory stays flat on large projects and
+    consumers can start on the first files while the rest are analyzed.
+
+    Yields:
+        tuple: (rel_path, results) for every analyzed file, in completion
+               order, followed by (PROJECT_KEY, project_results) once every
+               file is done. The project entry carries the '_meta' section.
+    """
+    all_files, discovery_stats = discover_files(path, **(discovery or {}))
+    files = all_files
+    if paths is not None:
+        selected = {os.path.normpath(rel_path) for rel_path in paths}
+        files = [(full_path, rel_path) for full_path, rel_path in all_files if rel_path in selected]
+    if tools is not None:
+        tools = set(tools)
+    options = dict(options or {})
+    for name in PROJECT_FILE_TOOLS.intersection(_project_tools(tools)):
+        options[name] = dict(options.get(name, {}), files=[full_path for full_path, _ in all_files])
+    file_tools = _file_tools(tools)
+    batched = [name for name in BATCH_TOOLS if name in file_tools] if batch else []
+    rel_paths = dict(files)
+
+    # Look every (file, tool) pair up in the cache before scheduling any work
+    resolved = {}
+    keys = {}
+    digests = {}
+    if cache is not None:
+        digests = {full_path: file_digest(full_path) for full_path, _ in all_files}
+        project_hash = hashlib.sha256(
+            ''.join(f"{rel_path}\0{digests[full_path]}\0" for full_path, rel_path in sorted(all_files, key=lambda f: f[1])).encode()
+        ).hexdigest()
+        for full_path, _ in files:
+            for name, key in _cache_keys(cache, full_path, digests[full_path], path, project_hash, tools).items():
+                hit, result = cache.get(key, full_path)
+                if hit:
+                    resolved[(full_path, name)] = _completed((result, {'cache': 'hit'}))
+                else:
+                    keys[(full_path, name)] = key
+
+    # Number of tools each file is still waiting for
+    remaining = {full_path: len(file_tools) for full_path, _ in files}
+    for full_path, _ in resolved:
+        remaining[full_path] -= 1
+
+    # Every tool run still to do, in the order the scheduler picks
+    tasks = []
+    for name in batched:
+        pending = [full_path for full_path, _ in files if (full_path, name) not in resolved]
+        tasks.extend(Task(name, 'batch', tuple(chunk)) for chunk in chunked(pending, batch_size))
+    for full_path, _ in files:
+        tasks.extend(Task(name, 'file', (full_path,)) for name in file_tools
+                     if name not in batched and (full_path, name) not in resolved)
+    tasks.extend(Task(name, 'project', ()) for name in _project_tools(tools))
+
+    if executor is not None:
+        workers = executor.workers
+    else:
+        workers = 1 if jobs == 1 else jobs or os.cpu_count()
+    schedule = schedule or default_schedule(workers)
+    if history is None:
+        history = cache.timings() if cache is not None else {}
+    estimates = estimate_durations(dict.fromkeys(task.tool for task in tasks), history)
+    window = max(workers, 1) * SUBMIT_WINDOW
+    tasks = order_tasks(tasks, estimates, schedule, window)
+
+    # Submitted futures and the task they run; finished futures are queued
+    # by their done callback.
+    waiting = {}
+    finished = queue.SimpleQueue()
+    # Instrumentation of every tool run, for the per-tool rollup
+    samples = {}
+    project_futures = {}
+    # Actual schedule: seconds until each file was complete, busy seconds per worker
+    file_done = []
+    worker_loads = {}
+
+    def resolve(future):
+        """Record a finished future on its files and return the files that are now complete."""
+        task = waiting.pop(future)
+        if future.exception() is None:
+            metrics = future.result()[1]
+            worker_loads[metrics['worker']] = worker_loads.get(metrics['worker'], 0.0) + metrics['wall']
+        if task.kind == 'project':
+            project_futures[task.tool] = future
+            return []
+        for full_path in task.files:
+            if task.kind == 'batch' and future.exception() is None:
+                # Shard the batched results back onto their files
+                chunk_results, metrics = future.result()
+                resolved[(full_path, task.tool)] = _completed(
+                    (chunk_results.get(full_path, []), split_metrics(metrics, len(task.files)))
+                )
+            else:
+                resolved[(full_path, task.tool)] = future
+            remaining[full_path] -= 1
+        done = [full_path for full_path in task.files if remaining[full_path] == 0]
+        file_done.extend(time.perf_counter() - started for _ in done)
+        return done
+
+    def collect(full_path):
+        """Build a complete file's results in tool order and release them."""
+        done = [resolved.pop((full_path, name)) for name in file_tools]
+        results = {}
+        meta = {}
+        for name, future in zip(file_tools, done):
+            try:
+                results[name], metrics = future.result()
+            except Exception as e:
+                return {'error': str(e), '_meta': meta}
+            key = keys.pop((full_path, name), None)
+            meta[name] = metrics if 'cache' in metrics else dict(metrics, cache=_cache_status(cache, key))
+            samples.setdefault(name, []).append(meta[name])
+            if key is not None and not _timed_out(metrics):
+                cache.put(key, results[name], full_path)
+        results['_meta'] = meta
+        return results
+
+    if executor is None and jobs == 1:
+        executor = _SerialExecutor()
+    elif executor is None:
+        from concurrent.futures import ProcessPoolExecutor
+        from CodeReview.sandbox import configure_sandbox, sandbox_settings
+
+        # Each worker profiles in a sandbox pool of its own, set up like this process' one
+        sandbox = sandbox_settings()
+        executor = ProcessPoolExecutor(max_workers=workers, initializer=configure_sandbox,
+                                       initargs=(sandbox['workers'], sandbox['max_tasks']))
+
+    started = time.perf_counter()
+    try:
+        for full_path, rel_path in files:
+            if remaining[full_path] == 0:
+                yield rel_path, collect(full_path)
+
+        for task in tasks:
+            # Keep at most `window` runs in flight, so results stream out
+            # and memory stays flat however many tasks there are
+            while len(waiting) >= window:
+                for done_path in resolve(finished.get()):
+                    yield rel_paths[done_path], collect(done_path)
+            if task.kind == 'batch':
+                future = executor.submit(_run_batch, task.tool, list(task.files), options.get(task.tool),
+                                         resource_limits)
+            else:
+                target = task.files[0] if task.files else path
+                future = executor.submit(_run_tool, task.tool, target, options.get(task.tool), resource_limits)
+            waiting[future] = task
+            future.add_done_callback(finished.put)
+            # Hand out whatever has finished meanwhile (with the serial
+            # executor that is everything submitted, so results stream there too).
+            while not finished.empty():
+                for done_path in resolve(finished.get()):
+                    yield rel_paths[done_path], collect(done_path)
+
+        while waiting:
+            for done_path in resolve(finished.get()):
+                yield rel_paths[done_path], collect(done_path)
+        makespan = time.perf_counter() - started
+
+        project = {}
+        project_meta = {}
+        for name in _project_tools(tools):
+            try:
+                project[name], metrics = project_futures[name].result()
+            except Exception as e:
+                project[name] = {'error': str(e)}
+                continue
+            project_meta[name] = dict(metrics, cache=_cache_status(cache, None))
+            samples.setdefault(name, []).append(project_meta[name])
+    finally:
+        # Also reached when the consumer stops iterating early
+        executor.shutdown(cancel_futures=True)
+
+    tool_rollup = rollup(samples)
+    if cache is not None:
+        cache.record_timings(timings_from_report({PROJECT_KEY: {'_meta': {'rollup': tool_rollup}}}))
+    project['_meta'] = {
+        'files': {rel_path: file_fingerprint(full_path, digests.get(full_path)) for full_path, rel_path in files},
+        'tools': project_meta,
+        'rollup': tool_rollup,
+        'discovery': discovery_stats,
+        'schedule': {
+            'strategy': schedule,
+            'workers': workers,
+            'window': window,
+            'tasks': len(tasks),
+            'estimates': estimates,
+            'planned': plan_schedule(tasks, estimates, workers),
+            'actual': summarize_schedule(makespan, file_done, worker_loads.values()),
+        },
+    }
+    if cache is not None:
+        project['_meta']['cache'] = cache.stats()
+    yield PROJECT_KEY, project
+
+def analyze_project(path, jobs=1, batch=False, batch_size=DEFAULT_CHUNK_SIZE, cache=None,
+                    paths=None, tools=None, options=None, schedule=None, history=None, executor=None,
+                    resource_limits=None, discovery=None):
     """
     Analyze all Python files in `path`.
 
     Args:
         path (str): Root folder of the Python project.
+        jobs (int): Number of worker processes. 1 analyzes files serially in
+            this process, 0 or None uses one worker per CPU core. With more
+            than one worker every (file, tool) pair is scheduled separately,
+            so both files and tools are spread across cores.
+        batch (bool): Run the tools in `BATCH_TOOLS` once per chunk of
+            `batch_size` files instead of once per file. Results are sharded
+            back into the per-file entries, so the report keeps its shape.
+        batch_size (int): Maximum number of files per batched invocation.
+        cache (ResultCache, optional): Result cache consulted before any
+            file-scoped tool is run. Its hit/miss counters are reported
+            under report['_project']['_meta']['cache'].
+        paths (Iterable[str], optional): Only analyze these files, given
+            relative to `path`. All files are analyzed by default.
+        tools (Iterable[str], optional): Only run these tools. All tools
+            run by default.
+        options (dict, optional): Extra keyword arguments per tool, e.g.
+            {'pylint': {'engine': 'inprocess'}} to select an execution engine.
+        schedule (str, optional): Order in which tool runs are submitted,
+            one of scheduler.SCHEDULES. Defaults to 'lpt' with several
+            workers and 'fifo' otherwise. At most scheduler.SUBMIT_WINDOW
+            runs per worker are in flight at a time.
+        history (dict, optional): Expected seconds per run of each tool,
+            e.g. from scheduler.timings_from_report(). Defaults to the
+            timings recorded in `cache`; tools without history are
+            estimated from their cost class.
+        executor (optional): Executor to run the tools with instead of the
+            one picked by `jobs`, e.g. an async_engine.AsyncioExecutor. It
+            needs `submit`, `shutdown` and a `workers` count, and is shut
+            down when the analysis ends.
+        resource_limits (dict, optional): Timeouts and subprocess CPU and
+            memory limits, {tool or '*': {'timeout': s, 'cpu': s,
+            'memory': bytes}}. Every run of a file-scoped tool gets the
+            timeout of its cost class (limits.DEFAULT_TIMEOUTS) unless
+            given otherwise, project and environment tools none; a run
+            that exceeds it is killed and reported as
+            {'status': 'timeout', 'timeout': s} without being cached.
+        discovery (dict, optional): Keyword arguments of
+            discovery.discover_files selecting the files, e.g.
+            {'exclude': ['migrations'], 'max_file_size': 1 << 20}. Files
+            git ignores and virtualenv, cache and build directories are
+            skipped by default.
 
     Returns:
-        dict: Report with per-file results.
-    """
-    report = {}
-    for root, _, files in os.walk(path):
-        for file in files:
-            if file.endswith('.py'):
-                full_path = os.path.join(root, file)
-                rel_path = os.path.relpath(full_path, path)
-                try:
-                    report[rel_path] = analyze_file(full_path)
-                except Exception as e:
-                    report[rel_path] = {'error': str(e)}
+        dict: Report with per-file results in discovery order, plus the
+              results of the project- and environment-scoped tools under
+              report['_project']. The fingerprint of every analyzed file is
+              recorded under report['_project']['_meta']['files'] so the
+              report can serve as the baseline of an incremental run.
+
+              Every tool run is instrumented: wall and CPU time, peak
+              subprocess RSS, exit code and cache status are recorded per
+              file under report[rel_path]['_meta'][tool], for the project
+              tools under report['_project']['_meta']['tools'], and summed
+              up per tool (total, p50, p95, max) under
+              report['_project']['_meta']['rollup']. The planned and actual
+              schedule (makespan, time to the first and mean file result,
+              worker loads) are compared under
+              report['_project']['_meta']['schedule'], and the time and
+              counts of the file discovery are recorded under
+              report['_project']['_meta']['discovery'].
+    """
+    results = dict(iter_analyze_project(path, jobs=jobs, batch=batch, batch_size=batch_size, cache=cache,
+                                        paths=paths, tools=tools, options=options,
+                                        schedule=schedule, history=history, executor=executor,
+                                        resource_limits=resource_limits, discovery=discovery))
+    # Files complete in any order; the fingerprints are kept in discovery order
+    project = results.pop(PROJECT_KEY)
+    report = {rel_path: results[rel_path] for rel_path in project['_meta']['files']}
+    report[PROJECT_KEY] = project
     return report
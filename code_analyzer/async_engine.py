@@ -0,0 +1,186 @@
+#async_engine.py
+import asyncio
+import contextvars
+import functools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from CodeReview.process import set_subprocess_loop
+from .analyzer import _cache_keys, _cache_status, _file_tools, _run_tool, _timed_out, analyze_project
+from .cache import file_digest
+
+
+def parse_limits(selections):
+    """
+    Parse TOOL=N concurrency limits, e.g. ['mypy=2'] -> {'mypy': 2}.
+
+    Raises:
+        ValueError: If a selection is not of the form TOOL=N with N >= 1.
+    """
+    limits = {}
+    for selection in selections:
+        tool, _, count = selection.partition('=')
+        if not tool or not count.isdigit() or int(count) < 1:
+            raise ValueError(f"invalid limit {selection!r}: expected TOOL=N with N >= 1")
+        limits[tool] = int(count)
+    return limits
+
+
+class AsyncioExecutor:
+    """
+    Executor that runs tool runs on an asyncio event loop.
+
+    Runners still execute in worker threads, but every subprocess they start
+    through CodeReview.process.run_command is created with
+    asyncio.create_subprocess_exec() on the loop, so waiting on tool
+    processes costs no worker process. At most `concurrency` tool runs are
+    in flight at a time, and at most `limits[tool]` runs of one tool (e.g.
+    {'mypy': 2} to bound memory). Runs with the in-process engine share
+    their tool's interpreter state and so never overlap.
+
+    `submit` may be called from any thread other than the loop's and
+    returns a concurrent.futures.Future, so the executor plugs into
+    `iter_analyze_project`. Without a `loop` the executor runs its own in a
+    background thread until `shutdown`.
+    """
+
+    def __init__(self, loop=None, concurrency=None, limits=None):
+        self.workers = concurrency or os.cpu_count()
+        self.limits = dict(limits or {})
+        self._owns_loop = loop is None
+        if loop is None:
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name='code-analyzer-asyncio', daemon=True).start()
+        self.loop = loop
+        self._threads = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='code-analyzer')
+        self._futures = set()
+        self._global = None
+        self._per_tool = {}
+        self._inprocess = None
+
+    def _semaphore(self, tool):
+        # Created lazily so they belong to the running loop
+        if self._global is None:
+            self._global = asyncio.Semaphore(self.workers)
+            self._inprocess = asyncio.Lock()
+        if tool not in self._per_tool:
+            self._per_tool[tool] = asyncio.Semaphore(self.limits[tool]) if tool in self.limits else None
+        return self._per_tool[tool]
+
+    async def run(self, fn, tool, target, options=None, resource_limits=None):
+        """
+        Run fn(tool, target, options, resource_limits) in a worker thread once
+        the global and per-tool limits allow; `fn` is analyzer._run_tool or
+        _run_batch.
+        """
+        tool_semaphore = self._semaphore(tool)
+        exclusive = (options or {}).get('engine') == 'inprocess'
+        # The global slot is taken last, so a run waiting on its tool's limit
+        # or the in-process lock does not hold one that another tool could use
+        if tool_semaphore is not None:
+            await tool_semaphore.acquire()
+        try:
+            if exclusive:
+                await self._inprocess.acquire()
+            try:
+                async with self._global:
+                    context = contextvars.copy_context()
+                    context.run(set_subprocess_loop, self.loop)
+                    return await self.loop.run_in_executor(
+                        self._threads, functools.partial(context.run, fn, tool, target, options, resource_limits)
+                    )
+            finally:
+                if exclusive:
+                    self._inprocess.release()
+        finally:
+            if tool_semaphore is not None:
+                tool_semaphore.release()
+
+    def submit(self, fn, tool, target, options=None, resource_limits=None):
+        future = asyncio.run_coroutine_threadsafe(self.run(fn, tool, target, options, resource_limits), self.loop)
+        self._futures.add(future)
+        future.add_done_callback(self._futures.discard)
+        return future
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        if cancel_futures:
+            for future in list(self._futures):
+                future.cancel()
+        self._threads.shutdown(wait=wait, cancel_futures=cancel_futures)
+        if self._owns_loop:
+            self.loop.call_soon_threadsafe(self.loop.stop)
+
+
+async def analyze_file_async(file_path, cache=None, options=None, tools=None, concurrency=None, limits=None,
+                             resource_limits=None):
+    """
+    Run the file-scoped tools on one Python file concurrently on the running event loop.
+
+    Takes the arguments of `analyze_file` (without `precomputed`) plus the
+    limits of `AsyncioExecutor`.
+
+    Returns:
+        dict: Results keyed by tool name, with the instrumentation under
+              results['_meta'], as `analyze_file` returns them.
+    """
+    options = options or {}
+    executor = AsyncioExecutor(asyncio.get_running_loop(), concurrency, limits)
+    names = _file_tools(None if tools is None else set(tools))
+    keys = {}
+    if cache is not None:
+        content_hash = await asyncio.to_thread(file_digest, file_path)
+        keys = _cache_keys(cache, file_path, content_hash, os.path.dirname(file_path))
+
+    results = {}
+    meta = {}
+    pending = {}
+    for name in names:
+        key = keys.get(name)
+        if key is not None:
+            hit, result = cache.get(key, file_path)
+            if hit:
+                results[name] = result
+                meta[name] = {'cache': 'hit'}
+                continue
+        pending[name] = asyncio.ensure_future(
+            executor.run(_run_tool, name, file_path, options.get(name), resource_limits)
+        )
+
+    try:
+        for name, (result, metrics) in zip(pending, await asyncio.gather(*pending.values())):
+            results[name] = result
+            meta[name] = dict(metrics, cache=_cache_status(cache, keys.get(name)))
+            if keys.get(name) is not None and not _timed_out(metrics):
+                cache.put(keys[name], result, file_path)
+    finally:
+        for task in pending.values():
+            task.cancel()
+        executor.shutdown(wait=False)
+
+    results = {name: results[name] for name in names}
+    results['_meta'] = {name: meta[name] for name in names}
+    return results
+
+
+async def analyze_project_async(path, concurrency=None, limits=None, **kwargs):
+    """
+    Analyze all Python files in `path` without blocking the running event loop.
+
+    Every tool subprocess is started with asyncio.create_subprocess_exec()
+    on this loop, at most `concurrency` tool runs at a time (one per CPU
+    core by default) and at most `limits[tool]` runs of one tool.
+
+    Args:
+        path (str): Root folder of the Python project.
+        concurrency (int, optional): Global cap on concurrent tool runs.
+        limits (dict, optional): Cap per tool, e.g. {'mypy': 2}.
+        **kwargs: Passed on to `analyze_project` (everything but `jobs`).
+
+    Returns:
+        dict: The report of `analyze_project`.
+    """
+    executor = AsyncioExecutor(asyncio.get_running_loop(), concurrency, limits)
+    # The analysis itself only hands out work and collects results, so it
+    # runs in a thread while the tool runs happen on this loop.
+    return await asyncio.to_thread(analyze_project, path, executor=executor, **kwargs)
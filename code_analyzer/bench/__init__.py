@@ -0,0 +1 @@
+"""Benchmarks for the analyzer itself. Run the modules with ``python -m``."""
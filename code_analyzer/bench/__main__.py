@@ -0,0 +1,139 @@
+#bench/__main__.py
+"""
+Benchmark commands.
+
+Usage:
+    python -m code_analyzer.bench generate <out_dir> [project options]
+    python -m code_analyzer.bench run [<path/to/project>] [project options] [--repeat 5] [-o bench.json]
+    python -m code_analyzer.bench compare <baseline.json> [<new.json>] [--tolerance [METRIC=]PERCENT ...]
+    python -m code_analyzer.bench memory [--issues 1000000] [--files 5000] [-o memory.json]
+    python -m code_analyzer.bench parsers [--size 8] [--repeat 3] [-o parsers.json]
+"""
+import argparse
+import json
+import sys
+
+from .compare import DEFAULT_TOLERANCES, REGRESSED, compare_results, config_differences, parse_tolerances, print_comparison
+from .memory import DEFAULT_FILES, DEFAULT_ISSUES, benchmark_memory, print_memory
+from .parsers import DEFAULT_SIZE_MB, benchmark_parsers, print_parsers
+from .suite import DEFAULT_TOOLS, benchmark_project, print_results
+from .synthetic import DEFAULTS, generate_project
+
+
+def _add_project_arguments(parser):
+    parser.add_argument("--files", type=int, default=DEFAULTS['files'], help="Modules in the package")
+    parser.add_argument("--lines", type=int, default=DEFAULTS['lines'], help="Approximate lines per module")
+    parser.add_argument("--functions", type=int, default=DEFAULTS['functions'], help="Functions per module")
+    parser.add_argument("--tests", type=int, default=DEFAULTS['tests'], help="Test functions in total")
+    parser.add_argument("--fan-out", type=int, default=DEFAULTS['fan_out'], help="Imports per module")
+    parser.add_argument("--seed", type=int, default=DEFAULTS['seed'], help="Seed of the generator")
+
+
+def _project_options(args):
+    return {name: getattr(args, name) for name in DEFAULTS}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m code_analyzer.bench",
+                                     description="Benchmark the analyzer on real or synthetic projects.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    generate = commands.add_parser("generate", help="Write a synthetic project")
+    generate.add_argument("out_dir", help="Directory to create the project in")
+    _add_project_arguments(generate)
+
+    run = commands.add_parser("run", help="Benchmark analyze_project and emit JSON results")
+    run.add_argument("path", nargs="?", default=None,
+                     help="Project to analyze (default: a synthetic project generated with the options below)")
+    _add_project_arguments(run)
+    run.add_argument("--tools", default=",".join(DEFAULT_TOOLS), help="Comma-separated tools to run")
+    run.add_argument("-j", "--jobs", type=int, default=1, help="Worker processes (0 = one per CPU core)")
+    run.add_argument("--batch", action="store_true", help="Use batched tool runs")
+    run.add_argument("--repeat", type=int, default=5, help="Samples to take")
+    run.add_argument("--warmup", type=int, default=1, help="Samples to take and discard first")
+    run.add_argument("-o", "--output", default=None, help="Write the results as JSON to this file")
+
+    compare = commands.add_parser("compare", help="Compare a run against a stored baseline; exit 1 on regressions")
+    compare.add_argument("baseline", help="Stored results of `run`")
+    compare.add_argument("current", nargs="?", default=None,
+                         help="New results of `run` (default: run the baseline's configuration now)")
+    compare.add_argument("--tolerance", metavar="[METRIC=]PERCENT", action="append", default=[],
+                         help="Allowed change before a metric regresses, for every metric or a metric pattern "
+                              "(repeatable, e.g. --tolerance 'latency.*=25'; default: " + ", ".join(
+                                  f"{name} {percent:g}%" for name, percent in DEFAULT_TOLERANCES.items()) + ")")
+    compare.add_argument("--confidence", type=float, default=0.95, help="Level of the confidence intervals")
+    compare.add_argument("-o", "--output", default=None, help="Write the comparison as JSON to this file")
+
+    memory = commands.add_parser("memory", help="Measure the memory of a large report as dicts and as issue records")
+    memory.add_argument("--issues", type=int, default=DEFAULT_ISSUES, help="Findings in the synthetic report")
+    memory.add_argument("--files", type=int, default=DEFAULT_FILES, help="Files the findings are spread over")
+    memory.add_argument("--seed", type=int, default=0, help="Seed of the generator")
+    memory.add_argument("-o", "--output", default=None, help="Write the results as JSON to this file")
+
+    parsers = commands.add_parser("parsers", help="Measure the throughput of the tool output parsers")
+    parsers.add_argument("--size", type=float, default=DEFAULT_SIZE_MB, help="Megabytes of output per format")
+    parsers.add_argument("--repeat", type=int, default=3, help="Runs per parser; the best is kept")
+    parsers.add_argument("--seed", type=int, default=0, help="Seed of the generator")
+    parsers.add_argument("-o", "--output", default=None, help="Write the results as JSON to this file")
+
+    args = parser.parse_args(argv)
+    if args.command == "generate":
+        print(json.dumps(generate_project(args.out_dir, **_project_options(args)), indent=4))
+    elif args.command == "run":
+        results = benchmark_project(args.path, tools=[name.strip() for name in args.tools.split(",") if name.strip()],
+                                    jobs=args.jobs, batch=args.batch, repeat=args.repeat, warmup=args.warmup,
+                                    **_project_options(args))
+        print_results(results)
+        if args.output:
+            with open(args.output, 'w') as f:
+                json.dump(results, f, indent=4)
+            print(f"Results saved to {args.output}")
+    elif args.command == "compare":
+        return _compare(parser, args)
+    elif args.command in ("memory", "parsers"):
+        if args.command == "memory":
+            results = benchmark_memory(args.issues, args.files, args.seed)
+            print_memory(results)
+        else:
+            results = benchmark_parsers(args.size, args.repeat, args.seed)
+            print_parsers(results)
+        if args.output:
+            with open(args.output, 'w') as f:
+                json.dump(results, f, indent=4)
+            print(f"Results saved to {args.output}")
+
+
+def _compare(parser, args):
+    try:
+        tolerances = parse_tolerances(args.tolerance)
+    except ValueError as e:
+        parser.error(str(e))
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    if args.current:
+        with open(args.current) as f:
+            current = json.load(f)
+    else:
+        config = baseline['config']
+        project = config['project']
+        current = benchmark_project(project.get('path'), tools=config['tools'], jobs=config['jobs'],
+                                    batch=config['batch'], repeat=config['repeat'], warmup=config['warmup'],
+                                    **{name: project[name] for name in DEFAULTS if name in project})
+
+    for difference in config_differences(baseline, current):
+        print(f"warning: runs differ in {difference}", file=sys.stderr)
+    rows = compare_results(baseline, current, tolerances, args.confidence)
+    print_comparison(rows)
+    regressed = [row['metric'] for row in rows if row['verdict'] == REGRESSED]
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'baseline': args.baseline, 'current': args.current, 'rows': rows}, f, indent=4)
+    if regressed:
+        print(f"\n{len(regressed)} metric(s) regressed: {', '.join(regressed)}")
+        return 1
+    print("\nNo regressions.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
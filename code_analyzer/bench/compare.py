@@ -0,0 +1,173 @@
+#bench/compare.py
+"""
+Compare two benchmark runs and flag performance regressions.
+
+Each metric's change is the relative difference of the sample medians,
+with a bootstrap confidence interval: both sample sets are resampled with
+replacement and the change recomputed many times. A metric regresses
+only when the whole interval is worse than its tolerance, so noise
+within the tolerance, or too few samples to tell, does not fail the
+gate. Clear improvements are reported the same way.
+
+Usage:
+    python -m code_analyzer.bench compare <baseline.json> [<new.json>] [--tolerance [METRIC=]PERCENT ...]
+"""
+import fnmatch
+import random
+import statistics
+import sys
+
+# Allowed change in percent before a metric counts as regressed, by metric
+# name pattern. Latencies of single tools are noisier than the totals.
+DEFAULT_TOLERANCES = {
+    'throughput': 10.0,
+    'wall': 10.0,
+    'peak_rss': 10.0,
+    'children_peak_rss': 10.0,
+    'latency.*': 20.0,
+}
+
+# Tolerance of metrics no pattern matches.
+FALLBACK_TOLERANCE = 10.0
+
+# Bootstrap resamples per metric.
+RESAMPLES = 2000
+
+# Verdicts of a metric.
+REGRESSED, IMPROVED, UNCHANGED, MISSING = 'regressed', 'improved', 'unchanged', 'missing'
+
+
+def parse_tolerances(selections, tolerances=None):
+    """
+    Parse [METRIC=]PERCENT tolerances, where METRIC may be a pattern such
+    as 'latency.*'. A selection without METRIC applies to every metric.
+
+    Raises:
+        ValueError: If a selection is malformed or negative.
+    """
+    tolerances = dict(DEFAULT_TOLERANCES if tolerances is None else tolerances)
+    for selection in selections:
+        pattern, _, value = selection.rpartition('=')
+        try:
+            percent = float(value)
+        except ValueError:
+            percent = -1
+        if percent < 0:
+            raise ValueError(f"invalid tolerance {selection!r}: expected [METRIC=]PERCENT with PERCENT >= 0")
+        if pattern:
+            tolerances[pattern] = percent
+        else:
+            tolerances = {name: percent for name in tolerances}
+            tolerances['*'] = percent
+    return tolerances
+
+
+def tolerance_for(metric, tolerances):
+    """Return the tolerance of a metric: an exact entry, else the most specific matching pattern."""
+    if metric in tolerances:
+        return tolerances[metric]
+    matches = [pattern for pattern in tolerances if fnmatch.fnmatchcase(metric, pattern)]
+    if not matches:
+        return FALLBACK_TOLERANCE
+    return tolerances[max(matches, key=len)]
+
+
+def _change(baseline, current):
+    """Relative change in percent of the median of `current` against that of `baseline`."""
+    reference = statistics.median(baseline)
+    if reference == 0:
+        return 0.0 if statistics.median(current) == 0 else float('inf')
+    return (statistics.median(current) / reference - 1) * 100
+
+
+def bootstrap_interval(baseline, current, confidence=0.95, resamples=RESAMPLES, seed=0):
+    """
+    Bootstrap confidence interval of the relative change of the medians, in percent.
+
+    Returns:
+        tuple: (low, high)
+    """
+    rng = random.Random(seed)
+    changes = sorted(
+        _change(rng.choices(baseline, k=len(baseline)), rng.choices(current, k=len(current)))
+        for _ in range(resamples)
+    )
+    tail = (1 - confidence) / 2
+    return changes[int(tail * (resamples - 1))], changes[int((1 - tail) * (resamples - 1))]
+
+
+def compare_results(baseline, current, tolerances=None, confidence=0.95, resamples=RESAMPLES):
+    """
+    Compare the metrics of two results of suite.benchmark_project.
+
+    Args:
+        baseline (dict): The stored results.
+        current (dict): The new results.
+        tolerances (dict, optional): {metric name or pattern: percent},
+            DEFAULT_TOLERANCES by default.
+        confidence (float): Level of the confidence intervals.
+        resamples (int): Bootstrap resamples per metric.
+
+    Returns:
+        list: One dict per metric with its 'metric', 'unit', 'better',
+              'baseline' and 'current' medians, 'change' and confidence
+              interval 'low'/'high' in percent, 'tolerance' and 'verdict'.
+    """
+    tolerances = DEFAULT_TOLERANCES if tolerances is None else tolerances
+    rows = []
+    names = list(baseline['metrics']) + [name for name in current['metrics'] if name not in baseline['metrics']]
+    for name in names:
+        old = baseline['metrics'].get(name, {})
+        new = current['metrics'].get(name, {})
+        row = {
+            'metric': name,
+            'unit': (old or new).get('unit'),
+            'better': (old or new).get('better', 'lower'),
+            'baseline': old.get('median'),
+            'current': new.get('median'),
+            'change': None, 'low': None, 'high': None,
+            'tolerance': tolerance_for(name, tolerances),
+            'verdict': MISSING,
+        }
+        rows.append(row)
+        if not old.get('samples') or not new.get('samples'):
+            continue
+        row['change'] = _change(old['samples'], new['samples'])
+        row['low'], row['high'] = bootstrap_interval(old['samples'], new['samples'], confidence, resamples)
+        # Express both directions as "positive is worse"
+        worse_low, worse_high = (row['low'], row['high']) if row['better'] == 'lower' else (-row['high'], -row['low'])
+        if worse_low > row['tolerance']:
+            row['verdict'] = REGRESSED
+        elif worse_high < -row['tolerance']:
+            row['verdict'] = IMPROVED
+        else:
+            row['verdict'] = UNCHANGED
+    return rows
+
+
+def config_differences(baseline, current):
+    """Return the settings that differ between two runs, which make a comparison less meaningful."""
+    differences = []
+    for section in ('config', 'environment'):
+        for key in sorted(set(baseline.get(section, {})) | set(current.get(section, {}))):
+            if key in ('commit', 'repeat', 'warmup'):
+                continue
+            old, new = baseline.get(section, {}).get(key), current.get(section, {}).get(key)
+            if old != new:
+                differences.append(f"{section}.{key}: {old!r} -> {new!r}")
+    return differences
+
+
+def print_comparison(rows, out=sys.stdout):
+    """Print the rows of compare_results as a table."""
+    def number(value, fmt):
+        return format(value, fmt) if value is not None else '-'
+
+    print(f"{'metric':<26} {'unit':<8} {'baseline':>10} {'current':>10} {'change':>9} "
+          f"{'interval':>19} {'tolerance':>9}  verdict", file=out)
+    for row in rows:
+        interval = f"[{number(row['low'], '+.1f')}, {number(row['high'], '+.1f')}]" if row['low'] is not None else '-'
+        print(f"{row['metric']:<26} {row['unit'] or '':<8} {number(row['baseline'], '.2f'):>10} "
+              f"{number(row['current'], '.2f'):>10} {number(row['change'], '+.1f'):>8}% {interval:>19} "
+              f"{row['tolerance']:>8g}%  {row['verdict'].upper() if row['verdict'] == REGRESSED else row['verdict']}",
+              file=out)
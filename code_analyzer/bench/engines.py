@@ -0,0 +1,89 @@
+#bench/engines.py
+"""
+Compare per-file latency of the subprocess and in-process tool engines.
+
+Usage:
+    python -m code_analyzer.bench.engines <path/to/project> [--repeat 3] [--output engines.json]
+"""
+import argparse
+import json
+import statistics
+import time
+
+from ..analyzer import ENGINE_TOOLS, ENGINES, TOOLS, _find_python_files
+
+
+def _summarize(samples):
+    """Summarize latency samples (seconds) in milliseconds."""
+    return {
+        'runs': len(samples),
+        'mean_ms': round(statistics.mean(samples) * 1000, 3),
+        'median_ms': round(statistics.median(samples) * 1000, 3),
+        'min_ms': round(min(samples) * 1000, 3),
+        'max_ms': round(max(samples) * 1000, 3),
+    }
+
+
+def benchmark_engines(path, tools=ENGINE_TOOLS, engines=ENGINES, repeat=3):
+    """
+    Time every engine of every tool on each Python file in `path`.
+
+    The first call of an engine is reported separately as `cold_ms`, since
+    the in-process engines pay their import cost only once per process.
+
+    Returns:
+        dict: {tool: {engine: latency summary, 'speedup': subprocess/inprocess median}}
+    """
+    files = [full_path for full_path, _ in _find_python_files(path)]
+    if not files:
+        raise ValueError(f"No Python files found in {path}")
+
+    results = {}
+    for tool in tools:
+        results[tool] = {}
+        for engine in engines:
+            start = time.perf_counter()
+            TOOLS[tool](files[0], engine=engine)
+            cold = time.perf_counter() - start
+
+            samples = []
+            for _ in range(repeat):
+                for file_path in files:
+                    start = time.perf_counter()
+                    TOOLS[tool](file_path, engine=engine)
+                    samples.append(time.perf_counter() - start)
+            results[tool][engine] = dict(_summarize(samples), cold_ms=round(cold * 1000, 3))
+
+        if 'subprocess' in results[tool] and 'inprocess' in results[tool]:
+            inprocess = results[tool]['inprocess']['median_ms']
+            results[tool]['speedup'] = round(results[tool]['subprocess']['median_ms'] / inprocess, 2) if inprocess else None
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark subprocess vs in-process tool engines.")
+    parser.add_argument("path", help="Project whose Python files are analyzed")
+    parser.add_argument("--tools", default=",".join(ENGINE_TOOLS), help="Comma-separated tools to benchmark")
+    parser.add_argument("--repeat", type=int, default=3, help="Passes over the files per engine")
+    parser.add_argument("-o", "--output", default=None, help="Write the results as JSON to this file")
+    args = parser.parse_args()
+
+    results = benchmark_engines(args.path, tools=args.tools.split(","), repeat=args.repeat)
+
+    print(f"{'tool':<8} {'engine':<11} {'median ms':>10} {'mean ms':>10} {'cold ms':>10}")
+    for tool, engines in results.items():
+        for engine in ENGINES:
+            if engine in engines:
+                row = engines[engine]
+                print(f"{tool:<8} {engine:<11} {row['median_ms']:>10.1f} {row['mean_ms']:>10.1f} {row['cold_ms']:>10.1f}")
+        if engines.get('speedup'):
+            print(f"{tool:<8} {'speedup':<11} {engines['speedup']:>9.2f}x")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=4)
+        print(f"Results saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+#bench/memory.py
+"""
+Measure the memory a large report takes, with issues stored as dicts and
+as the slotted records of CodeReview/issue.py.
+
+A synthetic flake8 output of many findings over many files is parsed
+twice: once into a dict per issue, as the runners used to, and once with
+parsers.parse_flake8_output into LintIssue records. For each form the
+benchmark reports the memory the parsed issues hold and the peak while
+parsing (both from tracemalloc), the parse time and the time to serialize
+them as JSON.
+
+Usage:
+    python -m code_analyzer.bench memory [--issues 1000000] [--files 5000] [--seed 0] [-o memory.json]
+"""
+import gc
+import json
+import random
+import re
+import time
+import tracemalloc
+
+from CodeReview.issue import to_json
+from .parsers import parse_flake8_output
+
+# Size of the synthetic report by default: a legacy code base nobody has linted.
+DEFAULT_ISSUES = 1_000_000
+DEFAULT_FILES = 5_000
+
+# Findings the synthetic output is made of, weighted like real flake8 output.
+_FINDINGS = (
+    ('E501', 'line too long ({} > 79 characters)', 40),
+    ('W291', 'trailing whitespace', 15),
+    ('E302', 'expected 2 blank lines, found {}', 12),
+    ('F401', "'module_{}' imported but unused", 10),
+    ('E231', "missing whitespace after ','", 8),
+    ('F841', "local variable 'value_{}' is assigned to but never used", 8),
+    ('N802', "function name 'Func{}' should be lowercase", 7),
+)
+
+
+def synthetic_output(issues=DEFAULT_ISSUES, files=DEFAULT_FILES, seed=0):
+    """flake8 output of `issues` findings spread over `files` files."""
+    rng = random.Random(seed)
+    paths = [f"src/package_{index % 50:02d}/legacy_module_{index:05d}.py" for index in range(files)]
+    codes, templates, weights = zip(*_FINDINGS)
+    kinds = rng.choices(range(len(codes)), weights=weights, k=issues)
+    lines = []
+    for number, kind in enumerate(kinds):
+        path = paths[number * files // issues]
+        lines.append(f"{path}:{rng.randint(1, 2000)}:{rng.randint(1, 80)}: {codes[kind]} "
+                     f"{templates[kind].format(rng.randint(80, 200))}")
+    return "\n".join(lines)
+
+
+def parse_as_dicts(output):
+    """Parse flake8 output into a dict per issue, as the runners did before the issue records."""
+    pattern = re.compile(r'^(.*?):(\d+):(\d+):\s([A-Z]\d{3})\s(.*)$')
+    issues = []
+    for line in output.strip().splitlines():
+        match = pattern.match(line)
+        if match:
+            file_path, line_num, column_num, code, message = match.groups()
+            issues.append({
+                'file': file_path.strip(),
+                'line': int(line_num),
+                'column': int(column_num),
+                'code': code,
+                'message': message.strip(),
+            })
+    return issues
+
+
+def measure(parse, output):
+    """
+    Parse `output` and measure it.
+
+    Returns:
+        dict: {'issues', 'retained', 'peak', 'parse', 'serialize'} with
+              memory in bytes and times in seconds.
+    """
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    issues = parse(output)
+    parse_time = time.perf_counter() - start
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    json.dumps(issues, default=to_json)
+    serialize_time = time.perf_counter() - start
+    return {
+        'issues': len(issues),
+        'retained': retained,
+        'peak': peak,
+        'parse': round(parse_time, 6),
+        'serialize': round(serialize_time, 6),
+    }
+
+
+def benchmark_memory(issues=DEFAULT_ISSUES, files=DEFAULT_FILES, seed=0):
+    """
+    Compare the memory and time of dict and record issues on a synthetic report.
+
+    Returns:
+        dict: {'config', 'dicts', 'records', 'saved'} where dicts and records
+              are the measurements of measure() and saved is the fraction
+              of retained memory the records save.
+    """
+    output = synthetic_output(issues, files, seed)
+    dicts = measure(parse_as_dicts, output)
+    records = measure(parse_flake8_output, output)
+    return {
+        'config': {'issues': issues, 'files': files, 'seed': seed, 'output_bytes': len(output)},
+        'dicts': dicts,
+        'records': records,
+        'saved': round(1 - records['retained'] / dicts['retained'], 4) if dicts['retained'] else 0.0,
+    }
+
+
+def print_memory(results):
+    """Print the results of benchmark_memory as a table."""
+    megabyte = 1024 * 1024
+    print(f"{results['config']['issues']} issues in {results['config']['files']} files")
+    print(f"{'form':<8} {'retained MB':>12} {'peak MB':>10} {'B/issue':>8} {'parse s':>8} {'json s':>8}")
+    for form in ('dicts', 'records'):
+        row = results[form]
+        per_issue = row['retained'] / row['issues'] if row['issues'] else 0
+        print(f"{form:<8} {row['retained'] / megabyte:>12.1f} {row['peak'] / megabyte:>10.1f} {per_issue:>8.0f} "
+              f"{row['parse']:>8.2f} {row['serialize']:>8.2f}")
+    print(f"Records hold {results['saved']:.0%} less memory than dicts.")
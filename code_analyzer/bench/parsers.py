@@ -0,0 +1,291 @@
+#bench/parsers.py
+"""
+Measure the throughput of the tool output parsers on multi-megabyte outputs.
+
+For every tool the same synthetic findings are rendered both in the
+tool's human-readable text format, which the runners used to scrape with
+regexes, and in the machine-readable format they now request (flake8's
+tab-separated --format, pylint's json2, mypy's JSON lines, pytest's JUnit
+XML). Each parser's best time over a few repeats gives its throughput in
+MB/s and records/s. A last measurement pipes the flake8 output through a
+subprocess, read whole and then parsed versus parsed as it streams in,
+and compares wall time and peak memory.
+
+Usage:
+    python -m code_analyzer.bench parsers [--size 8] [--repeat 3] [--seed 0] [-o parsers.json]
+"""
+import io
+import json
+import os
+import random
+import re
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from CodeReview.CodeQuality.flake8_runner import FLAKE8_FORMAT, parse_flake8_lines
+from CodeReview.CodeQuality.mypy_runner import parse_mypy_json_lines
+from CodeReview.CodeQuality.pylint_runner import parse_pylint_json
+from CodeReview.TestingAndTestCoverage.pytest_runner import parse_junit_xml
+from CodeReview.issue import LintIssue, MypyIssue, PylintIssue
+from CodeReview.process import run_command
+
+# Megabytes of output generated per format by default.
+DEFAULT_SIZE_MB = 8
+
+# Findings the outputs are made of: (code, symbol, message).
+_FINDINGS = (
+    ('E501', 'line-too-long', 'Line too long (120/100)'),
+    ('W0611', 'unused-import', "Unused import os"),
+    ('C0116', 'missing-function-docstring', 'Missing function or method docstring'),
+    ('E1101', 'no-member', "Instance of 'Config' has no 'values' member"),
+    ('R0913', 'too-many-arguments', 'Too many arguments (7/5)'),
+)
+
+
+def _findings(rng, count, files):
+    """(path, line, column, code, symbol, message) tuples spread over `files` files."""
+    paths = [f"src/package_{index % 20:02d}/module_{index:05d}.py" for index in range(files)]
+    for number in range(count):
+        code, symbol, message = rng.choice(_FINDINGS)
+        yield paths[number * files // count], rng.randint(1, 3000), rng.randint(0, 79), code, symbol, message
+
+
+def _fill(render, size, seed):
+    """Render findings until the output reaches `size` bytes; returns (text, records)."""
+    rng = random.Random(seed)
+    # Estimate the record count from a sample, then render exactly that many
+    sample = render(list(_findings(random.Random(seed), 100, 10)))
+    count = max(1, int(size / (len(sample) / 100)))
+    return render(list(_findings(rng, count, max(1, count // 200)))), count
+
+
+# The regex parsers the runners used on the tools' text output, kept here as
+# the baseline the structured parsers are measured against.
+
+def parse_flake8_output(output):
+    """Parse flake8's default text output (path:line:col: CODE message) into LintIssue records."""
+    pattern = re.compile(r'^(.*?):(\d+):(\d+):\s([A-Z]\d{3})\s(.*)$')
+    issues = []
+    for line in output.strip().splitlines():
+        match = pattern.match(line)
+        if match:
+            file_path, line_num, column_num, code, message = match.groups()
+            issues.append(LintIssue(file_path.strip(), int(line_num), int(column_num), code, message.strip()))
+    return issues
+
+
+def parse_pylint_output(output):
+    """Parse pylint's text output into PylintIssue records, followed by a {"summary": {"rating": ...}} dict."""
+    pattern = re.compile(r'^(.*?):(\d+):(\d+):\s([A-Z]\d{4}):\s(.*)\s\((.*?)\)$', re.MULTILINE)
+    issues = []
+    for match in pattern.finditer(output):
+        file_path, line, column, msg_id, message, symbolic_name = match.groups()
+        issues.append(PylintIssue(file_path.strip(), int(line), int(column), msg_id, symbolic_name, message.strip()))
+    rating_match = re.search(r"Your code has been rated at ([\d\.]+)/10", output)
+    if rating_match:
+        issues.append({"summary": {"rating": float(rating_match.group(1))}})
+    return issues
+
+
+def parse_mypy_output(output):
+    """Parse mypy's text output (path:line: error: message  [code]) into MypyIssue records."""
+    pattern = re.compile(r'^(.*?):(\d+): (error|note): (.*?)(?:\s\s\[(.*?)\])?$')
+    issues = []
+    for line in output.strip().splitlines():
+        match = pattern.match(line)
+        if match:
+            file_path, line_num, msg_type, message, code = match.groups()
+            issues.append(MypyIssue(file_path.strip(), int(line_num), msg_type, message.strip(),
+                                    code.strip() if code else None))
+    return issues
+
+
+def parse_pytest_output(output):
+    """Parse the FAILED/PASSED/ERROR lines and the summary line of pytest's console output."""
+    results = []
+    for line in output.splitlines():
+        if re.match(r"^FAILED .*::.* - .*", line):
+            parts = line.split(" - ")
+            if len(parts) == 2:
+                results.append({"status": "FAILED", "test": parts[0].strip(), "reason": parts[1].strip()})
+        elif re.match(r"^PASSED .*", line):
+            results.append({"status": "PASSED", "test": line.strip()})
+        elif re.match(r"^ERROR .*::.*", line):
+            results.append({"status": "ERROR", "test": line.strip()})
+    summary_match = re.search(r"==+ (.+) ==+", output)
+    if summary_match:
+        results.append({"summary": summary_match.group(1).strip()})
+    return results
+
+
+def _flake8_text(findings):
+    # flake8 codes are a letter and three digits
+    return "".join(f"{path}:{line}:{column + 1}: {code[:4]} {message}\n"
+                   for path, line, column, code, _, message in findings)
+
+
+def _flake8_tabs(findings):
+    return "".join(FLAKE8_FORMAT % {'path': path, 'row': line, 'col': column + 1, 'code': code[:4], 'text': message}
+                   + "\n" for path, line, column, code, _, message in findings)
+
+
+def _pylint_text(findings):
+    return "".join(f"{path}:{line}:{column}: {code.ljust(5, '0')}: {message} ({symbol})\n"
+                   for path, line, column, code, symbol, message in findings) + \
+        "\nYour code has been rated at 7.50/10\n"
+
+
+def _pylint_json(findings):
+    messages = [{"type": "convention", "symbol": symbol, "message": message, "messageId": code.ljust(5, '0'),
+                 "confidence": "HIGH", "module": "module", "obj": "", "line": line, "column": column,
+                 "endLine": None, "endColumn": None, "path": path, "absolutePath": "/" + path}
+                for path, line, column, code, symbol, message in findings]
+    return json.dumps({"messages": messages, "statistics": {"score": 7.5}}, indent=4)
+
+
+def _mypy_text(findings):
+    return "".join(f"{path}:{line}: error: {message}  [{symbol}]\n" for path, line, _, _, symbol, message in findings)
+
+
+def _mypy_json(findings):
+    return "".join(json.dumps({"file": path, "line": line, "column": column, "end_line": line,
+                               "end_column": column + 1, "message": message, "hint": None, "code": symbol,
+                               "severity": "error"}) + "\n"
+                   for path, line, column, _, symbol, message in findings)
+
+
+def _test_name(path, line):
+    return f"{path.replace('src/', 'tests/')}::test_case_{line}"
+
+
+def _pytest_text(findings):
+    # The -rA short summary, the most the console output tells about each test
+    lines = []
+    for path, line, _, code, _, message in findings:
+        if code.startswith('E'):
+            lines.append(f"FAILED {_test_name(path, line)} - AssertionError: {message}\n")
+        else:
+            lines.append(f"PASSED {_test_name(path, line)}\n")
+    return "".join(lines) + f"==== {len(findings)} tests in 12.34s ====\n"
+
+
+def _junit_xml(findings):
+    from xml.sax.saxutils import quoteattr
+
+    cases = []
+    for path, line, _, code, _, message in findings:
+        module = path[:-3].replace('/', '.')
+        head = f'<testcase classname="{module}" name="test_case_{line}" file="{path}" line="{line}" time="0.001"'
+        if code.startswith('E'):
+            cases.append(f'{head}><failure message={quoteattr("AssertionError: " + message)}>'
+                         f'assert False</failure></testcase>')
+        else:
+            cases.append(f'{head} />')
+    return ('<?xml version="1.0" encoding="utf-8"?><testsuites><testsuite name="pytest" time="12.34">'
+            + "\n".join(cases) + '</testsuite></testsuites>')
+
+
+# Formats compared per tool: (name, render, parse) with parse taking the rendered text.
+FORMATS = {
+    'flake8': (
+        ('text', _flake8_text, parse_flake8_output),
+        ('tabs', _flake8_tabs, lambda text: parse_flake8_lines(io.StringIO(text))),
+    ),
+    'pylint': (
+        ('text', _pylint_text, parse_pylint_output),
+        ('json2', _pylint_json, lambda text: parse_pylint_json(io.StringIO(text))),
+    ),
+    'mypy': (
+        ('text', _mypy_text, parse_mypy_output),
+        ('json', _mypy_json, lambda text: parse_mypy_json_lines(io.StringIO(text))),
+    ),
+    'pytest': (
+        ('text', _pytest_text, parse_pytest_output),
+        ('junit', _junit_xml, lambda text: parse_junit_xml(io.BytesIO(text.encode()))),
+    ),
+}
+
+
+def _best_time(parse, text, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        records = parse(text)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, len(records)
+
+
+def measure_pipe(text, parse_lines, parse_text):
+    """
+    Pipe `text` through a subprocess and parse it, once read whole and
+    once streamed into the parser.
+
+    Returns:
+        dict: {'buffered': {...}, 'streamed': {...}} with 'wall' seconds and
+              'peak' bytes allocated by this process (tracemalloc).
+    """
+    with tempfile.NamedTemporaryFile('w', suffix='.txt', delete=False) as f:
+        f.write(text)
+    command = [sys.executable, '-c', 'import shutil, sys; shutil.copyfileobj(open(sys.argv[1]), sys.stdout)', f.name]
+    results = {}
+    try:
+        for mode in ('buffered', 'streamed'):
+            tracemalloc.start()
+            start = time.perf_counter()
+            if mode == 'buffered':
+                records = parse_text(run_command(command, capture_output=True, text=True).stdout)
+            else:
+                records = run_command(command, capture_output=True, text=True, parse_stdout=parse_lines).stdout
+            wall = time.perf_counter() - start
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            results[mode] = {'records': len(records), 'wall': round(wall, 6), 'peak': peak}
+    finally:
+        os.unlink(f.name)
+    return results
+
+
+def benchmark_parsers(size_mb=DEFAULT_SIZE_MB, repeat=3, seed=0):
+    """
+    Measure every parser of FORMATS on about `size_mb` MB of output.
+
+    Returns:
+        dict: {'config', 'parsers', 'pipe'} where parsers maps
+              '<tool>.<format>' to its 'bytes', 'records', best 'seconds',
+              'mb_per_s' and 'records_per_s', and pipe holds measure_pipe()
+              of the flake8 output.
+    """
+    size = int(size_mb * 1024 * 1024)
+    parsers = {}
+    for tool, formats in FORMATS.items():
+        for name, render, parse in formats:
+            text, _ = _fill(render, size, seed)
+            seconds, records = _best_time(parse, text, repeat)
+            parsers[f"{tool}.{name}"] = {
+                'bytes': len(text),
+                'records': records,
+                'seconds': round(seconds, 6),
+                'mb_per_s': round(len(text) / (1024 * 1024) / seconds, 2),
+                'records_per_s': round(records / seconds),
+            }
+    text, _ = _fill(_flake8_tabs, size, seed)
+    return {
+        'config': {'size_mb': size_mb, 'repeat': repeat, 'seed': seed},
+        'parsers': parsers,
+        'pipe': measure_pipe(text, parse_flake8_lines, lambda output: parse_flake8_lines(output.splitlines())),
+    }
+
+
+def print_parsers(results):
+    """Print the results of benchmark_parsers as a table."""
+    print(f"{'parser':<16} {'MB':>7} {'records':>9} {'seconds':>8} {'MB/s':>8} {'records/s':>11}")
+    for name, row in results['parsers'].items():
+        print(f"{name:<16} {row['bytes'] / (1024 * 1024):>7.1f} {row['records']:>9} {row['seconds']:>8.3f} "
+              f"{row['mb_per_s']:>8.1f} {row['records_per_s']:>11}")
+    pipe = results['pipe']
+    print(f"\nflake8 output through a pipe: buffered {pipe['buffered']['wall']:.3f}s, "
+          f"peak {pipe['buffered']['peak'] / (1024 * 1024):.1f} MB; streamed {pipe['streamed']['wall']:.3f}s, "
+          f"peak {pipe['streamed']['peak'] / (1024 * 1024):.1f} MB")
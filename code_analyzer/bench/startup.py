@@ -0,0 +1,85 @@
+#bench/startup.py
+"""
+Measure the start-up cost of the analyzer in fresh interpreters.
+
+Compares importing the package and running `--help` (which only import the
+runners of selected tools) with importing every runner module up front, as
+the analyzer used to.
+
+Usage:
+    python -m code_analyzer.bench.startup [--repeat 10] [--output startup.json]
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+
+# Snippets timed in a fresh interpreter each
+SCENARIOS = {
+    'python': "pass",
+    'import code_analyzer': "import code_analyzer",
+    'cli --help': (
+        "import sys; sys.argv = ['code-analyzer-v2', '--help']\n"
+        "from code_analyzer.cli import main\n"
+        "try:\n    main()\nexcept SystemExit:\n    pass"
+    ),
+    'import all runners': (
+        "import code_analyzer\n"
+        "from code_analyzer.registry import REGISTRY, load_entry_point\n"
+        "for spec in REGISTRY.values():\n"
+        "    try:\n        load_entry_point(spec.entry_point)\n"
+        "    except ImportError:\n        pass"
+    ),
+}
+
+
+def time_snippet(code, repeat=10):
+    """Return the wall time (seconds) of running `code` in `repeat` fresh interpreters."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, '-c', code], check=True, stdout=subprocess.DEVNULL)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def benchmark_startup(repeat=10):
+    """
+    Time every scenario in `SCENARIOS`.
+
+    Returns:
+        dict: {scenario: {'median_ms', 'min_ms', 'max_ms'}}
+    """
+    results = {}
+    for name, code in SCENARIOS.items():
+        samples = time_snippet(code, repeat)
+        results[name] = {
+            'median_ms': round(statistics.median(samples) * 1000, 1),
+            'min_ms': round(min(samples) * 1000, 1),
+            'max_ms': round(max(samples) * 1000, 1),
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark analyzer start-up time.")
+    parser.add_argument("--repeat", type=int, default=10, help="Fresh interpreters per scenario")
+    parser.add_argument("-o", "--output", default=None, help="Write the results as JSON to this file")
+    args = parser.parse_args()
+
+    results = benchmark_startup(args.repeat)
+
+    print(f"{'scenario':<22} {'median ms':>10} {'min ms':>10} {'max ms':>10}")
+    for name, row in results.items():
+        print(f"{name:<22} {row['median_ms']:>10.1f} {row['min_ms']:>10.1f} {row['max_ms']:>10.1f}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=4)
+        print(f"Results saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+#bench/suite.py
+"""
+Benchmark analyze_project end to end: throughput, per-tool latency and peak memory.
+
+Every sample analyzes the project in a fresh interpreter, in an empty
+working directory and without the result cache, so no sample benefits from
+the ones before it. The results are a JSON document of raw samples and
+their summaries, meant to be stored and compared across commits (see
+`python -m code_analyzer.bench compare`).
+
+Usage:
+    python -m code_analyzer.bench run [<path/to/project>] [--files 50 ...] [--repeat 5] [-o bench.json]
+"""
+import datetime
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from .synthetic import DEFAULTS, generate_project
+
+# Version of the results format.
+SCHEMA = 1
+
+# Tools benchmarked by default: the file-scoped tools that analyze code
+# without running it.
+DEFAULT_TOOLS = ('pylint', 'flake8', 'mypy', 'pyspellchecker', 'radon-cc', 'bandit', 'black', 'isort')
+
+# Code of one sample, run in a fresh interpreter with its settings as JSON in argv[1].
+_SAMPLE = """\
+import json, sys
+from code_analyzer.bench.suite import run_sample
+print(json.dumps(run_sample(**json.loads(sys.argv[1]))))
+"""
+
+# ru_maxrss is reported in kilobytes on Linux and in bytes on macOS.
+_MAXRSS_UNIT = 1 if sys.platform == 'darwin' else 1024
+
+
+def run_sample(path, tools, jobs=1, batch=False):
+    """
+    Analyze `path` once in this process and return the raw measurements.
+
+    Returns:
+        dict: {'wall', 'files', 'peak_rss', 'children_peak_rss', 'latency'}
+              with wall time in seconds, peak RSS in bytes and latency the
+              median wall time in seconds of each tool's runs.
+    """
+    from ..analyzer import PROJECT_KEY, analyze_project
+
+    start = time.perf_counter()
+    report = analyze_project(path, jobs=jobs, batch=batch, tools=tools)
+    wall = time.perf_counter() - start
+    rollup = report[PROJECT_KEY]['_meta']['rollup']
+    sample = {
+        'wall': wall,
+        'files': len(report) - 1,
+        'latency': {tool: totals['wall']['p50'] for tool, totals in rollup.items()},
+        'peak_rss': None,
+        'children_peak_rss': None,
+    }
+    try:
+        import resource
+    except ImportError:  # Windows
+        return sample
+    sample['peak_rss'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * _MAXRSS_UNIT
+    sample['children_peak_rss'] = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * _MAXRSS_UNIT
+    return sample
+
+
+def _fresh_sample(path, tools, jobs, batch):
+    """Run one sample in a fresh interpreter with an empty working directory."""
+    package_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [package_root, os.environ.get('PYTHONPATH')])))
+    settings = json.dumps({'path': os.path.abspath(path), 'tools': list(tools), 'jobs': jobs, 'batch': batch})
+    with tempfile.TemporaryDirectory(prefix='code-analyzer-bench-') as cwd:
+        result = subprocess.run([sys.executable, '-c', _SAMPLE, settings], cwd=cwd, env=env,
+                                capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"benchmark sample failed:\n{result.stderr}")
+    return json.loads(result.stdout.splitlines()[-1])
+
+
+def summarize(samples):
+    """Summary statistics of a metric's samples."""
+    return {
+        'median': statistics.median(samples),
+        'mean': statistics.mean(samples),
+        'stdev': statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        'min': min(samples),
+        'max': max(samples),
+    }
+
+
+def _metric(unit, better, samples):
+    samples = [round(value, 6) for value in samples if value is not None]
+    return dict(unit=unit, better=better, samples=samples, **(summarize(samples) if samples else {}))
+
+
+def _git_commit():
+    """Commit of the analyzer's checkout, if it is one."""
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    try:
+        result = subprocess.run(['git', '-C', root, 'rev-parse', 'HEAD'], capture_output=True, text=True)
+    except OSError:
+        return None
+    return result.stdout.strip() or None
+
+
+def benchmark_project(path=None, tools=DEFAULT_TOOLS, jobs=1, batch=False, repeat=5, warmup=1, **project):
+    """
+    Benchmark analyze_project on a project.
+
+    Args:
+        path (str, optional): Project to analyze. A synthetic project is
+            generated (and deleted afterwards) if None.
+        tools (Iterable[str]): Tools to run.
+        jobs (int): Worker processes, as for analyze_project.
+        batch (bool): Use batched tool runs.
+        repeat (int): Samples to take.
+        warmup (int): Samples to take and discard first, e.g. to fill the
+            operating system's file cache.
+        **project: Arguments of synthetic.generate_project.
+
+    Returns:
+        dict: {'schema', 'created', 'environment', 'config', 'metrics'}
+              where metrics maps a metric name ('throughput', 'wall',
+              'peak_rss', 'children_peak_rss', 'latency.<tool>') to its
+              unit, direction ('better': 'higher' or 'lower'), samples and
+              summary statistics.
+    """
+    tools = list(tools)
+    with tempfile.TemporaryDirectory(prefix='code-analyzer-synthetic-') as synthetic_dir:
+        if path is None:
+            project = generate_project(synthetic_dir, **{**DEFAULTS, **project})
+            path = synthetic_dir
+        else:
+            project = {'path': os.path.abspath(path)}
+        for _ in range(warmup):
+            _fresh_sample(path, tools, jobs, batch)
+        samples = [_fresh_sample(path, tools, jobs, batch) for _ in range(repeat)]
+
+    megabyte = 1024 * 1024
+    metrics = {
+        'throughput': _metric('files/s', 'higher', [sample['files'] / sample['wall'] for sample in samples]),
+        'wall': _metric('s', 'lower', [sample['wall'] for sample in samples]),
+        'peak_rss': _metric('MB', 'lower', [
+            sample['peak_rss'] / megabyte if sample['peak_rss'] else None for sample in samples]),
+        'children_peak_rss': _metric('MB', 'lower', [
+            sample['children_peak_rss'] / megabyte if sample['children_peak_rss'] else None for sample in samples]),
+    }
+    for tool in tools:
+        metrics[f'latency.{tool}'] = _metric('ms', 'lower', [
+            sample['latency'][tool] * 1000 for sample in samples if tool in sample['latency']])
+
+    return {
+        'schema': SCHEMA,
+        'created': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+        'environment': {
+            'python': platform.python_version(),
+            'implementation': platform.python_implementation(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'commit': _git_commit(),
+        },
+        'config': {
+            'project': project,
+            'files': samples[0]['files'] if samples else 0,
+            'tools': tools,
+            'jobs': jobs,
+            'batch': batch,
+            'repeat': repeat,
+            'warmup': warmup,
+        },
+        'metrics': metrics,
+    }
+
+
+def print_results(results, out=sys.stdout):
+    """Print the metrics of benchmark_project as a table."""
+    print(f"{'metric':<26} {'unit':<8} {'median':>10} {'mean':>10} {'stdev':>10} {'min':>10} {'max':>10}", file=out)
+    for name, metric in results['metrics'].items():
+        if not metric['samples']:
+            continue
+        print(f"{name:<26} {metric['unit']:<8} " + " ".join(
+            f"{metric[key]:>10.2f}" for key in ('median', 'mean', 'stdev', 'min', 'max')), file=out)
@@ -0,0 +1,137 @@
+#bench/synthetic.py
+"""
+Generate synthetic Python projects of a chosen size to benchmark the analyzer on.
+
+A project is a package of modules that import each other (always from
+lower-numbered modules, so there are no import cycles) and a tests/ folder
+of pytest tests calling into them. The same arguments and seed always give
+the same project, byte for byte, so runs on different machines or commits
+analyze identical code.
+
+Usage:
+    python -m code_analyzer.bench generate <out_dir> [--files 50] [--lines 200] [--functions 8]
+                                                     [--tests 100] [--fan-out 3] [--seed 0]
+"""
+import os
+import random
+
+# Name of the generated package.
+PACKAGE = 'synthetic_pkg'
+
+# Default size of a generated project.
+DEFAULTS = {
+    'files': 50,
+    'lines': 200,
+    'functions': 8,
+    'tests': 100,
+    'fan_out': 3,
+    'seed': 0,
+}
+
+# Lines of a function besides its filler statements.
+_FUNCTION_OVERHEAD = 10
+
+
+def _module_name(index):
+    return f"module_{index:04d}"
+
+
+def _function_source(rng, module, index, deps, filler):
+    """Source of one function; some carry the findings real code has."""
+    name = f"func_{module:04d}_{index}"
+    lines = [
+        f"def {name}(value: int, scale: int = {rng.randint(2, 6)}) -> int:",
+        f'    """Compute step {index} of module {module} from value."""',
+        "    total = value",
+        "    for step in range(scale):",
+        f"        if step % {rng.randint(2, 5)} == 0:",
+        f"            total += step * {rng.randint(1, 9)}",
+        "        else:",
+        f"            total -= {rng.randint(1, 9)}",
+    ]
+    for _ in range(filler):
+        lines.append(f"    total = (total * {rng.randint(2, 97)} + {rng.randint(1, 997)}) % 1000003")
+    kind = rng.random()
+    if kind < 0.1:
+        lines.append("    unused = total * 2  # pylint and flake8 report this")
+    elif kind < 0.15:
+        lines.append("    assert total >= 0, 'totel must not be negativ'")
+    if deps:
+        dep = rng.choice(deps)
+        lines.append(f"    return total + dep_{dep}.func_{dep:04d}_0(total % 97)")
+    else:
+        lines.append("    return total")
+    return lines
+
+
+def module_source(rng, module, lines, functions, fan_out):
+    """Source of one module of about `lines` lines importing up to `fan_out` earlier modules."""
+    deps = sorted(rng.sample(range(module), min(fan_out, module)))
+    filler = max(0, (lines - 4 - len(deps)) // max(functions, 1) - _FUNCTION_OVERHEAD)
+    source = [f'"""Synthetic module {module}."""']
+    source += [f"from {PACKAGE} import {_module_name(dep)} as dep_{dep}" for dep in deps]
+    for index in range(functions):
+        # Only the first function of a module is called by others, which
+        # keeps call chains linear however large the project is
+        source += ["", ""] + _function_source(rng, module, index, deps if index == 0 else [], filler)
+    return "\n".join(source) + "\n"
+
+
+def test_source(rng, module, functions, count):
+    """Source of a test file with `count` tests of one module."""
+    source = [f'"""Tests of {_module_name(module)}."""', f"from {PACKAGE} import {_module_name(module)}"]
+    for number in range(count):
+        index = rng.randrange(functions)
+        source += [
+            "",
+            "",
+            f"def test_func_{module:04d}_{index}_{number}():",
+            f"    assert isinstance({_module_name(module)}.func_{module:04d}_{index}({rng.randint(0, 999)}), int)",
+        ]
+    return "\n".join(source) + "\n"
+
+
+def generate_project(root, files=DEFAULTS['files'], lines=DEFAULTS['lines'], functions=DEFAULTS['functions'],
+                     tests=DEFAULTS['tests'], fan_out=DEFAULTS['fan_out'], seed=DEFAULTS['seed']):
+    """
+    Write a synthetic project into `root`.
+
+    Args:
+        root (str): Directory to create the project in.
+        files (int): Modules in the package.
+        lines (int): Approximate lines per module.
+        functions (int): Functions per module.
+        tests (int): Test functions, spread over one test file per module
+            (as many files as needed).
+        fan_out (int): Earlier modules each module imports.
+        seed (int): Seed of the generator.
+
+    Returns:
+        dict: The parameters, plus the number of Python files and lines written.
+    """
+    rng = random.Random(seed)
+    package_dir = os.path.join(root, PACKAGE)
+    tests_dir = os.path.join(root, 'tests')
+    os.makedirs(package_dir, exist_ok=True)
+    os.makedirs(tests_dir, exist_ok=True)
+
+    written = {}
+    written[os.path.join(package_dir, '__init__.py')] = '"""Synthetic package for benchmarks."""\n'
+    for module in range(files):
+        written[os.path.join(package_dir, _module_name(module) + '.py')] = module_source(
+            rng, module, lines, functions, fan_out)
+    per_file, extra = divmod(tests, files) if files else (0, 0)
+    for module in range(files):
+        count = per_file + (module < extra)
+        if count:
+            written[os.path.join(tests_dir, f"test_{_module_name(module)}.py")] = test_source(
+                rng, module, functions, count)
+
+    for path, source in written.items():
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(source)
+    return {
+        'files': files, 'lines': lines, 'functions': functions, 'tests': tests, 'fan_out': fan_out, 'seed': seed,
+        'python_files': len(written),
+        'total_lines': sum(source.count("\n") for source in written.values()),
+    }
@@ -0,0 +1,309 @@
+#cache.py
+import hashlib
+import json
+import os
+import sys
+import tempfile
+from collections import OrderedDict
+from functools import lru_cache
+
+from CodeReview.issue import Issue, to_json
+
+# Default location of the on-disk result cache.
+DEFAULT_CACHE_DIR = os.path.join(
+    os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache'),
+    'code_analyzer_v2',
+)
+
+# Default size cap of the cache directory, in bytes.
+DEFAULT_MAX_SIZE = 512 * 1024 * 1024
+
+# File in the cache directory holding the mean run time of every tool, used
+# by the scheduler of the next run.
+TIMINGS_FILE = 'timings.json'
+
+# Configuration files whose contents change tool results.
+CONFIG_FILES = (
+    'pyproject.toml', 'setup.cfg', 'tox.ini', '.flake8', '.pylintrc', 'pylintrc',
+    'mypy.ini', '.mypy.ini', '.isort.cfg', '.bandit',
+)
+
+# Distribution that provides each tool, used to read the tool version.
+TOOL_DISTRIBUTIONS = {
+    'pylint': 'pylint',
+    'flake8': 'flake8',
+    'mypy': 'mypy',
+    'pyspellchecker': 'pyspellchecker',
+    'pep8_naming': 'pep8-naming',
+    'radon-cc': 'radon',
+    'refactor': 'refactor',
+    'bandit': 'bandit',
+    'black': 'black',
+    'isort': 'isort',
+    'autopep8': 'autopep8',
+    'sphinx': 'sphinx',
+    'docformatter': 'docformatter',
+    'darglint': 'darglint',
+    'pdoc': 'pdoc',
+    'line_profiler': 'line_profiler',
+    'memory_profiler': 'memory_profiler',
+    'scalene': 'scalene',
+}
+
+# Stand-ins for the analyzed file's path in stored results: its absolute
+# path, the path the tool was given and the path relative to the working
+# directory (pylint's form). Every file with the same content shares one
+# entry, and a hit gets the paths of the file it is read for back. Only
+# strings equal to one of the paths are swapped, never parts of a string.
+PATH_PLACEHOLDERS = ('\0abspath\0', '\0path\0', '\0relpath\0')
+
+
+def file_digest(file_path):
+    """Return the SHA-256 hex digest of a file's contents."""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 16), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+@lru_cache(maxsize=None)
+def tool_version(tool):
+    """
+    Return a version string for `tool` that changes whenever its results may.
+
+    Combines the tool's installed distribution version with the Python and
+    analyzer versions, since the runners themselves live in this package.
+    """
+    # Imported here since importlib.metadata is slow to import and only
+    # needed once a cache is in use
+    from importlib import metadata
+
+    versions = [sys.version.split()[0]]
+    for distribution in ('code_analyzer_v2', TOOL_DISTRIBUTIONS.get(tool)):
+        if not distribution:
+            continue
+        try:
+            versions.append(f"{distribution}=={metadata.version(distribution)}")
+        except metadata.PackageNotFoundError:
+            versions.append(f"{distribution}==unknown")
+    return ';'.join(versions)
+
+
+@lru_cache(maxsize=None)
+def config_digest(config_root):
+    """Return a digest of the tool configuration files found in `config_root`."""
+    digest = hashlib.sha256()
+    for name in CONFIG_FILES:
+        config_path = os.path.join(config_root, name)
+        if os.path.isfile(config_path):
+            digest.update(name.encode())
+            digest.update(file_digest(config_path).encode())
+    return digest.hexdigest()
+
+
+def path_forms(file_path):
+    """Return the forms of `file_path` matching PATH_PLACEHOLDERS."""
+    try:
+        relative = os.path.relpath(file_path)
+    except ValueError:
+        # On another drive than the working directory (Windows)
+        relative = file_path
+    return (os.path.abspath(file_path), file_path, relative)
+
+
+def _swap_strings(value, mapping):
+    """Copy a JSON-like result with every string (value or key) found in `mapping` replaced."""
+    if isinstance(value, str):
+        return mapping.get(value, value)
+    if isinstance(value, dict):
+        return {_swap_strings(key, mapping): _swap_strings(item, mapping) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_swap_strings(item, mapping) for item in value]
+    if isinstance(value, Issue):
+        return _swap_strings(value.to_dict(), mapping)
+    return value
+
+
+def strip_paths(result, forms):
+    """Replace the `forms` of a file's path in a result with PATH_PLACEHOLDERS."""
+    return _swap_strings(result, dict(zip(forms, PATH_PLACEHOLDERS))) if forms else result
+
+
+def restore_paths(result, forms):
+    """Replace the PATH_PLACEHOLDERS in a result with the `forms` of a file's path."""
+    return _swap_strings(result, dict(zip(PATH_PLACEHOLDERS, forms))) if forms else result
+
+
+class ResultCache:
+    """
+    Content-addressed on-disk cache of tool results.
+
+    Entries are keyed by (file content hash, tool name, tool version, tool
+    config hash) and stored as one JSON file each, with the analyzed file's
+    path replaced by PATH_PLACEHOLDERS: files with the same content share an
+    entry and get their own paths back on a hit. Reading an entry refreshes
+    its modification time, and once the directory grows beyond `max_size`
+    bytes the least recently used entries are evicted.
+
+    A long-running process (see server.py) can also keep the
+    `memory_entries` most recently used results in memory, which skips
+    reading and parsing their files.
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_size=DEFAULT_MAX_SIZE, memory_entries=0):
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+        self.memory_entries = memory_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._size = None
+        self._memory = OrderedDict()
+
+    def key(self, content_hash, tool, config_root):
+        """Build the cache key of `tool`'s result for a file with `content_hash`."""
+        parts = (content_hash, tool, tool_version(tool), config_digest(os.path.abspath(config_root)))
+        return hashlib.sha256('\0'.join(parts).encode()).hexdigest()
+
+    def _entry_path(self, key):
+        return os.path.join(self.cache_dir, key[:2], key[2:] + '.json')
+
+    def get(self, key, file_path=None):
+        """
+        Look up a cached result.
+
+        Args:
+            key (str): Cache key, see key().
+            file_path (str, optional): File the result is read for; its
+                paths replace those the result was stored with.
+
+        Returns:
+            tuple: (True, result) on a hit, (False, None) on a miss.
+        """
+        forms = path_forms(file_path) if file_path is not None else None
+        if key in self._memory:
+            self._memory.move_to_end(key)
+            self.hits += 1
+            stored_forms, result = self._memory[key]
+            if stored_forms != forms:
+                result = restore_paths(strip_paths(result, stored_forms), forms)
+            return True, result
+        entry_path = self._entry_path(key)
+        try:
+            with open(entry_path, 'r', encoding='utf-8') as f:
+                text = f.read()
+            result = restore_paths(json.loads(text), forms)
+            os.utime(entry_path)
+        except (OSError, ValueError):
+            self.misses += 1
+            return False, None
+        self.hits += 1
+        self._remember(key, forms, result)
+        return True, result
+
+    def _remember(self, key, forms, result):
+        """Keep a result in the in-memory layer, dropping the least recently used beyond `memory_entries`."""
+        if not self.memory_entries:
+            return
+        self._memory[key] = (forms, result)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def _write_json(self, target_path, data):
+        """Write `data` to `target_path` atomically; returns False if it cannot be stored."""
+        try:
+            text = json.dumps(data, default=to_json)
+        except (TypeError, ValueError):
+            return False
+        os.makedirs(os.path.dirname(target_path), exist_ok=True)
+
+        # Write to a temporary file first so concurrent readers never see a
+        # partially written file.
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(target_path), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(text)
+            os.replace(tmp_path, target_path)
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return False
+        return True
+
+    def put(self, key, result, file_path=None):
+        """
+        Store a result, evicting old entries if the cache grows too large.
+
+        Args:
+            key (str): Cache key, see key().
+            result: JSON-serializable tool result.
+            file_path (str, optional): File the result was produced for;
+                its paths are stored as PATH_PLACEHOLDERS.
+        """
+        forms = path_forms(file_path) if file_path is not None else None
+        entry_path = self._entry_path(key)
+        if not self._write_json(entry_path, strip_paths(result, forms)):
+            return
+        self._remember(key, forms, result)
+
+        if self._size is None:
+            self._size = sum(size for _, size, _ in self._entries())
+        else:
+            self._size += os.path.getsize(entry_path)
+        if self._size > self.max_size:
+            self._evict()
+
+    def _entries(self):
+        """Yield (path, size, last_used) for every entry in the cache."""
+        if not os.path.isdir(self.cache_dir):
+            return
+        for shard in os.scandir(self.cache_dir):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                if entry.name.endswith('.json'):
+                    stat = entry.stat()
+                    yield entry.path, stat.st_size, stat.st_mtime
+
+    def _evict(self):
+        """Remove least recently used entries until the cache is at 90% of its cap."""
+        entries = sorted(self._entries(), key=lambda entry: entry[2])
+        size = sum(entry_size for _, entry_size, _ in entries)
+        target = self.max_size * 0.9
+        for entry_path, entry_size, _ in entries:
+            if size <= target:
+                break
+            try:
+                os.remove(entry_path)
+            except OSError:
+                continue
+            size -= entry_size
+            self.evictions += 1
+        self._size = size
+
+    def timings(self):
+        """Return the mean run time (seconds) per tool recorded by earlier runs."""
+        try:
+            with open(os.path.join(self.cache_dir, TIMINGS_FILE), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def record_timings(self, timings):
+        """Merge the mean run times of this run into the recorded ones."""
+        merged = self.timings()
+        merged.update(timings)
+        self._write_json(os.path.join(self.cache_dir, TIMINGS_FILE), merged)
+
+    def stats(self):
+        """Return hit/miss counters for the report."""
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+            'evictions': self.evictions,
+            'cache_dir': self.cache_dir,
+        }
@@ -1,21 +1,294 @@
 import argparse
 import json
-from .analyzer import analyze_project
+import os
+import sys
+from .analyzer import TOOL_ENGINES, analyze_project, iter_analyze_project
+from .incremental import analyze_incremental
+from .discovery import DEFAULT_INCLUDE
+from .cache import DEFAULT_CACHE_DIR, DEFAULT_MAX_SIZE, ResultCache
+from .limits import DEFAULT_TIMEOUTS, parse_resource_limits
+from .registry import CATEGORIES, REGISTRY, select_tools
+from .scheduler import SCHEDULES, timings_from_report
+from CodeReview.batching import DEFAULT_CHUNK_SIZE
+from CodeReview.issue import to_json
+from CodeReview.sandbox import DEFAULT_MAX_TASKS, configure_sandbox
+
+def write_ndjson(records, out):
+    """
+    Write (rel_path, results) records as newline-delimited JSON, one object
+    per line, flushing each so consumers can read them as they arrive.
+    """
+    for rel_path, results in records:
+        out.write(json.dumps({"path": rel_path, "results": results}, default=to_json) + "\n")
+        out.flush()
+
+def read_report(report_path):
+    """Load a report written in either the json or the ndjson format."""
+    with open(report_path, 'r', encoding='utf-8') as f:
+        text = f.read()
+    try:
+        return json.loads(text)
+    except ValueError:
+        records = (json.loads(line) for line in text.splitlines() if line.strip())
+        return {record["path"]: record["results"] for record in records}
+
+def _split(names):
+    return [name.strip() for name in names.split(",") if name.strip()] if names else None
+
+def add_tool_arguments(parser):
+    """Add the tool selection, cache, engine and limit options shared by analyze and serve."""
+    parser.add_argument("--tools", metavar="NAMES", default=None,
+                        help="Comma-separated tools to run (default: all, see --list-tools)")
+    parser.add_argument("--skip", metavar="NAMES", default=None, help="Comma-separated tools not to run")
+    parser.add_argument("--category", metavar="NAMES", default=None,
+                        help=f"Comma-separated categories to run: {', '.join(CATEGORIES)}")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR,
+                        help=f"Directory of the result cache (default: {DEFAULT_CACHE_DIR})")
+    parser.add_argument("--cache-size", type=int, default=DEFAULT_MAX_SIZE // (1024 * 1024),
+                        help="Maximum cache size in MB before least recently used entries are evicted")
+    parser.add_argument("--no-cache", action="store_true", help="Do not read or write the result cache")
+    parser.add_argument("--engine", metavar="TOOL=ENGINE", action="append", default=[],
+                        help="Execution engine of a tool (repeatable, e.g. --engine pylint=inprocess): "
+                             + "; ".join(f"{tool}: {' or '.join(engines)}" for tool, engines in TOOL_ENGINES.items()))
+    parser.add_argument("--mypy-cache-dir", default=None,
+                        help="Incremental mypy cache shared by all runs, one subdirectory per project "
+                             "(default: mypy/ in the cache directory, or mypy's own .mypy_cache with --no-cache)")
+    parser.add_argument("--mypy-sqlite-cache", action="store_true",
+                        help="Keep the mypy cache in a single SQLite database")
+    parser.add_argument("--timeout", metavar="[TOOL=]SECONDS", action="append", default=[],
+                        help="Wall-clock timeout per tool run, for every tool or one (repeatable, 0 = none; "
+                             "default for file tools by cost: " + ", ".join(f"{cost} {seconds:g}s" for cost, seconds
+                                                             in DEFAULT_TIMEOUTS.items()) + ")")
+    parser.add_argument("--cpu-limit", metavar="[TOOL=]SECONDS", action="append", default=[],
+                        help="CPU seconds each tool subprocess may use (repeatable)")
+    parser.add_argument("--memory-limit", metavar="[TOOL=]MB", action="append", default=[],
+                        help="Address space in MB each tool subprocess may use (repeatable)")
+    parser.add_argument("--sandbox-workers", type=int, default=None,
+                        help="Sandbox worker processes the profilers run in, per analyzer process "
+                             "(default: one per CPU core)")
+    parser.add_argument("--sandbox-max-tasks", type=int, default=DEFAULT_MAX_TASKS,
+                        help=f"Files a sandbox worker profiles before it is replaced (default: {DEFAULT_MAX_TASKS})")
+
+def tool_settings(parser, args, memory_entries=0):
+    """
+    Build the settings given by the options of add_tool_arguments, and
+    size this process' sandbox pool (see CodeReview.sandbox).
+
+    Returns:
+        tuple: (tools, cache, tool_options, resource_limits) as taken by
+               analyzer.analyze_project.
+    """
+    tools = None
+    if args.tools or args.skip or args.category:
+        try:
+            tools = select_tools(_split(args.tools), _split(args.skip), _split(args.category))
+        except ValueError as e:
+            parser.error(str(e))
+
+    cache = None
+    if not args.no_cache:
+        cache = ResultCache(args.cache_dir, args.cache_size * 1024 * 1024, memory_entries=memory_entries)
+    tool_options = {}
+    for selection in args.engine:
+        tool, _, engine = selection.partition("=")
+        if engine not in TOOL_ENGINES.get(tool, ()):
+            parser.error(f"invalid --engine {selection!r}: expected TOOL=ENGINE, one of "
+                         + "; ".join(f"{tool}: {' or '.join(engines)}" for tool, engines in TOOL_ENGINES.items()))
+        tool_options[tool] = {"engine": engine}
+    mypy_cache_dir = args.mypy_cache_dir
+    if mypy_cache_dir is None and cache is not None:
+        mypy_cache_dir = os.path.join(os.path.expanduser(args.cache_dir), "mypy")
+    if mypy_cache_dir is not None or args.mypy_sqlite_cache:
+        tool_options.setdefault("mypy", {}).update(cache_dir=mypy_cache_dir, sqlite_cache=args.mypy_sqlite_cache)
+    resource_limits = {}
+    try:
+        parse_resource_limits(args.timeout, "timeout", resource_limits=resource_limits)
+        parse_resource_limits(args.cpu_limit, "cpu", resource_limits=resource_limits)
+        parse_resource_limits(args.memory_limit, "memory", 1024 * 1024, resource_limits)
+    except ValueError as e:
+        parser.error(str(e))
+    if (args.sandbox_workers is not None and args.sandbox_workers < 1) or args.sandbox_max_tasks < 1:
+        parser.error("--sandbox-workers and --sandbox-max-tasks must be at least 1")
+    configure_sandbox(args.sandbox_workers, args.sandbox_max_tasks)
+    return tools, cache, tool_options, resource_limits
+
+def serve_main(argv=None):
+    """Entry point of `code-analyzer-v2 serve`."""
+    from .client import DEFAULT_SOCKET
+    from .server import DEFAULT_MEMORY_ENTRIES, SERVER_ENGINES, serve
+
+    parser = argparse.ArgumentParser(
+        prog="code-analyzer-v2 serve",
+        description="Keep the analyzer loaded and answer single-file analysis requests on a Unix socket "
+                    "(see code-analyzer-v2-client). Engines default to "
+                    + ", ".join(f"{tool}={engine}" for tool, engine in SERVER_ENGINES.items()) + ".")
+    parser.add_argument("--socket", default=DEFAULT_SOCKET, help=f"Socket to listen on (default: {DEFAULT_SOCKET})")
+    parser.add_argument("--memory-entries", type=int, default=DEFAULT_MEMORY_ENTRIES,
+                        help=f"Cached results kept in memory (default: {DEFAULT_MEMORY_ENTRIES})")
+    parser.add_argument("--no-warm-up", action="store_true", help="Do not load every tool before serving")
+    add_tool_arguments(parser)
+    args = parser.parse_args(argv)
+
+    tools, cache, tool_options, resource_limits = tool_settings(parser, args, args.memory_entries)
+    try:
+        serve(args.socket, warm_up=not args.no_warm_up, cache=cache, options=tool_options,
+              tools=tools, resource_limits=resource_limits)
+    except RuntimeError as e:
+        parser.error(str(e))
+
+def query_main(argv=None):
+    """Entry point of `code-analyzer-v2 query`."""
+    from .store import query
+
+    parser = argparse.ArgumentParser(
+        prog="code-analyzer-v2 query",
+        description="Query a report store written with --format sqlite. Tables: runs, issues, metrics, "
+                    "profiles, results; views latest_issues and latest_metrics hold the last run.")
+    parser.add_argument("database", help="SQLite report store")
+    parser.add_argument("sql", nargs="?", default="SELECT id, created, \"commit\", files FROM runs ORDER BY id",
+                        help="Query to run (default: list the runs)")
+    parser.add_argument("--json", action="store_true", help="Print the rows as a JSON list")
+    args = parser.parse_args(argv)
+    if not os.path.exists(args.database):
+        parser.error(f"no such database: {args.database}")
+
+    import sqlite3
+    try:
+        rows = query(args.database, args.sql)
+    except (sqlite3.Error, ValueError) as e:
+        parser.error(str(e))
+    if args.json:
+        print(json.dumps(rows, indent=4))
+        return
+    if not rows:
+        return
+    columns = list(rows[0])
+    cells = [[("" if row[column] is None else str(row[column])) for column in columns] for row in rows]
+    widths = [max(len(column), *(len(line[index]) for line in cells)) for index, column in enumerate(columns)]
+    print("  ".join(column.ljust(width) for column, width in zip(columns, widths)))
+    for line in cells:
+        print("  ".join(cell.ljust(width) for cell, width in zip(line, widths)))
 
 def main():
-    parser = argparse.ArgumentParser(description="Analyze Python project codebase.")
-    parser.add_argument("path", help="Path to the project directory")
-    parser.add_argument("-o", "--output", help="Output file (JSON)", default=None)
+    if sys.argv[1:2] == ["serve"]:
+        return serve_main(sys.argv[2:])
+    if sys.argv[1:2] == ["query"]:
+        return query_main(sys.argv[2:])
+    parser = argparse.ArgumentParser(
+        description="Analyze Python project codebase.",
+        epilog="Run `code-analyzer-v2 serve --help` for the long-running server mode and "
+               "`code-analyzer-v2 query --help` to query a report store.")
+    parser.add_argument("path", nargs="?", help="Path to the project directory")
+    parser.add_argument("-o", "--output", help="Output file (JSON, or the SQLite database with --format sqlite)",
+                        default=None)
+    parser.add_argument("--format", choices=("json", "ndjson", "sqlite"), default="json",
+                        help="json writes one report at the end; ndjson writes one line per file "
+                             "as soon as it is analyzed, then the _project record; sqlite appends the run "
+                             "to the indexed tables of the database given with -o (see `query`)")
+    parser.add_argument("-j", "--jobs", type=int, default=1,
+                        help="Number of worker processes (0 = one per CPU core, default: 1)")
+    parser.add_argument("--async", dest="use_async", action="store_true",
+                        help="Run tool subprocesses on an asyncio event loop instead of worker processes")
+    parser.add_argument("--concurrency", type=int, default=None,
+                        help="With --async: maximum concurrent tool runs (default: one per CPU core)")
+    parser.add_argument("--limit", metavar="TOOL=N", action="append", default=[],
+                        help="With --async: maximum concurrent runs of one tool (repeatable, e.g. --limit mypy=2)")
+    parser.add_argument("--batch", action="store_true",
+                        help="Run pylint, flake8, mypy, bandit, black and isort once per chunk of files")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_CHUNK_SIZE,
+                        help=f"Files per batched tool invocation (default: {DEFAULT_CHUNK_SIZE})")
+    parser.add_argument("--include", metavar="GLOB", action="append", default=[],
+                        help="Only analyze files matching this glob on their relative path or name "
+                             f"(repeatable, default: {', '.join(DEFAULT_INCLUDE)})")
+    parser.add_argument("--exclude", metavar="GLOB", action="append", default=[],
+                        help="Skip files and directories matching this glob (repeatable, e.g. --exclude "
+                             "migrations); virtualenvs, caches, node_modules and build/ are always skipped")
+    parser.add_argument("--max-file-size", metavar="KB", type=int, default=None,
+                        help="Skip files larger than this, such as generated modules")
+    parser.add_argument("--no-gitignore", action="store_true",
+                        help="Also analyze files ignored by .gitignore (default: list files with git "
+                             "ls-files when in a git work tree, else read the .gitignore files)")
+    add_tool_arguments(parser)
+    parser.add_argument("--list-tools", action="store_true", help="List the available tools and exit")
+    parser.add_argument("--schedule", choices=SCHEDULES, default=None,
+                        help="Order of tool runs: lpt minimizes total time, cheap-first the time to the "
+                             "first results (default: lpt with several jobs, fifo otherwise)")
+    parser.add_argument("--timings", metavar="REPORT", default=None,
+                        help="Previous report whose per-tool timings guide the schedule "
+                             "(default: the timings recorded in the cache)")
+    parser.add_argument("--coverage-parallel", action="store_true",
+                        help="Run the coverage test session in parallel mode, measuring the worker processes "
+                             "tests start with multiprocessing, and combine the results")
+    parser.add_argument("--since", metavar="REV", default=None,
+                        help="Only analyze files changed since this git revision (and files importing them)")
+    parser.add_argument("--baseline", metavar="REPORT", default=None,
+                        help="Previous JSON report; only changed files are analyzed and merged into it")
 
     args = parser.parse_args()
-    report = analyze_project(args.path)
+    if args.list_tools:
+        print(f"{'tool':<16} {'category':<26} {'scope':<12} cost")
+        for spec in REGISTRY.values():
+            print(f"{spec.name:<16} {spec.category:<26} {spec.scope:<12} {spec.cost}")
+        return
+    if args.path is None:
+        parser.error("the following arguments are required: path")
+    if args.format == "sqlite" and not args.output:
+        parser.error("--format sqlite needs the database file as -o/--output")
+
+    tools, cache, tool_options, resource_limits = tool_settings(parser, args)
+    if args.coverage_parallel:
+        tool_options["coverage"] = {"parallel": True}
+    executor = None
+    if args.use_async:
+        from .async_engine import AsyncioExecutor, parse_limits
+        try:
+            limits = parse_limits(args.limit)
+        except ValueError as e:
+            parser.error(str(e))
+        executor = AsyncioExecutor(concurrency=args.concurrency, limits=limits)
+    options = dict(jobs=args.jobs, batch=args.batch, batch_size=args.batch_size, cache=cache,
+                   tools=tools, options=tool_options, schedule=args.schedule,
+                   history=timings_from_report(read_report(args.timings)) if args.timings else None,
+                   executor=executor, resource_limits=resource_limits,
+                   discovery=dict(include=args.include or None, exclude=args.exclude or None,
+                                  max_file_size=args.max_file_size * 1024 if args.max_file_size else None,
+                                  gitignore=not args.no_gitignore))
+
+    report = None
+    if args.since or args.baseline:
+        baseline = read_report(args.baseline) if args.baseline else None
+        try:
+            report = analyze_incremental(args.path, since=args.since, baseline=baseline, **options)
+        except RuntimeError as e:
+            parser.error(str(e))
+    elif args.format == "json":
+        report = analyze_project(args.path, **options)
 
-    if args.output:
+    if args.format == "sqlite":
+        from .store import write_records
+        try:
+            run_id = write_records(
+                report.items() if report is not None else iter_analyze_project(args.path, **options),
+                args.output, root=args.path)
+        except ValueError as e:
+            parser.error(str(e))
+        print(f"Run {run_id} saved to {args.output}")
+    elif args.format == "ndjson":
+        # Opened only now so --baseline and --output may name the same file
+        out = open(args.output, 'w') if args.output else sys.stdout
+        try:
+            write_ndjson(report.items() if report is not None else iter_analyze_project(args.path, **options), out)
+        finally:
+            if out is not sys.stdout:
+                out.close()
+        if args.output:
+            print(f"Report saved to {args.output}")
+    elif args.output:
         with open(args.output, 'w') as f:
-            json.dump(report, f, indent=4)
+            json.dump(report, f, indent=4, default=to_json)
         print(f"Report saved to {args.output}")
     else:
-        print(json.dumps(report, indent=4))
+        print(json.dumps(report, indent=4, default=to_json))
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
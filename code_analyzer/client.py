@@ -0,0 +1,113 @@
+#client.py
+"""
+Thin client of the analysis server started with `code-analyzer-v2 serve`.
+
+It only imports a few standard library modules, so a request costs little
+more than interpreter start-up; the analysis itself runs in the server,
+where tools, dictionaries, parsed sources and cached results stay loaded.
+
+Usage:
+    code-analyzer-v2-client <file.py> [<file.py> ...] [--tools NAMES] [--socket PATH]
+    code-analyzer-v2-client --ping
+    code-analyzer-v2-client --stop
+"""
+import argparse
+import json
+import os
+import socket
+import sys
+
+# Socket the server listens on by default: per user, in the runtime directory.
+DEFAULT_SOCKET = os.path.join(
+    os.environ.get('XDG_RUNTIME_DIR') or os.environ.get('TMPDIR') or '/tmp',
+    f"code-analyzer-v2-{os.getuid() if hasattr(os, 'getuid') else 'user'}.sock",
+)
+
+
+class ServerError(RuntimeError):
+    """Raised when the server cannot be reached or rejects a request."""
+
+
+def request(message, socket_path=DEFAULT_SOCKET, timeout=None):
+    """
+    Send one request to the server and return its response.
+
+    Requests and responses are JSON objects, one per line.
+
+    Raises:
+        ServerError: If no server is listening or the request failed.
+    """
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as conn:
+            conn.settimeout(timeout)
+            conn.connect(socket_path)
+            conn.sendall(json.dumps(message).encode() + b'\n')
+            with conn.makefile('rb') as stream:
+                line = stream.readline()
+    except (FileNotFoundError, ConnectionRefusedError):
+        raise ServerError(f"no server listening on {socket_path}; start one with: code-analyzer-v2 serve") from None
+    except OSError as e:
+        raise ServerError(f"request to {socket_path} failed: {e}") from None
+    if not line:
+        raise ServerError("the server closed the connection without a response")
+    response = json.loads(line)
+    if not response.get('ok'):
+        raise ServerError(response.get('error', 'request failed'))
+    return response
+
+
+def analyze(files, tools=None, socket_path=DEFAULT_SOCKET, timeout=None):
+    """
+    Analyze Python files with the server's file-scoped tools.
+
+    Args:
+        files (Iterable[str]): Paths of the files, relative to the working directory.
+        tools (Iterable[str], optional): Only run these tools (the server's
+            selection by default).
+
+    Returns:
+        dict: {path as given: results as returned by analyzer.analyze_file}
+    """
+    files = list(files)
+    message = {'op': 'analyze', 'files': [os.path.abspath(path) for path in files]}
+    if tools is not None:
+        message['tools'] = list(tools)
+    results = request(message, socket_path, timeout)['results']
+    return {path: results[os.path.abspath(path)] for path in files}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='code-analyzer-v2-client',
+                                     description="Analyze files with a running code-analyzer-v2 server.")
+    parser.add_argument("files", nargs="*", help="Python files to analyze")
+    parser.add_argument("--socket", default=DEFAULT_SOCKET, help=f"Server socket (default: {DEFAULT_SOCKET})")
+    parser.add_argument("--tools", metavar="NAMES", default=None, help="Comma-separated tools to run")
+    parser.add_argument("--timeout", type=float, default=None, help="Seconds to wait for the response")
+    parser.add_argument("-o", "--output", default=None, help="Output file (JSON)")
+    parser.add_argument("--ping", action="store_true", help="Print the server's status and exit")
+    parser.add_argument("--stop", action="store_true", help="Stop the server and exit")
+    args = parser.parse_args(argv)
+
+    try:
+        if args.ping or args.stop:
+            response = request({'op': 'stop' if args.stop else 'ping'}, args.socket, args.timeout)
+            print(json.dumps(response, indent=4))
+            return 0
+        if not args.files:
+            parser.error("the following arguments are required: files")
+        tools = [name.strip() for name in args.tools.split(",") if name.strip()] if args.tools else None
+        report = analyze(args.files, tools, args.socket, args.timeout)
+    except ServerError as e:
+        print(f"code-analyzer-v2-client: {e}", file=sys.stderr)
+        return 1
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=4)
+    else:
+        print(json.dumps(report, indent=4))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,268 @@
+#discovery.py
+"""
+Find the Python files of a project.
+
+Inside a git work tree the files are listed by `git ls-files`, which
+knows every .gitignore, .git/info/exclude and the global excludes file.
+Elsewhere, or when git is missing, the tree is walked with os.scandir and
+the .gitignore files found on the way are honored. Either way directories
+that never hold project sources (virtualenvs, tool caches, node_modules,
+build output) are skipped without being entered, and the files can be
+narrowed further with include and exclude globs and a size limit.
+"""
+import fnmatch
+import os
+import re
+import subprocess
+import time
+
+# Files analyzed by default, as globs on the path relative to the project root.
+DEFAULT_INCLUDE = ('*.py',)
+
+# Directories never descended into, at any depth: version control, virtualenvs,
+# tool caches and installed packages.
+DEFAULT_EXCLUDE_DIRS = frozenset({
+    '.git', '.hg', '.svn', '.venv', 'venv', '.tox', '.nox', '.eggs', 'node_modules',
+    'site-packages', '__pycache__', '.mypy_cache', '.pytest_cache', '.ruff_cache', '.hypothesis',
+})
+
+# Directories skipped only at the project root, where they hold build output;
+# deeper down they may well be packages (e.g. src/build).
+DEFAULT_EXCLUDE_ROOT_DIRS = frozenset({'build', 'dist'})
+
+# A directory holding this file is a virtualenv, whatever it is called.
+VENV_MARKER = 'pyvenv.cfg'
+
+
+def _globs(patterns):
+    """Compile globs into one regex; None when there are no patterns."""
+    if not patterns:
+        return None
+    return re.compile('|'.join(fnmatch.translate(pattern) for pattern in patterns))
+
+
+def _gitignore_regex(pattern):
+    """Translate a .gitignore pattern, without its '!' and trailing '/', into a regex on relative paths."""
+    anchored = '/' in pattern
+    pattern = pattern.lstrip('/')
+    parts = []
+    index = 0
+    while index < len(pattern):
+        char = pattern[index]
+        if pattern.startswith('**/', index):
+            parts.append('(?:.*/)?')
+            index += 3
+            continue
+        if pattern.startswith('**', index):
+            parts.append('.*')
+            index += 2
+            continue
+        if char == '*':
+            parts.append('[^/]*')
+        elif char == '?':
+            parts.append('[^/]')
+        elif char == '[' and ']' in pattern[index + 1:]:
+            end = pattern.index(']', index + 1)
+            parts.append('[' + pattern[index + 1:end].replace('!', '^', 1) + ']')
+            index = end
+        elif char == '\\' and index + 1 < len(pattern):
+            index += 1
+            parts.append(re.escape(pattern[index]))
+        else:
+            parts.append(re.escape(char))
+        index += 1
+    # A pattern without a slash matches at any depth
+    return re.compile(('' if anchored else '(?:.*/)?') + ''.join(parts) + r'\Z')
+
+
+def read_gitignore(file_path, base):
+    """
+    Read the rules of a .gitignore file.
+
+    Args:
+        file_path (str): Path of the .gitignore file.
+        base (str): Its directory relative to the project root, '' for the root.
+
+    Returns:
+        list: (base, regex, negated, directories_only) tuples in file order.
+    """
+    rules = []
+    try:
+        with open(file_path, 'r', encoding='utf-8', errors='replace') as f:
+            lines = f.read().splitlines()
+    except OSError:
+        return rules
+    for line in lines:
+        line = line.rstrip()
+        if not line or line.startswith('#'):
+            continue
+        negated = line.startswith('!')
+        if negated:
+            line = line[1:]
+        directories_only = line.endswith('/')
+        line = line.rstrip('/')
+        if line:
+            rules.append((base, _gitignore_regex(line), negated, directories_only))
+    return rules
+
+
+def is_ignored(rules, rel_path, is_dir):
+    """Whether the last of `rules` matching `rel_path` (posix separators) ignores it."""
+    for base, regex, negated, directories_only in reversed(rules):
+        if directories_only and not is_dir:
+            continue
+        if base:
+            if not rel_path.startswith(base + '/'):
+                continue
+            relative = rel_path[len(base) + 1:]
+        else:
+            relative = rel_path
+        if regex.match(relative):
+            return not negated
+    return False
+
+
+def _pruned(name, rel_path, exclude):
+    """Whether a directory is skipped by the defaults or an exclude glob."""
+    return (name in DEFAULT_EXCLUDE_DIRS or name.endswith('.egg-info')
+            or ('/' not in rel_path and name in DEFAULT_EXCLUDE_ROOT_DIRS)
+            or (exclude is not None and (exclude.match(rel_path) or exclude.match(name))))
+
+
+def _git_files(path):
+    """Tracked and untracked, not ignored files under `path`, or None outside a git work tree."""
+    try:
+        result = subprocess.run(
+            ['git', '-C', path, 'ls-files', '-z', '--cached', '--others', '--exclude-standard'],
+            capture_output=True,
+        )
+    except OSError:
+        return None
+    if result.returncode != 0:
+        return None
+    return dict.fromkeys(os.fsdecode(name) for name in result.stdout.split(b'\0') if name)
+
+
+def _scan(path, stats, gitignore, exclude):
+    """Walk `path` with os.scandir, yielding the relative paths (posix separators) of the files kept."""
+    rules = read_gitignore(os.path.join(path, '.gitignore'), '') if gitignore else []
+    stack = [('', rules)]
+    while stack:
+        base, rules = stack.pop()
+        directory = os.path.join(path, base) if base else path
+        try:
+            with os.scandir(directory) as scan:
+                entries = list(scan)
+        except OSError:
+            continue
+        stats['directories'] += 1
+        if base and any(entry.name == VENV_MARKER for entry in entries):
+            stats['pruned'] += 1
+            continue
+        if gitignore and base and any(entry.name == '.gitignore' for entry in entries):
+            rules = rules + read_gitignore(os.path.join(directory, '.gitignore'), base)
+        subdirectories = []
+        for entry in entries:
+            rel_path = f"{base}/{entry.name}" if base else entry.name
+            if entry.is_dir(follow_symlinks=False):
+                if _pruned(entry.name, rel_path, exclude):
+                    stats['pruned'] += 1
+                elif rules and is_ignored(rules, rel_path, True):
+                    stats['ignored'] += 1
+                else:
+                    subdirectories.append((rel_path, rules))
+            elif rules and is_ignored(rules, rel_path, False):
+                stats['ignored'] += 1
+            else:
+                yield rel_path
+        # Popped in name order
+        stack.extend(sorted(subdirectories, reverse=True))
+
+
+def discover_files(path, include=None, exclude=None, max_file_size=None, gitignore=True):
+    """
+    Find the files of the project in `path` to analyze.
+
+    Args:
+        path (str): Root folder of the project.
+        include (Iterable[str], optional): Globs of the files to analyze,
+            matched against their path relative to `path` (with '/'
+            separators) or their name. Defaults to DEFAULT_INCLUDE.
+        exclude (Iterable[str], optional): Globs of files and directories
+            to skip, matched the same way; a matching directory is not
+            entered at all, e.g. 'migrations' or 'tests/fixtures/*'.
+        max_file_size (int, optional): Skip files larger than this many
+            bytes, such as generated modules. No limit by default.
+        gitignore (bool): Skip the files git ignores. The files are taken
+            from `git ls-files` inside a git work tree and .gitignore files
+            are read otherwise. With False only the directories of
+            DEFAULT_EXCLUDE_DIRS and `exclude` are skipped.
+
+    Returns:
+        tuple: (files, stats) where files are (full_path, rel_path) pairs
+               sorted by rel_path, and stats records the 'method' ('git' or
+               'scandir'), the 'seconds' taken, the number of 'files' kept
+               and of 'candidates' matching `include`, the 'directories'
+               scanned, the directories 'pruned' by DEFAULT_EXCLUDE_DIRS or
+               `exclude`, the files and directories 'ignored' by .gitignore
+               (scandir only, git does not list them), and the candidates
+               'excluded' by a glob or 'too_large'.
+    """
+    started = time.perf_counter()
+    include = _globs(include or DEFAULT_INCLUDE)
+    exclude = _globs(exclude)
+    stats = {'method': 'scandir', 'seconds': 0.0, 'files': 0, 'candidates': 0, 'directories': 0,
+             'pruned': 0, 'ignored': 0, 'excluded': 0, 'too_large': 0}
+
+    listed = _git_files(path) if gitignore else None
+    if listed is not None:
+        stats['method'] = 'git'
+        rel_paths = listed
+    else:
+        rel_paths = _scan(path, stats, gitignore, exclude)
+
+    found = []
+    # Directories already checked against the prune rules, for the git listing;
+    # untracked virtualenvs are listed along with their marker
+    pruned_dirs = {}
+    if listed is not None:
+        pruned_dirs = {rel_path.rpartition('/')[0]: True for rel_path in listed
+                       if rel_path.rpartition('/')[2] == VENV_MARKER and '/' in rel_path}
+    for rel_path in rel_paths:
+        name = rel_path.rpartition('/')[2]
+        if not (include.match(rel_path) or include.match(name)):
+            continue
+        stats['candidates'] += 1
+        if listed is not None and _in_pruned_dir(rel_path, exclude, pruned_dirs):
+            stats['pruned'] += 1
+            continue
+        if exclude is not None and (exclude.match(rel_path) or exclude.match(name)):
+            stats['excluded'] += 1
+            continue
+        full_path = os.path.join(path, os.path.normpath(rel_path))
+        if max_file_size is not None or listed is not None:
+            try:
+                size = os.stat(full_path).st_size
+            except OSError:
+                # Deleted from the work tree but still in git's index
+                continue
+            if max_file_size is not None and size > max_file_size:
+                stats['too_large'] += 1
+                continue
+        found.append((full_path, os.path.normpath(rel_path)))
+
+    found.sort(key=lambda file: file[1])
+    stats['files'] = len(found)
+    stats['seconds'] = round(time.perf_counter() - started, 6)
+    return found, stats
+
+
+def _in_pruned_dir(rel_path, exclude, pruned_dirs):
+    """Whether a file listed by git lies in a directory the scandir walk would prune."""
+    base, _, _ = rel_path.rpartition('/')
+    if not base:
+        return False
+    if base not in pruned_dirs:
+        name = base.rpartition('/')[2]
+        pruned_dirs[base] = _in_pruned_dir(base, exclude, pruned_dirs) or _pruned(name, base, exclude)
+    return pruned_dirs[base]
@@ -0,0 +1,299 @@
+#incremental.py
+import ast
+import os
+import subprocess
+
+from .analyzer import (
+    PROJECT_KEY, TOOL_SCOPES, TOOLS, _find_python_files, _project_tools, analyze_project,
+)
+from .cache import file_digest
+from CodeReview.source_unit import module_names
+from CodeReview.TestingAndTestCoverage.pytest_runner import merge_results
+
+# Project tools that run the test suite and can run a selection of tests
+# instead; coverage records which lines each test runs.
+TEST_TOOLS = ('pytest', 'coverage')
+
+
+def git_changed_files(path, rev):
+    """
+    Return the files (relative to `path`) changed since the git revision `rev`.
+
+    Includes uncommitted and untracked changes, since those are what a
+    developer or PR pipeline is about to push, and deleted files (a rename
+    is a deletion of the old path).
+
+    Raises:
+        RuntimeError: If `path` is not inside a git work tree or `rev` is unknown.
+    """
+    changed = set()
+    for cmd in (
+        ['git', '-C', path, 'diff', '--name-only', '--no-renames', '--relative', rev, '--'],
+        ['git', '-C', path, 'ls-files', '--others', '--exclude-standard'],
+    ):
+        result = subprocess.run(cmd, capture_output=True, text=True)
+        if result.returncode != 0:
+            raise RuntimeError(f"{' '.join(cmd[3:5])} failed: {result.stderr.strip()}")
+        changed.update(os.path.normpath(line.strip()) for line in result.stdout.splitlines() if line.strip())
+    return changed
+
+
+def baseline_changed_files(files, baseline):
+    """
+    Return the files whose fingerprint differs from the one stored in `baseline`,
+    including the files of the baseline that no longer exist.
+
+    Modification time and size are compared first; the content hash is only
+    computed for files where they differ, so touched-but-unchanged files are
+    not reported.
+
+    Args:
+        files (list): (full_path, rel_path) pairs of the current project.
+        baseline (dict): A previous report from `analyze_project`.
+    """
+    fingerprints = baseline.get(PROJECT_KEY, {}).get('_meta', {}).get('files', {})
+    changed = set()
+    for full_path, rel_path in files:
+        old = fingerprints.get(rel_path)
+        if old is None or rel_path not in baseline:
+            changed.add(rel_path)
+            continue
+        stat = os.stat(full_path)
+        if stat.st_mtime == old.get('mtime') and stat.st_size == old.get('size'):
+            continue
+        if file_digest(full_path) != old.get('sha256'):
+            changed.add(rel_path)
+    current = {rel_path for _, rel_path in files}
+    changed.update(rel_path for rel_path in fingerprints if rel_path not in current)
+    return changed
+
+
+def _imported_modules(full_path, rel_path):
+    """Return every dotted module name a file imports, including parent packages."""
+    try:
+        with open(full_path, 'rb') as f:
+            tree = ast.parse(f.read(), filename=full_path)
+    except (OSError, SyntaxError, ValueError):
+        return set()
+
+    package = os.path.dirname(rel_path).replace(os.sep, '/').split('/')
+    imported = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names = [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom):
+            base = node.module or ''
+            if node.level:
+                parent = package[:len(package) - node.level + 1] if node.level > 1 else package
+                base = '.'.join([p for p in parent if p] + ([base] if base else []))
+            names = [base] + [f"{base}.{alias.name}" if base else alias.name for alias in node.names]
+        else:
+            continue
+        for name in names:
+            parts = name.split('.')
+            imported.update('.'.join(parts[:i]) for i in range(1, len(parts) + 1))
+    return imported
+
+
+def find_dependents(files, changed):
+    """
+    Return the files that import a changed file, directly or transitively.
+
+    Tools such as pylint and mypy check a module against the modules it
+    imports, so their results for these files may change too; an importer
+    of a deleted file now fails to import it.
+
+    Args:
+        files (list): (full_path, rel_path) pairs of the current project.
+        changed (set): Changed and deleted paths relative to the project root.
+    """
+    owners = {}
+    for rel_path in {rel_path for _, rel_path in files} | set(changed):
+        for name in module_names(rel_path):
+            owners.setdefault(name, set()).add(rel_path)
+
+    importers = {}
+    for full_path, rel_path in files:
+        for name in _imported_modules(full_path, rel_path):
+            for owner in owners.get(name, ()):
+                if owner != rel_path:
+                    importers.setdefault(owner, set()).add(rel_path)
+
+    dependents = set()
+    pending = list(changed)
+    while pending:
+        for importer in importers.get(pending.pop(), ()):
+            if importer not in changed and importer not in dependents:
+                dependents.add(importer)
+                pending.append(importer)
+    return dependents
+
+
+def _is_test_file(rel_path):
+    name = os.path.basename(rel_path)
+    return name.startswith('test_') or name.endswith('_test.py')
+
+
+def select_tests(test_map, changed, current):
+    """
+    Return the tests affected by a change, using the test -> line mapping
+    recorded by the coverage tool.
+
+    A test is affected if it ran a line of a changed or deleted file. A
+    changed test file is run as a whole, so tests added to it are included.
+
+    Args:
+        test_map (dict): {test node id: {path: lines}} from a previous
+            coverage result; lines run outside tests are under ''.
+        changed (set): Changed and deleted paths relative to the project root.
+        current (set): Paths of the project's current Python files.
+
+    Returns:
+        list or None: The affected tests, as pytest node ids or test files
+                      relative to the project root (empty if none is), or
+                      None if the mapping is stale and the whole suite must
+                      run: there is none, conftest.py changed, a changed
+                      test file is not in it, or an affected test cannot be
+                      located.
+    """
+    if not test_map:
+        return None
+    changed = {rel_path.replace(os.sep, '/') for rel_path in changed}
+    current = {rel_path.replace(os.sep, '/') for rel_path in current}
+    mapped = {rel_path for lines_by_file in test_map.values() for rel_path in lines_by_file}
+    touched = changed | (mapped - current)
+
+    selected = set()
+    for rel_path in changed:
+        if os.path.basename(rel_path) == 'conftest.py':
+            return None
+        if _is_test_file(rel_path) and rel_path in current:
+            if rel_path not in mapped:
+                return None
+            selected.add(rel_path)
+    for test_id, lines_by_file in test_map.items():
+        test_file = test_id.partition('::')[0]
+        if not test_id or test_file in selected or test_file not in current:
+            continue
+        if touched.intersection(lines_by_file):
+            if '::' not in test_id:
+                return None
+            selected.add(test_id)
+    return sorted(selected)
+
+
+def merge_reports(files, baseline, fresh, tests=None):
+    """
+    Merge the results of an incremental run into a previous report.
+
+    Files analyzed in `fresh` replace their baseline entries, files that no
+    longer exist are dropped, and the rest are carried over unchanged.
+    Project-level results and file fingerprints are merged the same way,
+    except that the pytest results of a run of the selected `tests` (see
+    select_tests) are merged test by test into the baseline's.
+    """
+    merged = {}
+    for _, rel_path in files:
+        if rel_path in fresh:
+            merged[rel_path] = fresh[rel_path]
+        elif rel_path in baseline:
+            merged[rel_path] = baseline[rel_path]
+
+    old_project = baseline.get(PROJECT_KEY, {})
+    new_project = fresh.get(PROJECT_KEY, {})
+    project = {name: result for name, result in old_project.items() if name != '_meta'}
+    project.update((name, result) for name, result in new_project.items() if name != '_meta')
+    if tests and isinstance(old_project.get('pytest'), list) and isinstance(new_project.get('pytest'), list):
+        test_files = {rel_path.replace(os.sep, '/') for _, rel_path in files}
+        rerun_files = [test for test in tests if '::' not in test]
+        project['pytest'] = merge_results(old_project['pytest'], new_project['pytest'], test_files, rerun_files)
+
+    meta = dict(new_project.get('_meta', {}))
+    fingerprints = dict(old_project.get('_meta', {}).get('files', {}))
+    fingerprints.update(meta.get('files', {}))
+    meta['files'] = {rel_path: fingerprints[rel_path] for rel_path in merged if rel_path in fingerprints}
+    project['_meta'] = meta
+
+    merged[PROJECT_KEY] = project
+    return merged
+
+
+def analyze_incremental(path, since=None, baseline=None, **kwargs):
+    """
+    Analyze only the files changed since a git revision or a previous run.
+
+    Changed files are taken from `git diff` against `since` if given,
+    otherwise from the file fingerprints stored in `baseline`. Files that
+    import a changed or deleted file are re-analyzed too. Project-scoped
+    tools are re-run when any file changed or was deleted;
+    environment-scoped tools are reused from the baseline when available.
+    pytest and coverage only run the tests affected by the change when the
+    baseline has the test -> line mapping of a coverage run (see
+    select_tests), and the whole suite when it is missing or stale.
+
+    Args:
+        path (str): Root folder of the Python project.
+        since (str, optional): Git revision to diff against.
+        baseline (dict, optional): Previous report to merge fresh results into.
+        **kwargs: Passed on to `analyze_project`.
+
+    Returns:
+        dict: The merged report (or only the fresh results without a
+              baseline). Change counts are recorded under
+              report['_project']['_meta']['incremental'].
+    """
+    if since is None and baseline is None:
+        raise ValueError("An incremental run needs a git revision or a baseline report")
+
+    files = _find_python_files(path, kwargs.get('discovery'))
+    current = {rel_path for _, rel_path in files}
+    if since is not None:
+        changed = {rel_path for rel_path in git_changed_files(path, since)
+                   if rel_path in current or (rel_path.endswith('.py')
+                                              and not os.path.exists(os.path.join(path, rel_path)))}
+    else:
+        changed = baseline_changed_files(files, baseline)
+    # Deleted files leave nothing to analyze, but their importers and the
+    # project tools have to be checked again
+    deleted = changed - current
+    dependents = find_dependents(files, changed)
+    to_analyze = (changed - deleted) | dependents
+
+    tools = kwargs.pop('tools', None)
+    selected = set(tools) if tools is not None else set(TOOLS)
+    baseline_project = (baseline or {}).get(PROJECT_KEY, {})
+    for name in _project_tools(selected):
+        if name in baseline_project and (TOOL_SCOPES[name] == 'environment' or not changed):
+            selected.discard(name)
+
+    # Only rerun the tests affected by the change
+    options = dict(kwargs.pop('options', None) or {})
+    coverage_result = baseline_project.get('coverage')
+    test_map = coverage_result.get('test_map') if isinstance(coverage_result, dict) else None
+    tests_mode = None
+    tests = None
+    if selected.intersection(TEST_TOOLS):
+        tests = select_tests(test_map, changed, current)
+        if tests:
+            for name in TEST_TOOLS:
+                options[name] = dict(options.get(name, {}), tests=tests)
+            options['coverage']['test_map'] = test_map
+            tests_mode = {'mode': 'selected', 'selected': len(tests)}
+        elif tests is not None and all(name in baseline_project for name in TEST_TOOLS if name in selected):
+            selected.difference_update(TEST_TOOLS)
+            tests_mode = {'mode': 'skipped', 'selected': 0}
+        else:
+            tests_mode = {'mode': 'full', 'selected': None}
+
+    fresh = analyze_project(path, paths=to_analyze, tools=selected, options=options, **kwargs)
+    report = merge_reports(files, baseline, fresh, tests) if baseline is not None else fresh
+    report[PROJECT_KEY]['_meta']['incremental'] = {
+        'since': since,
+        'changed': len(changed),
+        'deleted': len(deleted),
+        'dependents': len(dependents),
+        'analyzed': len(to_analyze),
+        'reused': len([rel_path for rel_path in report if rel_path != PROJECT_KEY]) - len(to_analyze),
+        'tests': tests_mode,
+    }
+    return report
@@ -0,0 +1,82 @@
+#limits.py
+from .registry import REGISTRY
+
+# Default wall-clock budget in seconds of one run of a file-scoped tool, by
+# cost class. A run that exceeds it is killed and reported as
+# {'status': 'timeout'}, so one pathological file cannot stall the whole
+# analysis. Project and environment tools (the test suite, coverage, the
+# docs build, pip-audit) take as long as the project is large and get no
+# default timeout.
+DEFAULT_TIMEOUTS = {
+    'cheap': 60.0,
+    'moderate': 120.0,
+    'expensive': 600.0,
+}
+
+# Limits that can be set per tool: 'timeout' is the wall-clock budget of a
+# run in seconds, 'cpu' the CPU seconds and 'memory' the address space in
+# bytes of each subprocess the run starts. 0 disables a limit.
+LIMIT_KINDS = ('timeout', 'cpu', 'memory')
+
+# Key of the limits that apply to every tool.
+ALL_TOOLS = '*'
+
+
+def parse_resource_limits(selections, kind, scale=1, resource_limits=None):
+    """
+    Parse [TOOL=]VALUE limits of one kind into `resource_limits`.
+
+    A selection without TOOL applies to every tool, e.g.
+    parse_resource_limits(['30', 'mypy=120'], 'timeout') ->
+    {'*': {'timeout': 30.0}, 'mypy': {'timeout': 120.0}}.
+
+    Args:
+        selections (Iterable[str]): The selections as given on the command line.
+        kind (str): One of LIMIT_KINDS.
+        scale (float): Factor from the given unit to the stored one, e.g.
+            1024 * 1024 for memory limits given in MB.
+        resource_limits (dict, optional): Limits to add to (a new dict by default).
+
+    Raises:
+        ValueError: If a selection is malformed, names an unknown tool or is negative.
+    """
+    resource_limits = {} if resource_limits is None else resource_limits
+    for selection in selections:
+        tool, _, value = selection.rpartition('=')
+        tool = tool or ALL_TOOLS
+        if tool != ALL_TOOLS and tool not in REGISTRY:
+            raise ValueError(f"invalid {kind} limit {selection!r}: unknown tool {tool!r}")
+        try:
+            number = float(value)
+        except ValueError:
+            number = -1
+        if number < 0:
+            raise ValueError(f"invalid {kind} limit {selection!r}: expected [TOOL=]N with N >= 0")
+        resource_limits.setdefault(tool, {})[kind] = number * scale
+    return resource_limits
+
+
+def tool_limits(name, resource_limits=None, files=1):
+    """
+    Return the limits of one run of a tool, as keyword arguments of
+    CodeReview.process.limit().
+
+    Limits given for the tool take precedence over those given for every
+    tool, which take precedence over DEFAULT_TIMEOUTS (file-scoped tools only).
+
+    Args:
+        name (str): Tool name.
+        resource_limits (dict, optional): {tool or ALL_TOOLS: {kind: value}}.
+        files (int): Number of files the run covers; a batched run gets the
+            time and CPU budget of all its files.
+    """
+    resource_limits = resource_limits or {}
+    limits = dict.fromkeys(LIMIT_KINDS)
+    if REGISTRY[name].scope == 'file':
+        limits['timeout'] = DEFAULT_TIMEOUTS[REGISTRY[name].cost]
+    limits.update(resource_limits.get(ALL_TOOLS, {}))
+    limits.update(resource_limits.get(name, {}))
+    for kind in ('timeout', 'cpu'):
+        if limits[kind]:
+            limits[kind] *= files
+    return {kind: value or None for kind, value in limits.items()}
@@ -0,0 +1,76 @@
+#metrics.py
+import math
+
+# Figures summarized in the per-tool rollup.
+ROLLUP_FIGURES = ('wall', 'cpu')
+
+
+def percentile(values, q):
+    """Return the `q`-th percentile (0-100) of `values` by the nearest-rank method."""
+    ordered = sorted(values)
+    if not ordered:
+        return None
+    rank = max(1, math.ceil(q / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def split_metrics(metrics, count):
+    """
+    Return the share of one file in the metrics of a batched run over `count` files.
+
+    Wall and CPU time and tool counters (see
+    CodeReview.process.record_counters) are divided evenly so per-tool
+    totals still add up; peak RSS and exit code apply to the whole batch.
+    """
+    share = dict(metrics, batch=count)
+    for figure in ROLLUP_FIGURES:
+        if share.get(figure) is not None:
+            share[figure] = round(share[figure] / count, 6)
+    for name, value in metrics.items():
+        if isinstance(value, dict):
+            share[name] = {key: round(total / count, 3) for key, total in value.items()}
+    return share
+
+
+def rollup(samples):
+    """
+    Summarize the instrumentation of every tool invocation.
+
+    Args:
+        samples (dict): {tool: [metrics, ...]}, one entry per file (or
+            project) the tool produced a result for.
+
+    Returns:
+        dict: {tool: {'runs', 'cache_hits', 'wall': {'total', 'p50', 'p95', 'max'},
+               'cpu': {...}, 'max_rss', 'nonzero_exits', 'timeouts'}}, plus the
+               sum of every tool counter, e.g. 'tool_cache': {'hits',
+               'misses'} for mypy. Cache hits are counted but left out of
+               the timing figures.
+    """
+    summary = {}
+    for tool, tool_samples in samples.items():
+        runs = [metrics for metrics in tool_samples if metrics.get('cache') != 'hit']
+        entry = {
+            'runs': len(runs),
+            'cache_hits': len(tool_samples) - len(runs),
+        }
+        for figure in ROLLUP_FIGURES:
+            values = [metrics[figure] for metrics in runs if metrics.get(figure) is not None]
+            entry[figure] = {
+                'total': round(sum(values), 6),
+                'p50': percentile(values, 50),
+                'p95': percentile(values, 95),
+                'max': max(values) if values else None,
+            }
+        rss = [metrics['max_rss'] for metrics in runs if metrics.get('max_rss') is not None]
+        entry['max_rss'] = max(rss) if rss else None
+        entry['nonzero_exits'] = sum(1 for metrics in runs if metrics.get('exit_code'))
+        entry['timeouts'] = sum(1 for metrics in runs if metrics.get('status') == 'timeout')
+        for metrics in runs:
+            for name, value in metrics.items():
+                if isinstance(value, dict):
+                    totals = entry.setdefault(name, {})
+                    for key, count in value.items():
+                        totals[key] = round(totals.get(key, 0) + count, 3)
+        summary[tool] = entry
+    return summary
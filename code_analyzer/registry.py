@@ -0,0 +1,182 @@
+#registry.py
+import importlib
+from collections.abc import Mapping
+from functools import lru_cache
+from typing import NamedTuple, Optional
+
+# Rough cost of one run of a tool, used to order and select work:
+# 'cheap' tools run in-process in milliseconds, 'moderate' ones start a
+# short-lived subprocess, 'expensive' ones run tests, profile code, build
+# documentation or query the network.
+COST_CLASSES = ('cheap', 'moderate', 'expensive')
+
+
+class ToolSpec(NamedTuple):
+    """Declarative description of one runner."""
+    name: str
+    # CodeReview sub-package the runner lives in
+    category: str
+    # 'file', 'project' or 'environment', see analyzer.TOOL_SCOPES
+    scope: str
+    # One of COST_CLASSES
+    cost: str
+    # 'module:function' of the runner, imported on first use
+    entry_point: str
+    # 'module:function' of the batched variant, if any
+    batch_entry_point: Optional[str] = None
+
+
+# Every tool, in report order. Runners are only imported once selected.
+REGISTRY = {spec.name: spec for spec in (
+    # CodeQuality/Static Analysis
+    ToolSpec('pylint', 'CodeQuality', 'file', 'expensive',
+             'CodeReview.CodeQuality.pylint_runner:run_pylint',
+             'CodeReview.CodeQuality.pylint_runner:run_pylint_batch'),
+    ToolSpec('flake8', 'CodeQuality', 'file', 'moderate',
+             'CodeReview.CodeQuality.flake8_runner:run_flake8',
+             'CodeReview.CodeQuality.flake8_runner:run_flake8_batch'),
+    ToolSpec('mypy', 'CodeQuality', 'file', 'expensive',
+             'CodeReview.CodeQuality.mypy_runner:run_mypy',
+             'CodeReview.CodeQuality.mypy_runner:run_mypy_batch'),
+
+    # SpellingAndGrammar
+    ToolSpec('pyspellchecker', 'SpellingAndGrammar', 'file', 'cheap',
+             'CodeReview.SpellingAndGrammar.pyspellchecker_runner:run_pyspellchecker'),
+
+    # NamingConvention
+    ToolSpec('pep8_naming', 'NamingConvention', 'file', 'moderate',
+             'CodeReview.NamingConvention.pep8_naming_runner:run_pep8_naming'),
+
+    # ClarityAndMaintainability
+    ToolSpec('radon-cc', 'ClarityAndMaintainability', 'file', 'cheap',
+             'CodeReview.ClarityAndMaintainability.radon_runner:run_radon_cc'),
+    ToolSpec('radon-mi', 'ClarityAndMaintainability', 'project', 'moderate',
+             'CodeReview.ClarityAndMaintainability.radon_runner:run_radon_mi_project'),
+    ToolSpec('refactor', 'ClarityAndMaintainability', 'file', 'moderate',
+             'CodeReview.ClarityAndMaintainability.refactor_runner:run_refactor'),
+
+    # TestingAndTestCoverage
+    ToolSpec('pytest', 'TestingAndTestCoverage', 'project', 'expensive',
+             'CodeReview.TestingAndTestCoverage.pytest_runner:run_pytest'),
+    ToolSpec('coverage', 'TestingAndTestCoverage', 'project', 'expensive',
+             'CodeReview.TestingAndTestCoverage.coverage_runner:run_coverage'),
+    ToolSpec('hypothesis', 'TestingAndTestCoverage', 'project', 'expensive',
+             'CodeReview.TestingAndTestCoverage.hypothesis_runner:run_hypothesis'),
+
+    # SecurityAndSafety
+    ToolSpec('bandit', 'SecurityAndSafety', 'file', 'moderate',
+             'CodeReview.SecurityAndSafety.bandit_runner:run_bandit',
+             'CodeReview.SecurityAndSafety.bandit_runner:run_bandit_batch'),
+
+    # DependencyManagement
+    ToolSpec('pipreqs', 'DependencyManagement', 'project', 'moderate',
+             'CodeReview.DependencyManagement.pipreqs_runner:run_pipreqs'),
+    ToolSpec('pip-audit', 'DependencyManagement', 'environment', 'expensive',
+             'CodeReview.DependencyManagement.pip_audit_runner:run_pip_audit'),
+    ToolSpec('deptry', 'DependencyManagement', 'project', 'moderate',
+             'CodeReview.DependencyManagement.deptry_runner:run_deptry'),
+
+    # PerformanceAndEfficiency
+    ToolSpec('cprofile', 'PerformanceAndEfficiency', 'file', 'expensive',
+             'CodeReview.PerformanceAndEfficiency.cprofile_runner:run_cprofile'),
+    ToolSpec('line_profiler', 'PerformanceAndEfficiency', 'file', 'expensive',
+             'CodeReview.PerformanceAndEfficiency.line_profiler_runner:run_line_profiler'),
+    ToolSpec('memory_profiler', 'PerformanceAndEfficiency', 'file', 'expensive',
+             'CodeReview.PerformanceAndEfficiency.memory_profiler_runner:run_memory_profiler'),
+    ToolSpec('scalene', 'PerformanceAndEfficiency', 'file', 'expensive',
+             'CodeReview.PerformanceAndEfficiency.scalene_runner:run_scalene'),
+
+    # FormattingAndStyle
+    ToolSpec('black', 'FormattingAndStyle', 'file', 'moderate',
+             'CodeReview.FormattingAndStyle.black_runner:run_black',
+             'CodeReview.FormattingAndStyle.black_runner:run_black_batch'),
+    ToolSpec('isort', 'FormattingAndStyle', 'file', 'moderate',
+             'CodeReview.FormattingAndStyle.isort_runner:run_isort',
+             'CodeReview.FormattingAndStyle.isort_runner:run_isort_batch'),
+    ToolSpec('autopep8', 'FormattingAndStyle', 'file', 'moderate',
+             'CodeReview.FormattingAndStyle.autopep8_runner:run_autopep8'),
+
+    # Documentation
+    ToolSpec('sphinx', 'Documentation', 'project', 'expensive',
+             'CodeReview.Documentation.sphinx_runner:run_sphinx'),
+    ToolSpec('docformatter', 'Documentation', 'file', 'moderate',
+             'CodeReview.Documentation.docformatter_runner:run_docformatter'),
+    ToolSpec('darglint', 'Documentation', 'file', 'moderate',
+             'CodeReview.Documentation.darglint_runner:run_darglint'),
+    ToolSpec('pdoc', 'Documentation', 'file', 'expensive',
+             'CodeReview.Documentation.pdoc_runner:run_pdoc'),
+)}
+
+# Categories in report order.
+CATEGORIES = tuple(dict.fromkeys(spec.category for spec in REGISTRY.values()))
+
+
+@lru_cache(maxsize=None)
+def load_entry_point(entry_point):
+    """Import 'module:function' and return the function."""
+    module_name, _, attribute = entry_point.partition(':')
+    return getattr(importlib.import_module(module_name), attribute)
+
+
+class LazyRunners(Mapping):
+    """
+    Read-only {tool name: runner} mapping that imports each runner on first access.
+
+    Iterating or testing membership never imports anything, so selecting
+    tools costs nothing until they actually run.
+    """
+
+    def __init__(self, batch=False):
+        self._batch = batch
+
+    def _entry_point(self, name):
+        spec = REGISTRY[name]
+        return spec.batch_entry_point if self._batch else spec.entry_point
+
+    def __getitem__(self, name):
+        entry_point = self._entry_point(name) if name in REGISTRY else None
+        if entry_point is None:
+            raise KeyError(name)
+        return load_entry_point(entry_point)
+
+    def __iter__(self):
+        return (name for name in REGISTRY if self._entry_point(name) is not None)
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __contains__(self, name):
+        return name in REGISTRY and self._entry_point(name) is not None
+
+
+def select_tools(tools=None, skip=None, categories=None):
+    """
+    Return the names of the selected tools, in report order.
+
+    Args:
+        tools (Iterable[str], optional): Only these tools (all by default).
+        skip (Iterable[str], optional): Leave these tools out.
+        categories (Iterable[str], optional): Only tools of these categories,
+            matched case-insensitively.
+
+    Raises:
+        ValueError: If a tool or category name is unknown.
+    """
+    tools, skip = set(tools or ()), set(skip or ())
+    unknown = (tools | skip) - set(REGISTRY)
+    if unknown:
+        raise ValueError(f"Unknown tool(s): {', '.join(sorted(unknown))}. "
+                         f"Available: {', '.join(REGISTRY)}")
+
+    wanted_categories = {category.lower() for category in categories or ()}
+    unknown = wanted_categories - {category.lower() for category in CATEGORIES}
+    if unknown:
+        raise ValueError(f"Unknown category(s): {', '.join(sorted(unknown))}. "
+                         f"Available: {', '.join(CATEGORIES)}")
+
+    return [
+        name for name, spec in REGISTRY.items()
+        if (not tools or name in tools)
+        and name not in skip
+        and (not wanted_categories or spec.category.lower() in wanted_categories)
+    ]
@@ -0,0 +1,173 @@
+#scheduler.py
+import heapq
+from typing import NamedTuple, Tuple
+
+from .registry import REGISTRY
+
+# Order in which tool runs are handed to the workers:
+# 'fifo' submits them file by file in discovery order;
+# 'lpt' submits the longest expected runs first, which keeps the workers
+# evenly loaded and minimizes the total run time (makespan); project tools
+# go first, and file runs are reordered only within each submission window
+# so files still complete, and stream out, roughly in discovery order;
+# 'cheap-first' submits the cheapest files first and project tools last,
+# which minimizes the time until the first file results arrive.
+SCHEDULES = ('fifo', 'lpt', 'cheap-first')
+
+# Tool runs in flight per worker. Later runs are only submitted as earlier
+# ones finish, which bounds the pending futures and results held at once.
+SUBMIT_WINDOW = 4
+
+# Expected seconds per run of a tool without timing history, by cost class.
+COST_SECONDS = {
+    'cheap': 0.05,
+    'moderate': 0.5,
+    'expensive': 5.0,
+}
+
+
+class Task(NamedTuple):
+    """One unit of work for the worker pool."""
+    tool: str
+    # 'file', 'batch' or 'project'
+    kind: str
+    # Files the task produces results for (empty for project tools)
+    files: Tuple[str, ...]
+
+
+def default_schedule(workers):
+    """Makespan matters with several workers; a single worker keeps discovery order."""
+    return 'lpt' if workers > 1 else 'fifo'
+
+
+def timings_from_report(report):
+    """
+    Return the mean wall time per run of every tool in a previous report.
+
+    Args:
+        report (dict): A report whose '_project' '_meta' section has a rollup.
+
+    Returns:
+        dict: {tool: seconds}
+    """
+    rollup = (report or {}).get('_project', {}).get('_meta', {}).get('rollup', {})
+    return {
+        tool: summary['wall']['total'] / summary['runs']
+        for tool, summary in rollup.items() if summary.get('runs')
+    }
+
+
+def estimate_durations(tools, history=None):
+    """
+    Return the expected seconds per run of every tool.
+
+    Historical timings are used where available, the tool's cost class
+    otherwise.
+
+    Returns:
+        dict: {tool: {'seconds': float, 'source': 'history' or 'cost'}}
+    """
+    history = history or {}
+    estimates = {}
+    for tool in tools:
+        if tool in history:
+            estimates[tool] = {'seconds': round(history[tool], 6), 'source': 'history'}
+        else:
+            estimates[tool] = {'seconds': COST_SECONDS[REGISTRY[tool].cost], 'source': 'cost'}
+    return estimates
+
+
+def task_seconds(task, estimates):
+    """Expected duration of a task; a batch takes as long as its files would one by one."""
+    return estimates[task.tool]['seconds'] * max(len(task.files), 1)
+
+
+def order_tasks(tasks, estimates, strategy, window=None):
+    """
+    Return `tasks` in the order they should be submitted.
+
+    Args:
+        tasks (Iterable[Task]): Tool runs in discovery order.
+        estimates (dict): Expected seconds per tool, see estimate_durations().
+        strategy (str): One of SCHEDULES.
+        window (int, optional): Number of runs in flight at once; 'lpt'
+            sorts the file runs within consecutive windows of this size.
+            Without one it sorts all of them.
+
+    Raises:
+        ValueError: If `strategy` is not one of SCHEDULES.
+    """
+    if strategy == 'fifo':
+        return list(tasks)
+    if strategy == 'lpt':
+        def longest_first(chunk):
+            return sorted(chunk, key=lambda task: -task_seconds(task, estimates))
+
+        project = [task for task in tasks if task.kind == 'project']
+        rest = [task for task in tasks if task.kind != 'project']
+        if not window:
+            return longest_first(project + rest)
+        ordered = longest_first(project)
+        for start in range(0, len(rest), window):
+            ordered.extend(longest_first(rest[start:start + window]))
+        return ordered
+    if strategy == 'cheap-first':
+        # A file is done when its last tool finishes, so the cheapest files
+        # go first, each with its longest tool first. Project tools do not
+        # hold up any file and go last.
+        file_cost = {}
+        for task in tasks:
+            if task.kind == 'file':
+                file_cost[task.files[0]] = file_cost.get(task.files[0], 0.0) + task_seconds(task, estimates)
+        # Keeps the tasks of equally expensive files together, in discovery order
+        file_order = {file_path: index for index, file_path in enumerate(file_cost)}
+
+        def key(task):
+            seconds = task_seconds(task, estimates)
+            if task.kind == 'project':
+                return 1, seconds, 0, 0.0
+            if task.kind == 'batch':
+                return 0, seconds, -1, -seconds
+            return 0, file_cost[task.files[0]], file_order[task.files[0]], -seconds
+
+        return sorted(tasks, key=key)
+    raise ValueError(f"Unknown schedule {strategy!r}: expected one of {', '.join(SCHEDULES)}")
+
+
+def summarize_schedule(makespan, file_done, worker_loads):
+    """
+    Summarize a (planned or actual) schedule.
+
+    Args:
+        makespan (float): Seconds until the last task finished.
+        file_done (Iterable[float]): Seconds until each file's results were complete.
+        worker_loads (Iterable[float]): Busy seconds of each worker.
+    """
+    file_done = sorted(file_done)
+    return {
+        'makespan': round(makespan, 3),
+        'first_result': round(file_done[0], 3) if file_done else None,
+        'mean_result': round(sum(file_done) / len(file_done), 3) if file_done else None,
+        'worker_loads': sorted((round(load, 3) for load in worker_loads), reverse=True),
+    }
+
+
+def plan_schedule(tasks, estimates, workers):
+    """
+    Simulate running `tasks` in order on `workers` workers, each picking up
+    the next task as soon as it is idle, as the process pool does.
+
+    Returns:
+        dict: The planned schedule, see `summarize_schedule`.
+    """
+    loads = [(0.0, worker) for worker in range(max(workers, 1))]
+    file_done = {}
+    makespan = 0.0
+    for task in tasks:
+        load, worker = heapq.heappop(loads)
+        end = load + task_seconds(task, estimates)
+        heapq.heappush(loads, (end, worker))
+        makespan = max(makespan, end)
+        for file_path in task.files:
+            file_done[file_path] = max(file_done.get(file_path, 0.0), end)
+    return summarize_schedule(makespan, file_done.values(), [load for load, _ in loads])
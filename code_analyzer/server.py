@@ -0,0 +1,221 @@
+#server.py
+"""
+Long-running analysis server behind `code-analyzer-v2 serve`.
+
+One process keeps everything a single-file analysis needs loaded: the tool
+runners and their libraries, the in-process pylint and flake8 engines, a
+mypy daemon, the spell checker's dictionary, parsed sources and the most
+recently used cached results. Requests arrive over a Unix domain socket
+as one JSON object per line (see client.py), so analyzing a file costs
+only the tools' work on it rather than interpreter start-up and imports.
+
+Requests:
+    {"op": "analyze", "files": [ABSOLUTE PATHS], "tools": [NAMES]?}
+        -> {"ok": true, "results": {path: analyze_file results}, "elapsed": s}
+    {"op": "ping"} -> {"ok": true, "pid", "uptime", "requests", "cache"}
+    {"op": "stop"} -> {"ok": true}, then the server exits
+Failed requests are answered with {"ok": false, "error": message}.
+"""
+import json
+import os
+import signal
+import socket
+import socketserver
+import tempfile
+import threading
+import time
+
+from .analyzer import analyze_file
+from .cache import config_digest
+from .client import DEFAULT_SOCKET
+from .registry import select_tools
+from CodeReview.issue import to_json
+
+# Engines the server uses unless others are configured: the in-process
+# engines stay warm between requests and mypy is checked by its daemon.
+# In-process pylint clears astroid's module cache after every run, so an
+# edited file is never checked in the version an earlier request parsed.
+SERVER_ENGINES = {
+    'pylint': 'inprocess',
+    'flake8': 'inprocess',
+    'mypy': 'daemon',
+}
+
+# Cached results the server keeps in memory besides the on-disk cache.
+DEFAULT_MEMORY_ENTRIES = 4096
+
+# File analyzed once at start-up so the first request finds every runner
+# imported and every engine started.
+WARMUP_SOURCE = '''"""Warm-up module."""
+
+
+def add(first: int, second: int) -> int:
+    """Return the sum of two numbers."""
+    return first + second
+'''
+
+
+def _remove_stale_socket(socket_path):
+    """
+    Remove a socket file left behind by a server that is no longer running.
+
+    Raises:
+        RuntimeError: If a server is already listening on `socket_path`.
+    """
+    if not os.path.exists(socket_path):
+        return
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+        try:
+            probe.connect(socket_path)
+        except OSError:
+            os.unlink(socket_path)
+            return
+    raise RuntimeError(f"a server is already listening on {socket_path}")
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    """Answer the requests of one connection, one JSON object per line."""
+
+    def handle(self):
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                response = self.server.dispatch(json.loads(line))
+            except Exception as e:
+                response = {'ok': False, 'error': f"{type(e).__name__}: {e}"}
+            self.wfile.write(json.dumps(response, default=to_json).encode() + b'\n')
+            self.wfile.flush()
+
+
+class AnalysisServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """
+    Serve analysis requests on a Unix domain socket.
+
+    Every connection gets a thread, so status requests are answered while
+    an analysis runs, but analyses run one at a time: the tools' in-process
+    engines and the mypy daemon are not meant to be driven concurrently.
+
+    Args:
+        socket_path (str): Socket to listen on; only the current user may connect.
+        cache (ResultCache, optional): Result cache shared by all requests.
+        options (dict, optional): Extra keyword arguments per tool, as for
+            analyzer.analyze_file; SERVER_ENGINES fill in missing engines.
+        tools (Iterable[str], optional): Tools run by default (all file-scoped
+            tools if None). Requests may choose others.
+        resource_limits (dict, optional): Timeouts and subprocess limits per
+            tool, see limits.tool_limits.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, socket_path=DEFAULT_SOCKET, cache=None, options=None, tools=None, resource_limits=None):
+        _remove_stale_socket(socket_path)
+        super().__init__(socket_path, _Handler)
+        os.chmod(socket_path, 0o600)
+        self.socket_path = socket_path
+        self.cache = cache
+        self.options = {tool: dict(tool_options) for tool, tool_options in (options or {}).items()}
+        for tool, engine in SERVER_ENGINES.items():
+            self.options.setdefault(tool, {}).setdefault('engine', engine)
+        self.tools = None if tools is None else list(tools)
+        self.resource_limits = resource_limits
+        self.started = time.monotonic()
+        self.requests = 0
+        self._analysis = threading.Lock()
+
+    def analyze(self, files, tools=None):
+        """
+        Analyze files with the server's engines and cache.
+
+        Args:
+            files (Iterable[str]): Absolute paths of Python files.
+            tools (Iterable[str], optional): Only run these tools (the
+                server's default selection if None).
+
+        Returns:
+            dict: {path: results as returned by analyzer.analyze_file}
+
+        Raises:
+            ValueError: If a path is relative or not a file, or a tool is unknown.
+        """
+        files = list(files)
+        for path in files:
+            if not os.path.isabs(path) or not os.path.isfile(path):
+                raise ValueError(f"not an absolute path to a file: {path}")
+        tools = self.tools if tools is None else select_tools(tools)
+        with self._analysis:
+            # Configuration files may have changed since the last request
+            config_digest.cache_clear()
+            return {
+                path: analyze_file(path, cache=self.cache, options=self.options, tools=tools,
+                                   resource_limits=self.resource_limits)
+                for path in files
+            }
+
+    def warm_up(self):
+        """Analyze a small temporary file, without the cache, to load every tool."""
+        with tempfile.TemporaryDirectory(prefix='code-analyzer-warmup-') as tmp_dir:
+            path = os.path.join(tmp_dir, 'warmup.py')
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(WARMUP_SOURCE)
+            with self._analysis:
+                analyze_file(path, options=self.options, tools=self.tools, resource_limits=self.resource_limits)
+
+    def dispatch(self, message):
+        """Answer one request, see the module docstring."""
+        op = message.get('op')
+        if op == 'analyze':
+            self.requests += 1
+            start = time.perf_counter()
+            results = self.analyze(message.get('files', []), message.get('tools'))
+            return {'ok': True, 'results': results, 'elapsed': round(time.perf_counter() - start, 6)}
+        if op == 'ping':
+            cache = None
+            if self.cache is not None:
+                cache = {'hits': self.cache.hits, 'misses': self.cache.misses, 'evictions': self.cache.evictions}
+            return {'ok': True, 'pid': os.getpid(), 'uptime': round(time.monotonic() - self.started, 3),
+                    'requests': self.requests, 'cache': cache}
+        if op == 'stop':
+            # shutdown() waits for serve_forever() to return, so not from this thread's reply
+            threading.Thread(target=self.shutdown, daemon=True).start()
+            return {'ok': True}
+        raise ValueError(f"unknown op {op!r}")
+
+    def server_close(self):
+        super().server_close()
+        try:
+            os.unlink(self.socket_path)
+        except FileNotFoundError:
+            pass
+        if self.options.get('mypy', {}).get('engine') == 'daemon':
+            from CodeReview.CodeQuality.mypy_runner import stop_mypy_daemon
+            stop_mypy_daemon(self.options['mypy'].get('cache_dir'))
+
+
+def _terminate(signum, frame):
+    raise KeyboardInterrupt
+
+
+def serve(socket_path=DEFAULT_SOCKET, warm_up=True, **kwargs):
+    """
+    Run an AnalysisServer until it is asked to stop, or the process receives
+    SIGINT or SIGTERM.
+
+    Args:
+        socket_path (str): Socket to listen on.
+        warm_up (bool): Load every tool before accepting requests.
+        **kwargs: Passed to AnalysisServer.
+    """
+    server = AnalysisServer(socket_path, **kwargs)
+    previous = signal.signal(signal.SIGTERM, _terminate)
+    try:
+        if warm_up:
+            server.warm_up()
+        print(f"code-analyzer-v2 serving on {socket_path} (pid {os.getpid()})", flush=True)
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        signal.signal(signal.SIGTERM, previous)
+        server.server_close()
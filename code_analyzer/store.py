@@ -0,0 +1,391 @@
+#store.py
+"""
+SQLite report store: the results of every run as indexed tables.
+
+Besides the JSON report, a run can be appended to an SQLite database
+(`--format sqlite -o report.db`). Questions such as "the 20 most frequent
+pylint codes" or "files with a function of complexity rank F" then become
+indexed queries instead of loading a whole report, and since every run
+is appended rather than overwriting the previous one, the database holds
+the history of a project for trend analysis.
+
+Tables:
+    runs      one row per run: id, created, root, commit, files, tools and
+              the project _meta (rollup, schedule, cache, ...) as JSON
+    issues    findings of the linters: run_id, file, tool, line, column,
+              code, symbol, severity, message
+    metrics   measurements: run_id, file, tool, kind, name, line, value, rank
+              (complexity of every function, maintainability index,
+              coverage and the wall/cpu/max_rss of every tool run)
+    profiles  profiler rows: run_id, file, tool, function, line, calls,
+              time, cumulative_time, memory_mb
+    results   one row per file and tool: run_id, file, tool, status, error,
+              and the result as JSON for failed runs and for tools none of
+              the tables above describe (black, isort, pytest, ...)
+The latest_issues and latest_metrics views hold the rows of the last run.
+"""
+import datetime
+import json
+import os
+import sqlite3
+import subprocess
+
+from CodeReview.issue import to_json
+
+# Version of the database layout, stored as PRAGMA user_version.
+SCHEMA_VERSION = 1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    created TEXT NOT NULL,
+    root TEXT,
+    "commit" TEXT,
+    files INTEGER,
+    tools TEXT,
+    meta TEXT
+);
+CREATE TABLE IF NOT EXISTS issues (
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    file TEXT NOT NULL,
+    tool TEXT NOT NULL,
+    line INTEGER,
+    "column" INTEGER,
+    code TEXT,
+    symbol TEXT,
+    severity TEXT,
+    message TEXT
+);
+CREATE TABLE IF NOT EXISTS metrics (
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    file TEXT NOT NULL,
+    tool TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    name TEXT,
+    line INTEGER,
+    value REAL,
+    rank TEXT
+);
+CREATE TABLE IF NOT EXISTS profiles (
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    file TEXT NOT NULL,
+    tool TEXT NOT NULL,
+    function TEXT,
+    line INTEGER,
+    calls TEXT,
+    time REAL,
+    cumulative_time REAL,
+    memory_mb REAL
+);
+CREATE TABLE IF NOT EXISTS results (
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    file TEXT NOT NULL,
+    tool TEXT NOT NULL,
+    status TEXT NOT NULL,
+    error TEXT,
+    data TEXT
+);
+CREATE INDEX IF NOT EXISTS issues_file ON issues (file, run_id);
+CREATE INDEX IF NOT EXISTS issues_tool_code ON issues (tool, code, run_id);
+CREATE INDEX IF NOT EXISTS issues_run ON issues (run_id, tool, code);
+CREATE INDEX IF NOT EXISTS metrics_file ON metrics (file, run_id);
+CREATE INDEX IF NOT EXISTS metrics_tool_kind ON metrics (tool, kind, rank, run_id);
+CREATE INDEX IF NOT EXISTS metrics_run ON metrics (run_id, tool);
+CREATE INDEX IF NOT EXISTS profiles_run_file ON profiles (run_id, file);
+CREATE INDEX IF NOT EXISTS results_run_file ON results (run_id, file, tool);
+CREATE VIEW IF NOT EXISTS latest_issues AS
+    SELECT * FROM issues WHERE run_id = (SELECT max(id) FROM runs);
+CREATE VIEW IF NOT EXISTS latest_metrics AS
+    SELECT * FROM metrics WHERE run_id = (SELECT max(id) FROM runs);
+"""
+
+# Timing figures of a tool run (see analyzer._meta) stored as metrics.
+TIMING_FIGURES = ('wall', 'cpu', 'max_rss')
+
+
+# Each extractor maps one tool result to rows of a table, without run_id
+# and file, which write_records fills in.
+
+def _issue_rows(result, code='code', symbol=None, severity=None, message='message', column='column'):
+    return [
+        (issue.get('line'), issue.get(column), issue.get(code), issue.get(symbol),
+         issue.get(severity), issue.get(message))
+        for issue in result
+    ]
+
+
+def _pylint_issues(result):
+    # Outside batch mode the last item is the {'summary': {'rating': ...}} of the file
+    return _issue_rows([issue for issue in result if 'summary' not in issue], code='message_id', symbol='symbol')
+
+
+def _pylint_rating(result):
+    return [('rating', None, None, item['summary'].get('rating'), None) for item in result if 'summary' in item]
+
+
+def _mypy_issues(result):
+    return _issue_rows(result, severity='type')
+
+
+def _bandit_issues(result):
+    return _issue_rows(result, code='test_id', symbol='test_name', severity='issue_severity', message='issue_text')
+
+
+def _spelling_issues(result):
+    # The misspelled word is the symbol, its suggested correction the message
+    return _issue_rows(result, code=None, symbol='word', severity='source', message='suggestion')
+
+
+def _darglint_issues(result):
+    # The issues are one field of darglint's result; the function is the symbol
+    return _issue_rows(result.get('issues', []), symbol='function')
+
+
+def _complexity_metrics(result):
+    return [(item.get('type'), item.get('name'), item.get('line'), item.get('complexity'), item.get('rank'))
+            for item in result]
+
+
+def _cprofile_rows(result):
+    return [(item.get('location'), None, item.get('ncalls'), item.get('total_time'),
+             item.get('cumulative_time'), None) for item in result]
+
+
+def _line_profiler_rows(result):
+    return [(item.get('function'), item.get('line'), str(item.get('hits')),
+             item['time_microseconds'] / 1e6 if item.get('time_microseconds') is not None else None, None, None)
+            for item in result]
+
+
+def _memory_profiler_rows(result):
+    return [(item.get('function'), None, None, None, None, item.get('peak_memory_MB')) for item in result]
+
+
+# Tools whose results hold findings, and how they map to issue rows.
+ISSUE_TOOLS = {
+    'pylint': _pylint_issues,
+    'flake8': _issue_rows,
+    'pep8_naming': _issue_rows,
+    'mypy': _mypy_issues,
+    'bandit': _bandit_issues,
+    'pyspellchecker': _spelling_issues,
+    'darglint': _darglint_issues,
+}
+
+# File-scoped tools whose results are (or include) measurements.
+METRIC_TOOLS = {
+    'pylint': _pylint_rating,
+    'radon-cc': _complexity_metrics,
+}
+
+# Profilers, and how their results map to profile rows.
+PROFILE_TOOLS = {
+    'cprofile': _cprofile_rows,
+    'line_profiler': _line_profiler_rows,
+    'memory_profiler': _memory_profiler_rows,
+}
+
+# Tables the file-scoped tools write to: (table, extractors, columns).
+TOOL_TABLES = (
+    ('issues', ISSUE_TOOLS, 9),
+    ('metrics', METRIC_TOOLS, 8),
+    ('profiles', PROFILE_TOOLS, 9),
+)
+
+
+def _error(result):
+    """The error message of a failed tool run, or None."""
+    if isinstance(result, dict):
+        return result.get('error')
+    if isinstance(result, list) and len(result) == 1 and isinstance(result[0], dict) and 'error' in result[0]:
+        return result[0]['error']
+    return None
+
+
+def _project_rows(root, tool, result):
+    """Metric rows of the project-scoped tools, as (file, row) pairs."""
+    if tool == 'radon-mi' and isinstance(result, list):
+        return [(os.path.relpath(os.path.abspath(item['file']), root) if root else item['file'],
+                 ('maintainability_index', None, None, item.get('maintainability_index'), item.get('rank')))
+                for item in result if 'file' in item]
+    if tool == 'coverage' and isinstance(result, dict):
+        rows = [(rel_path, ('coverage', None, None, entry['coverage'], None))
+                for rel_path, entry in result.get('files', {}).items() if 'coverage' in entry]
+        if 'coverage' in result.get('totals', {}):
+            rows.append(('_project', ('coverage', None, None, result['totals']['coverage'], None)))
+        return rows
+    return []
+
+
+def connect(db_path):
+    """
+    Open (and if needed create) a report store.
+
+    Raises:
+        ValueError: If the database was written by a newer layout.
+    """
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    # Readers (e.g. a dashboard) do not block a run appending to the store
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    if version > SCHEMA_VERSION:
+        conn.close()
+        raise ValueError(f"{db_path} has layout version {version}; this version reads up to {SCHEMA_VERSION}")
+    with conn:
+        conn.executescript(SCHEMA)
+        conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+    return conn
+
+
+def _git_commit(root):
+    """Commit checked out in `root`, if it is a git work tree."""
+    try:
+        result = subprocess.run(['git', '-C', root, 'rev-parse', 'HEAD'], capture_output=True, text=True)
+    except OSError:
+        return None
+    return result.stdout.strip() or None
+
+
+def write_records(records, db_path, root=None):
+    """
+    Append one run to a report store.
+
+    Args:
+        records (Iterable[tuple]): (rel_path, results) pairs as yielded by
+            analyzer.iter_analyze_project, or the items of a report; the
+            '_project' record holds the project tools and run metadata.
+            Records are written as they arrive, so the run's memory stays
+            that of one file's results.
+        db_path (str): SQLite database to append to; created if missing.
+        root (str, optional): Project directory the paths are relative to.
+
+    Returns:
+        int: The id of the new run.
+    """
+    root = os.path.abspath(root) if root else None
+    conn = connect(db_path)
+    try:
+        with conn:
+            run_id = conn.execute(
+                'INSERT INTO runs (created, root, "commit") VALUES (?, ?, ?)',
+                (datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'), root,
+                 _git_commit(root) if root else None),
+            ).lastrowid
+            files = 0
+            tools = []
+            project_meta = None
+            for rel_path, results in records:
+                if rel_path == '_project':
+                    project_meta = results.get('_meta')
+                else:
+                    files += 1
+                for tool, result in results.items():
+                    if tool == '_meta':
+                        continue
+                    if tool not in tools:
+                        tools.append(tool)
+                    _write_result(conn, run_id, root, rel_path, tool, result)
+                _write_timings(conn, run_id, rel_path, results.get('_meta'))
+            meta = dict(project_meta or {})
+            meta.pop('files', None)
+            conn.execute('UPDATE runs SET files = ?, tools = ?, meta = ? WHERE id = ?',
+                         (files, json.dumps(tools), json.dumps(meta, default=to_json), run_id))
+    finally:
+        conn.close()
+    return run_id
+
+
+def _write_result(conn, run_id, root, rel_path, tool, result):
+    error = _error(result)
+    data = json.dumps(result, default=to_json) if error is not None else None
+    if error is None:
+        tables = [entry for entry in TOOL_TABLES if tool in entry[1]]
+        for table, extractors, columns in tables:
+            conn.executemany(f"INSERT INTO {table} VALUES ({', '.join('?' * columns)})",
+                             [(run_id, rel_path, tool) + row for row in extractors[tool](result)])
+        if not tables:
+            project_rows = _project_rows(root, tool, result)
+            conn.executemany('INSERT INTO metrics VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                             [(run_id, file, tool) + row for file, row in project_rows])
+            # Coverage keeps its line numbers and test map, which no table holds
+            if not project_rows or tool == 'coverage':
+                data = json.dumps(result, default=to_json)
+    conn.execute('INSERT INTO results VALUES (?, ?, ?, ?, ?, ?)',
+                 (run_id, rel_path, tool, 'error' if error is not None else 'ok', error, data))
+
+
+def _write_timings(conn, run_id, rel_path, meta):
+    """Store the timing figures of every tool run as 'timing' metrics."""
+    if not meta:
+        return
+    # The project record keeps its tools' figures under 'tools'
+    timings = meta.get('tools', {}) if rel_path == '_project' else meta
+    rows = []
+    for tool, figures in timings.items():
+        if not isinstance(figures, dict) or figures.get('cache') == 'hit':
+            continue
+        rows += [(run_id, rel_path, tool, 'timing', figure, None, figures[figure], None)
+                 for figure in TIMING_FIGURES if figures.get(figure) is not None]
+    conn.executemany('INSERT INTO metrics VALUES (?, ?, ?, ?, ?, ?, ?, ?)', rows)
+
+
+def query(db_path, sql, params=()):
+    """
+    Run a query on a report store.
+
+    Returns:
+        list: One dict per row.
+    """
+    conn = connect(db_path)
+    try:
+        return [dict(row) for row in conn.execute(sql, params)]
+    finally:
+        conn.close()
+
+
+def top_codes(db_path, tool, limit=20, run_id=None):
+    """
+    The most frequent issue codes of a tool in a run (the latest by default).
+
+    Returns:
+        list: [{'code', 'symbol', 'count'}, ...], most frequent first.
+    """
+    return query(db_path, """
+        SELECT code, max(symbol) AS symbol, count(*) AS count FROM issues
+        WHERE tool = ? AND run_id = coalesce(?, (SELECT max(id) FROM runs))
+        GROUP BY code ORDER BY count DESC, code LIMIT ?
+    """, (tool, run_id, limit))
+
+
+def files_with_rank(db_path, ranks=('F',), run_id=None):
+    """
+    Files with a function or class of one of the given radon complexity
+    ranks in a run (the latest by default).
+
+    Returns:
+        list: [{'file', 'name', 'line', 'complexity', 'rank'}, ...], most
+              complex first.
+    """
+    marks = ', '.join('?' * len(ranks))
+    return query(db_path, f"""
+        SELECT file, name, line, value AS complexity, rank FROM metrics
+        WHERE tool = 'radon-cc' AND rank IN ({marks}) AND run_id = coalesce(?, (SELECT max(id) FROM runs))
+        ORDER BY value DESC, file, line
+    """, (*ranks, run_id))
+
+
+def issue_trend(db_path, tool=None):
+    """
+    Issue counts of every run, of one tool or all of them, oldest first.
+
+    Returns:
+        list: [{'run_id', 'created', 'commit', 'issues'}, ...]
+    """
+    return query(db_path, """
+        SELECT runs.id AS run_id, runs.created, runs."commit",
+               (SELECT count(*) FROM issues WHERE issues.run_id = runs.id
+                AND (? IS NULL OR issues.tool = ?)) AS issues
+        FROM runs ORDER BY runs.id
+    """, (tool, tool))
@@ -0,0 +1,22 @@
+import threading
+
+from code_analyzer.async_engine import AsyncioExecutor
+
+
+def test_run_waiting_on_its_tool_limit_leaves_the_global_slot_free():
+    fast_ran = threading.Event()
+
+    def run(tool, target, options, resource_limits):
+        if tool == "slow":
+            return fast_ran.wait(timeout=5)
+        fast_ran.set()
+        return True
+
+    executor = AsyncioExecutor(concurrency=2, limits={"slow": 1})
+    try:
+        slow = [executor.submit(run, "slow", str(index)) for index in range(2)]
+        fast = executor.submit(run, "fast", "x")
+        assert fast.result(timeout=10)
+        assert [future.result(timeout=10) for future in slow] == [True, True]
+    finally:
+        executor.shutdown()
@@ -0,0 +1,42 @@
+import pytest
+
+from code_analyzer.analyzer import analyze_project
+from code_analyzer.cache import ResultCache
+
+
+@pytest.mark.parametrize("memory_entries", [0, 16])
+def test_identical_files_get_their_own_paths(tmp_path, memory_entries):
+    cache = ResultCache(str(tmp_path / "cache"), memory_entries=memory_entries)
+    first, second = str(tmp_path / "a" / "mod.py"), str(tmp_path / "b" / "mod.py")
+    cache.put("key", [{"file": first, "line": 1, "message": "unused import"}], first)
+
+    hit, result = cache.get("key", second)
+    assert hit
+    assert result == [{"file": second, "line": 1, "message": "unused import"}]
+    assert cache.get("key", first)[1][0]["file"] == first
+
+
+@pytest.mark.parametrize("memory_entries", [0, 16])
+def test_only_whole_path_strings_are_swapped(tmp_path, memory_entries, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    cache = ResultCache(str(tmp_path / "cache"), memory_entries=memory_entries)
+    result = [{"path": "mod.py", "message": "imports other/mod.py and mymod.py", "module": "other/mod.py"}]
+    cache.put("key", result, "mod.py")
+
+    hit, restored = cache.get("key", "sub/x.py")
+    assert hit
+    assert restored == [{"path": "sub/x.py", "message": "imports other/mod.py and mymod.py", "module": "other/mod.py"}]
+
+
+def test_project_with_identical_files_reuses_cache_per_path(tmp_path):
+    pytest.importorskip("flake8")
+    project = tmp_path / "project"
+    for package in ("a", "b"):
+        (project / package).mkdir(parents=True)
+        (project / package / "mod.py").write_text("import os\n")
+
+    for run in range(2):
+        report = analyze_project(str(project), tools=["flake8"], cache=ResultCache(str(tmp_path / "cache")))
+        for rel_path in ("a/mod.py", "b/mod.py"):
+            assert [issue["file"] for issue in report[rel_path]["flake8"]] == [str(project / rel_path)]
+    assert report["_project"]["_meta"]["cache"]["hits"] == 2
@@ -0,0 +1,44 @@
+from CodeReview.TestingAndTestCoverage.coverage_runner import project_config, run_coverage
+
+MODULE = """\
+def used():
+    return 1
+
+
+def debug_only():  # debug-only
+    return 2
+"""
+
+TEST = """\
+from module import used
+
+
+def test_used():
+    assert used() == 1
+"""
+
+
+def test_project_config_strips_section_prefixes(tmp_path):
+    (tmp_path / "setup.cfg").write_text("[metadata]\nname = x\n\n[coverage:report]\nexclude_also =\n    debug-only\n")
+    config = project_config(str(tmp_path))
+    assert config.sections() == ["report"]
+    assert config["report"]["exclude_also"].split() == ["debug-only"]
+
+
+def test_project_config_reads_pyproject(tmp_path):
+    (tmp_path / "pyproject.toml").write_text('[tool.coverage.report]\nexclude_also = ["debug-only", "raise AssertionError"]\n')
+    assert project_config(str(tmp_path))["report"]["exclude_also"].splitlines() == ["debug-only", "raise AssertionError"]
+
+
+def test_run_applies_the_projects_exclusions(tmp_path, monkeypatch):
+    project = tmp_path / "project"
+    project.mkdir()
+    (project / "module.py").write_text(MODULE)
+    (project / "test_module.py").write_text(TEST)
+    (project / "pyproject.toml").write_text('[tool.coverage.report]\nexclude_also = ["debug-only"]\n')
+    # The analyzer's own working directory has no coverage configuration
+    monkeypatch.chdir(tmp_path)
+
+    result = run_coverage(str(project))
+    assert result["files"]["module.py"]["missing_lines"] == []
+    assert result["files"]["module.py"]["coverage"] == 100.0
@@ -0,0 +1,63 @@
+import pytest
+
+from code_analyzer.analyzer import analyze_project
+from code_analyzer.discovery import _gitignore_regex, discover_files, is_ignored, read_gitignore
+
+
+@pytest.mark.parametrize("pattern, path, matches", [
+    ("*.py", "pkg/mod.py", True),
+    ("/build", "build", True),
+    ("/build", "src/build", False),
+    ("docs/*.py", "docs/conf.py", True),
+    ("docs/*.py", "docs/api/conf.py", False),
+    ("**/fixtures", "tests/unit/fixtures", True),
+    ("**/fixtures", "fixtures", True),
+    ("gen/**", "gen/a/b.py", True),
+    ("a/**/b.py", "a/b.py", True),
+    ("a/**/b.py", "a/x/y/b.py", True),
+    ("mod?.py", "mod1.py", True),
+    ("mod[!0-9].py", "mod1.py", False),
+])
+def test_gitignore_patterns(pattern, path, matches):
+    assert bool(_gitignore_regex(pattern).match(path)) == matches
+
+
+def test_negation_and_directory_only_rules(tmp_path):
+    (tmp_path / ".gitignore").write_text("*.py\n!keep.py\nout/\n# comment\n")
+    rules = read_gitignore(str(tmp_path / ".gitignore"), "")
+    assert is_ignored(rules, "mod.py", False)
+    assert not is_ignored(rules, "pkg/keep.py", False)
+    assert is_ignored(rules, "out", True)
+    assert not is_ignored(rules, "out", False)
+
+
+def test_nested_gitignore_applies_below_its_directory(tmp_path):
+    rules = read_gitignore(str(tmp_path / "missing"), "")
+    (tmp_path / ".gitignore").write_text("/local.py\n")
+    rules += read_gitignore(str(tmp_path / ".gitignore"), "pkg")
+    assert is_ignored(rules, "pkg/local.py", False)
+    assert not is_ignored(rules, "local.py", False)
+    assert not is_ignored(rules, "pkg/sub/local.py", False)
+
+
+def test_scandir_discovery_honors_gitignore_and_excludes(tmp_path):
+    for rel_path in ("app.py", "gen/skip.py", "venv/lib.py", "tests/test_app.py", "build/out.py", "big.py"):
+        (tmp_path / rel_path).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / rel_path).write_text("X = 1\n")
+    (tmp_path / "big.py").write_text("X = 1\n" * 100)
+    (tmp_path / ".gitignore").write_text("gen/\n")
+
+    # tmp_path is outside any git work tree, so the tree is walked
+    files, stats = discover_files(str(tmp_path), exclude=["tests"], max_file_size=100)
+    assert [rel_path for _, rel_path in files] == ["app.py"]
+    assert (stats["ignored"], stats["too_large"]) == (1, 1)
+
+
+def test_radon_mi_only_rates_discovered_files(tmp_path):
+    pytest.importorskip("radon")
+    (tmp_path / "app.py").write_text("X = 1\n")
+    (tmp_path / "migrations").mkdir()
+    (tmp_path / "migrations" / "0001.py").write_text("Y = 2\n")
+
+    report = analyze_project(str(tmp_path), tools=["radon-mi"], discovery={"exclude": ["migrations"]})
+    assert [entry["file"] for entry in report["_project"]["radon-mi"]] == [str(tmp_path / "app.py")]
@@ -0,0 +1,85 @@
+import subprocess
+
+import pytest
+
+from code_analyzer.analyzer import analyze_project
+from code_analyzer.incremental import analyze_incremental, find_dependents, git_changed_files, merge_reports
+
+
+def _project(root):
+    root.mkdir()
+    (root / "helper.py").write_text("def help_me():\n    return 1\n")
+    (root / "user.py").write_text("from helper import help_me\n\nhelp_me()\n")
+    (root / "other.py").write_text("X = 1\n")
+    return root
+
+
+def test_importers_of_a_deleted_file_are_dependents(tmp_path):
+    root = _project(tmp_path / "project")
+    (root / "helper.py").unlink()
+    files = [(str(root / name), name) for name in ("other.py", "user.py")]
+    assert find_dependents(files, {"helper.py"}) == {"user.py"}
+
+
+def test_baseline_run_after_a_deletion_reanalyzes_importers(tmp_path):
+    root = _project(tmp_path / "project")
+    baseline = analyze_project(str(root), tools=["radon-cc"])
+    (root / "helper.py").unlink()
+
+    report = analyze_incremental(str(root), baseline=baseline, tools=["radon-cc"])
+    incremental = report["_project"]["_meta"]["incremental"]
+    assert (incremental["changed"], incremental["deleted"], incremental["analyzed"]) == (1, 1, 1)
+    assert sorted(name for name in report if name != "_project") == ["other.py", "user.py"]
+
+
+def test_git_diff_reports_deleted_files(tmp_path):
+    root = _project(tmp_path / "project")
+    try:
+        for command in (["init", "-q"], ["add", "."],
+                        ["-c", "user.name=t", "-c", "user.email=t@t", "commit", "-q", "-m", "base"]):
+            subprocess.run(["git", "-C", str(root), *command], check=True, capture_output=True)
+    except (OSError, subprocess.CalledProcessError):
+        pytest.skip("git is not available")
+    (root / "helper.py").unlink()
+    assert git_changed_files(str(root), "HEAD") == {"helper.py"}
+
+
+def test_deleting_a_file_reruns_project_tools(tmp_path):
+    root = _project(tmp_path / "project")
+    baseline = analyze_project(str(root), tools=["radon-cc", "radon-mi"])
+    (root / "other.py").unlink()
+
+    report = analyze_incremental(str(root), baseline=baseline, tools=["radon-cc", "radon-mi"])
+    assert report["_project"]["_meta"]["incremental"]["analyzed"] == 0
+    assert "radon-mi" in report["_project"]["_meta"]["tools"]
+
+
+def _pytest_results(*entries, exit_code=0):
+    summary = {"passed": 0, "failed": 0, "skipped": 0, "errors": 0, "time": 0.0, "exit_code": exit_code}
+    return [{"status": status, "test": test, "time": 1.0} for test, status in entries] + [{"summary": summary}]
+
+
+def test_selected_test_results_are_merged_into_the_baseline(tmp_path):
+    files = [(str(tmp_path / name), name) for name in ("mod.py", "test_a.py", "test_b.py")]
+    baseline = {"_project": {"pytest": _pytest_results(
+        ("test_a.py::test_one", "PASSED"), ("test_a.py::test_two", "FAILED"),
+        ("test_b.py::test_old", "PASSED"), ("test_gone.py::test_x", "PASSED"))}}
+    fresh = {"_project": {"pytest": _pytest_results(
+        ("test_a.py::test_two", "PASSED"), ("test_b.py::test_new", "SKIPPED"))}}
+
+    merged = merge_reports(files, baseline, fresh, tests=["test_a.py::test_two", "test_b.py"])
+    results = merged["_project"]["pytest"]
+    assert [(entry["test"], entry["status"]) for entry in results[:-1]] == [
+        ("test_a.py::test_one", "PASSED"), ("test_a.py::test_two", "PASSED"), ("test_b.py::test_new", "SKIPPED")]
+    assert results[-1]["summary"] == {"passed": 2, "failed": 0, "skipped": 1, "errors": 0, "time": 3.0,
+                                      "exit_code": 0}
+
+
+def test_failures_kept_from_the_baseline_fail_the_merged_run(tmp_path):
+    files = [(str(tmp_path / name), name) for name in ("test_a.py", "test_b.py")]
+    baseline = {"_project": {"pytest": _pytest_results(("test_a.py::test_one", "FAILED"),
+                                                       ("test_b.py::test_two", "PASSED"), exit_code=1)}}
+    fresh = {"_project": {"pytest": _pytest_results(("test_b.py::test_two", "PASSED"))}}
+
+    summary = merge_reports(files, baseline, fresh, tests=["test_b.py::test_two"])["_project"]["pytest"][-1]
+    assert (summary["summary"]["failed"], summary["summary"]["exit_code"]) == (1, 1)
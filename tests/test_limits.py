@@ -0,0 +1,28 @@
+import signal
+import time
+
+import pytest
+
+from CodeReview.process import ToolTimeout, limit
+from code_analyzer.limits import DEFAULT_TIMEOUTS, tool_limits
+
+
+def test_only_file_tools_get_a_default_timeout():
+    assert tool_limits("pylint")["timeout"] == DEFAULT_TIMEOUTS["expensive"]
+    assert tool_limits("pytest")["timeout"] is None
+    assert tool_limits("pip-audit")["timeout"] is None
+    assert tool_limits("pytest", {"*": {"timeout": 30.0}})["timeout"] == 30.0
+
+
+@pytest.mark.skipif(not hasattr(signal, "setitimer"), reason="needs SIGALRM")
+def test_timeout_is_delivered_once():
+    timeouts = 0
+    with limit(timeout=0.05) as budget:
+        deadline = time.monotonic() + 0.5
+        while time.monotonic() < deadline:
+            try:
+                time.sleep(0.01)
+            except ToolTimeout:
+                timeouts += 1
+    assert budget["timed_out"]
+    assert timeouts == 1
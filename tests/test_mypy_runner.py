@@ -0,0 +1,31 @@
+import os
+import shutil
+
+import pytest
+
+from CodeReview.CodeQuality.mypy_runner import project_cache_dir, run_mypy, stop_mypy_daemon
+
+SOURCE = "def add(first, second):\n    return first + second\n"
+
+
+def _project(root, strict):
+    root.mkdir()
+    (root / "mypy.ini").write_text("[mypy]\n" + ("disallow_untyped_defs = True\n" if strict else ""))
+    (root / "module.py").write_text(SOURCE)
+    return str(root / "module.py")
+
+
+@pytest.mark.skipif(shutil.which("dmypy") is None, reason="dmypy is not installed")
+def test_daemon_per_project_reads_its_own_config(tmp_path, monkeypatch):
+    loose = _project(tmp_path / "loose", strict=False)
+    strict = _project(tmp_path / "strict", strict=True)
+    cache_dir = str(tmp_path / "cache")
+    monkeypatch.chdir(tmp_path)
+    try:
+        assert run_mypy(loose, engine="daemon", cache_dir=cache_dir) == []
+        issues = run_mypy(strict, engine="daemon", cache_dir=cache_dir)
+        assert [issue["code"] for issue in issues] == ["no-untyped-def"]
+        for root in ("loose", "strict"):
+            assert os.path.exists(os.path.join(project_cache_dir(cache_dir, str(tmp_path / root)), "dmypy.json"))
+    finally:
+        assert stop_mypy_daemon(cache_dir)
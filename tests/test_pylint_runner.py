@@ -0,0 +1,18 @@
+import pytest
+
+from CodeReview.CodeQuality.pylint_runner import run_pylint
+
+pytest.importorskip("pylint")
+
+
+def _symbols(issues):
+    return sorted(issue["symbol"] for issue in issues if "symbol" in issue)
+
+
+def test_inprocess_engine_sees_edits_between_runs(tmp_path):
+    module = tmp_path / "module.py"
+    module.write_text("import os\n")
+    assert _symbols(run_pylint(str(module), engine="inprocess")) == ["missing-module-docstring", "unused-import"]
+
+    module.write_text('"""Doc."""\nX = 1\n')
+    assert _symbols(run_pylint(str(module), engine="inprocess")) == []
@@ -0,0 +1,30 @@
+import shutil
+
+import pytest
+
+from CodeReview.TestingAndTestCoverage.pytest_runner import run_pytest
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    if shutil.which("pytest") is None:
+        pytest.skip("pytest is not on PATH")
+    root = tmp_path / "project"
+    (root / "tests").mkdir(parents=True)
+    (root / "tests" / "test_a.py").write_text(
+        "def test_ok():\n    pass\n\n\nclass TestX:\n    def test_bad(self):\n        assert False\n")
+    # A rootdir marker above the project, as in a monorepo
+    (tmp_path / "pytest.ini").write_text("[pytest]\n")
+    monkeypatch.chdir(tmp_path)
+    return root
+
+
+def test_node_ids_are_relative_to_the_project(project):
+    results = run_pytest("project")
+    assert [entry["test"] for entry in results[:-1]] == ["tests/test_a.py::test_ok", "tests/test_a.py::TestX::test_bad"]
+    assert results[-1]["summary"]["failed"] == 1
+
+
+def test_selected_tests_keep_their_node_ids(project):
+    results = run_pytest("project", ["tests/test_a.py::TestX::test_bad"])
+    assert [entry["test"] for entry in results[:-1]] == ["tests/test_a.py::TestX::test_bad"]
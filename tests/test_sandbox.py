@@ -0,0 +1,36 @@
+import argparse
+
+import pytest
+
+from CodeReview.sandbox import DEFAULT_MAX_TASKS, configure_sandbox, get_sandbox, sandbox_settings
+from code_analyzer.cli import add_tool_arguments, tool_settings
+
+
+@pytest.fixture(autouse=True)
+def default_sandbox():
+    yield
+    configure_sandbox()
+
+
+def _parse(argv):
+    parser = argparse.ArgumentParser()
+    add_tool_arguments(parser)
+    args = parser.parse_args(["--no-cache", *argv])
+    return tool_settings(parser, args)
+
+
+def test_sandbox_options_size_the_pool():
+    _parse(["--sandbox-workers", "2", "--sandbox-max-tasks", "5"])
+    assert sandbox_settings() == {"workers": 2, "max_tasks": 5}
+    pool = get_sandbox()
+    assert (pool.workers, pool.max_tasks) == (2, 5)
+
+
+def test_sandbox_defaults():
+    _parse([])
+    assert sandbox_settings() == {"workers": None, "max_tasks": DEFAULT_MAX_TASKS}
+
+
+def test_sandbox_options_must_be_positive():
+    with pytest.raises(SystemExit):
+        _parse(["--sandbox-max-tasks", "0"])
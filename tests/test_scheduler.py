@@ -0,0 +1,82 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from code_analyzer.analyzer import iter_analyze_project
+from code_analyzer.scheduler import SUBMIT_WINDOW, Task, order_tasks
+
+ESTIMATES = {"cheap": {"seconds": 1.0}, "slow": {"seconds": 10.0}, "project": {"seconds": 50.0}}
+
+
+def _tasks():
+    tasks = []
+    for name in ("a.py", "b.py", "c.py"):
+        tasks += [Task("cheap", "file", (name,)), Task("slow", "file", (name,))]
+    return tasks + [Task("project", "project", ())]
+
+
+def test_fifo_keeps_discovery_order():
+    assert order_tasks(_tasks(), ESTIMATES, "fifo") == _tasks()
+
+
+def test_lpt_runs_project_tools_first_and_longest_runs_first():
+    ordered = order_tasks(_tasks(), ESTIMATES, "lpt")
+    assert [task.tool for task in ordered] == ["project", "slow", "slow", "slow", "cheap", "cheap", "cheap"]
+
+
+def test_lpt_only_reorders_within_a_window():
+    ordered = order_tasks(_tasks(), ESTIMATES, "lpt", window=2)
+    assert [(task.tool, task.files) for task in ordered] == [
+        ("project", ()),
+        ("slow", ("a.py",)), ("cheap", ("a.py",)),
+        ("slow", ("b.py",)), ("cheap", ("b.py",)),
+        ("slow", ("c.py",)), ("cheap", ("c.py",)),
+    ]
+
+
+def test_cheap_first_orders_files_by_cost_and_project_tools_last():
+    tasks = [Task("slow", "file", ("a.py",)), Task("cheap", "file", ("b.py",)), Task("project", "project", ()),
+             Task("cheap", "file", ("a.py",))]
+    ordered = order_tasks(tasks, ESTIMATES, "cheap-first")
+    assert [(task.tool, task.files) for task in ordered] == [
+        ("cheap", ("b.py",)), ("slow", ("a.py",)), ("cheap", ("a.py",)), ("project", ())]
+
+
+def test_unknown_strategy_is_rejected():
+    with pytest.raises(ValueError):
+        order_tasks(_tasks(), ESTIMATES, "random")
+
+
+class _CountingExecutor(ThreadPoolExecutor):
+    workers = 1
+
+    def __init__(self):
+        super().__init__(max_workers=self.workers)
+        self.in_flight = 0
+        self.most_in_flight = 0
+        self._lock = threading.Lock()
+
+    def submit(self, fn, *args):
+        with self._lock:
+            self.in_flight += 1
+            self.most_in_flight = max(self.most_in_flight, self.in_flight)
+        future = super().submit(fn, *args)
+        future.add_done_callback(self._finished)
+        return future
+
+    def _finished(self, future):
+        with self._lock:
+            self.in_flight -= 1
+
+
+def test_tool_runs_are_submitted_within_a_bounded_window(tmp_path):
+    pytest.importorskip("radon")
+    for index in range(SUBMIT_WINDOW * 3):
+        (tmp_path / f"mod{index}.py").write_text(f"X = {index}\n")
+    executor = _CountingExecutor()
+
+    results = dict(iter_analyze_project(str(tmp_path), tools=["radon-cc"], schedule="lpt", executor=executor))
+    assert len(results) == SUBMIT_WINDOW * 3 + 1
+    assert executor.most_in_flight <= SUBMIT_WINDOW
+    assert results["_project"]["_meta"]["schedule"]["window"] == SUBMIT_WINDOW
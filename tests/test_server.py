@@ -0,0 +1,23 @@
+import pytest
+
+from code_analyzer.cache import ResultCache
+from code_analyzer.server import AnalysisServer
+
+pytest.importorskip("pylint")
+
+
+def test_edited_file_is_rechecked_by_inprocess_pylint(tmp_path):
+    module = tmp_path / "module.py"
+    module.write_text("import os\n")
+    server = AnalysisServer(str(tmp_path / "server.sock"), cache=ResultCache(str(tmp_path / "cache")),
+                            tools=["pylint"])
+    try:
+        assert server.options["pylint"]["engine"] == "inprocess"
+        first = server.analyze([str(module)])[str(module)]["pylint"]
+        assert "unused-import" in {issue.get("symbol") for issue in first}
+
+        module.write_text('"""Doc."""\nX = 1\n')
+        second = server.analyze([str(module)])[str(module)]["pylint"]
+        assert [issue for issue in second if "symbol" in issue] == []
+    finally:
+        server.server_close()
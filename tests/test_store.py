@@ -0,0 +1,67 @@
+from code_analyzer.store import files_with_rank, issue_trend, query, top_codes, write_records
+
+
+def _flake8(*codes):
+    return [{"file": "a.py", "line": line, "column": 1, "code": code, "message": f"message {code}"}
+            for line, code in enumerate(codes, 1)]
+
+
+def _records(root):
+    return [
+        ("a.py", {
+            "flake8": _flake8("E501", "E501", "F401"),
+            "pylint": [{"line": 3, "column": 0, "message_id": "W0611", "symbol": "unused-import", "message": "m"},
+                       {"summary": {"rating": 7.5}}],
+            "radon-cc": [{"type": "function", "name": "tangled", "line": 10, "complexity": 42, "rank": "F"},
+                         {"type": "function", "name": "simple", "line": 2, "complexity": 1, "rank": "A"}],
+            "_meta": {"flake8": {"wall": 0.2, "cpu": 0.1, "max_rss": 1024}},
+        }),
+        ("b.py", {
+            "flake8": _flake8("E501"),
+            "mypy": {"error": "mypy is not installed"},
+            "_meta": {"flake8": {"wall": 0.1, "cache": "hit"}},
+        }),
+        ("_project", {
+            "radon-mi": [{"file": str(root / "a.py"), "maintainability_index": 55.0, "rank": "A"}],
+            "_meta": {"files": {"a.py": {}}, "tools": {"radon-mi": {"wall": 1.5}}},
+        }),
+    ]
+
+
+def test_write_records_fills_the_tables(tmp_path):
+    db_path = str(tmp_path / "report.db")
+    run_id = write_records(_records(tmp_path), db_path, root=str(tmp_path))
+
+    run = query(db_path, "SELECT files, tools, meta FROM runs WHERE id = ?", (run_id,))[0]
+    assert run["files"] == 2
+    assert "files" not in run["meta"]
+    issues = query(db_path, "SELECT file, tool, code, symbol FROM issues ORDER BY file, tool, line")
+    assert [(row["file"], row["tool"], row["code"]) for row in issues] == [
+        ("a.py", "flake8", "E501"), ("a.py", "flake8", "E501"), ("a.py", "flake8", "F401"),
+        ("a.py", "pylint", "W0611"), ("b.py", "flake8", "E501")]
+    assert query(db_path, "SELECT status, error FROM results WHERE tool = 'mypy'") == [
+        {"status": "error", "error": "mypy is not installed"}]
+    metrics = query(db_path, "SELECT file, tool, kind, name, value FROM metrics ORDER BY file, tool, kind, name")
+    assert {(row["file"], row["tool"], row["kind"], row["name"]) for row in metrics} == {
+        ("a.py", "pylint", "rating", None),
+        ("a.py", "radon-cc", "function", "tangled"), ("a.py", "radon-cc", "function", "simple"),
+        ("a.py", "radon-mi", "maintainability_index", None),
+        ("a.py", "flake8", "timing", "wall"), ("a.py", "flake8", "timing", "cpu"),
+        ("a.py", "flake8", "timing", "max_rss"),
+        ("_project", "radon-mi", "timing", "wall"),
+    }
+
+
+def test_queries_default_to_the_latest_run(tmp_path):
+    db_path = str(tmp_path / "report.db")
+    first = write_records(_records(tmp_path), db_path, root=str(tmp_path))
+    write_records([("a.py", {"flake8": _flake8("W291")})], db_path, root=str(tmp_path))
+
+    assert top_codes(db_path, "flake8") == [{"code": "W291", "symbol": None, "count": 1}]
+    assert top_codes(db_path, "flake8", run_id=first) == [
+        {"code": "E501", "symbol": None, "count": 3}, {"code": "F401", "symbol": None, "count": 1}]
+    assert files_with_rank(db_path) == []
+    assert files_with_rank(db_path, run_id=first) == [
+        {"file": "a.py", "name": "tangled", "line": 10, "complexity": 42.0, "rank": "F"}]
+    assert [row["issues"] for row in issue_trend(db_path)] == [5, 1]
+    assert [row["issues"] for row in issue_trend(db_path, "pylint")] == [1, 0]